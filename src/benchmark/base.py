@@ -0,0 +1,604 @@
+import os
+import sys
+import time
+import json
+import wave
+import platform
+import subprocess
+import multiprocessing
+from types import SimpleNamespace
+from datetime import datetime, timezone
+from dataclasses import dataclass, field, asdict
+from typing import Any, Dict, List, Optional
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+from path_handler import PathManager
+
+path_manager = PathManager()
+sys.path.append(str(path_manager.get_base_directory()))
+
+from src.benchmark.synthetic import SyntheticMedia
+
+# Names of the pipeline steps that can be benchmarked.
+STEPS = (
+    "VideoToWavConvertor",
+    "SegmentedVideoToWavConvertor",
+    "AudioToWavConvertor",
+    "VoskTranscriber",
+    "ParallelVoskTranscriber",
+    "VoiceActivityDetector",
+    "VadVoskTranscriber",
+    "Summarizer",
+    "MapReduceSummarizer",
+)
+
+# Steps whose input is text rather than media.
+TEXT_STEPS = ("Summarizer", "MapReduceSummarizer")
+
+# Recordings in `samples/` that the voice activity detection steps run on: mostly speech, and
+# mostly background noise.
+SAMPLES = ("english", "rain")
+
+SAMPLE_DIRECTORY = path_manager.get_base_directory() / "samples"
+
+
+@dataclass(frozen=True)
+class BenchmarkCase:
+    """
+    A single benchmark: one pipeline step run on one synthetic input.
+
+    Attributes:
+        step (str): The name of the step (one of `STEPS`).
+        size (int): The size of the input: its duration in seconds for media, its word count for text.
+        model_path (Optional[str]): Path to the Vosk model used by the transcriber.
+        stub_latency (float): The simulated latency of the stub LLM, in seconds.
+        sample (Optional[str]): The recording in `samples/` used as input instead of a synthetic one
+                                (the size is then its duration, known once it is decoded).
+    """
+    step: str
+    size: int
+    model_path: Optional[str] = None
+    stub_latency: float = 0.0
+    sample: Optional[str] = None
+
+    @property
+    def name(self) -> str:
+        """The name of the case, used to match results against a baseline."""
+        if self.sample:
+            return f"{self.step}-{self.sample}"
+        unit = "words" if self.step in TEXT_STEPS else "s"
+        return f"{self.step}-{self.size}{unit}"
+
+    @property
+    def unit(self) -> str:
+        """The unit of the throughput: seconds of media or words per wall second."""
+        return "words/s" if self.step in TEXT_STEPS else "media s/s"
+
+
+@dataclass
+class BenchmarkResult:
+    """
+    The measurements of a benchmark case.
+
+    Attributes:
+        name (str): The name of the case.
+        step (str): The name of the step.
+        size (int): The size of the input (see `BenchmarkCase.size`).
+        unit (str): The unit of the throughput.
+        wall_seconds (Optional[float]): The fastest wall time of the step over the repetitions.
+        throughput (Optional[float]): The input size processed per wall second, for the fastest repetition.
+        peak_rss_bytes (Optional[int]): The peak resident memory of the process running the step.
+        peak_rss_delta_bytes (Optional[int]): The growth of the peak resident memory caused by the step,
+                                              excluding the interpreter, imports and model loading.
+        children_peak_rss_bytes (Optional[int]): The peak resident memory of the largest child process
+                                                 (e.g., FFmpeg).
+        runs (List[float]): The wall time of every repetition.
+        skipped_ratio (Optional[float]): The fraction of the audio dropped as non-speech, for the
+                                         voice activity detection steps.
+        error (Optional[str]): The error raised by the step, if any.
+    """
+    name: str
+    step: str
+    size: int
+    unit: str
+    wall_seconds: Optional[float] = None
+    throughput: Optional[float] = None
+    peak_rss_bytes: Optional[int] = None
+    peak_rss_delta_bytes: Optional[int] = None
+    children_peak_rss_bytes: Optional[int] = None
+    runs: List[float] = field(default_factory=list)
+    skipped_ratio: Optional[float] = None
+    error: Optional[str] = None
+
+
+class StubChatClient:
+    """
+    An offline stand-in for the OpenAI-compatible client used by the summarizer.
+
+    It answers every request with a fixed summary after a configurable delay, so the benchmark
+    measures the work done by the summarizer itself rather than a remote provider.
+
+    Attributes:
+        chat (SimpleNamespace): Mirrors `client.chat.completions.create`.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        """
+        Initializes the stub client.
+
+        Args:
+            latency (float): The delay before each response, in seconds.
+        """
+        self._latency = latency
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, messages: List[Dict[str, str]], model: str, **kwargs: Any) -> SimpleNamespace:
+        """
+        Returns a chat completion.
+
+        Args:
+            messages (List[Dict[str, str]]): The chat messages.
+            model (str): The requested model.
+
+        Returns:
+            SimpleNamespace: A response shaped like an OpenAI chat completion.
+        """
+        if self._latency:
+            time.sleep(self._latency)
+        prompt_tokens = sum(len(message["content"].split()) for message in messages)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content="# Summary\n\n- A synthetic summary."))],
+            usage=SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=8),
+        )
+
+
+class VadStep:
+    """
+    Runs voice activity detection alone over a WAV file, block by block as the transcriber does.
+
+    Methods:
+        run: Filters the audio and emits a "vad" event with the skipped audio.
+    """
+
+    stage = "transcribing"
+
+    def run(self, file_path: str, context: Any) -> str:
+        """
+        Filters the audio and emits a "vad" event with the skipped audio.
+
+        Args:
+            file_path (str): Path to a 16-bit mono WAV file.
+            context (PipelineContext): The state of the run.
+
+        Returns:
+            str: The path of the input.
+        """
+        from src.transcription.vad import VoiceActivityDetector
+
+        with wave.open(file_path, "rb") as wave_file:
+            detector = VoiceActivityDetector(wave_file.getframerate())
+            while True:
+                data = wave_file.readframes(4000)
+                if len(data) == 0:
+                    break
+                detector.filter(data)
+            detector.flush()
+
+        context.emit("vad", stage=self.stage, **detector.report())
+        return file_path
+
+
+def _decode_sample(sample: str, path: str) -> str:
+    """
+    Decodes a recording of `samples/` to a 16 kHz mono 16-bit WAV file.
+
+    Args:
+        sample (str): The name of the recording (e.g., "rain" for `samples/rain.mp3`).
+        path (str): Path to the WAV file.
+
+    Returns:
+        str: The path of the WAV file.
+
+    Raises:
+        FileNotFoundError: If the recording does not exist.
+        Exception: If FFmpeg fails to decode it.
+    """
+    source = SAMPLE_DIRECTORY / f"{sample}.mp3"
+    if not source.is_file():
+        raise FileNotFoundError(f"There is no sample {source}")
+
+    ffmpeg_command = ["ffmpeg", "-v", "error", "-nostdin", "-y", "-i", str(source), "-ac", "1", "-ar", "16000", "-acodec", "pcm_s16le", path]
+    process = subprocess.run(ffmpeg_command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    if process.returncode != 0:
+        raise Exception(f"FFmpeg error: {process.stderr.decode()}")
+    return path
+
+
+def _peak_rss(who: int) -> Optional[int]:
+    """
+    Returns the peak resident memory of this process or of its largest child, in bytes.
+
+    Args:
+        who (int): `resource.RUSAGE_SELF` or `resource.RUSAGE_CHILDREN`.
+
+    Returns:
+        Optional[int]: The peak resident memory, or None where `resource` is unavailable (Windows).
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(who).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _create_step(case: BenchmarkCase) -> Any:
+    """
+    Creates the step of a benchmark case.
+
+    Args:
+        case (BenchmarkCase): The benchmark case.
+
+    Returns:
+        Any: The step, ready to run.
+
+    Raises:
+        ValueError: If the step is unknown or the transcriber has no model.
+    """
+    from src.config.config import AudioFormat, Client, Prompt, SummerizerConfig
+
+    if case.step == "VideoToWavConvertor":
+        from src.convertion.base import VideoToWavConvertor
+        return VideoToWavConvertor(workers=1)
+
+    if case.step == "SegmentedVideoToWavConvertor":
+        # Uses TRANSCODE_WORKERS and TRANSCODE_SEGMENT_MIN_SECONDS, so both can be tuned per run.
+        from src.config.settings import SETTINGS
+        from src.convertion.base import VideoToWavConvertor
+        return VideoToWavConvertor(workers=SETTINGS.transcode_workers)
+
+    if case.step == "AudioToWavConvertor":
+        from src.convertion.factory import AudioConvertorFactory
+        return AudioConvertorFactory.create(AudioFormat.WAV)
+
+    if case.step == "VoskTranscriber":
+        from vosk import Model as VoskModel
+        from src.transcription.base import VoskTranscriber
+        if not case.model_path:
+            raise ValueError("The VoskTranscriber benchmark needs a Vosk model path.")
+        return VoskTranscriber(VoskModel(case.model_path), os.path.basename(case.model_path), workers=1)
+
+    if case.step == "ParallelVoskTranscriber":
+        # Uses ASR_WORKERS and ASR_CHUNK_SECONDS; the workers are forked with the model loaded here.
+        from vosk import Model as VoskModel
+        from src.config.settings import SETTINGS
+        from src.transcription.base import VoskTranscriber
+        if not case.model_path:
+            raise ValueError("The ParallelVoskTranscriber benchmark needs a Vosk model path.")
+        return VoskTranscriber(
+            VoskModel(case.model_path),
+            os.path.basename(case.model_path),
+            case.model_path,
+            workers=SETTINGS.asr_workers,
+        )
+
+    if case.step == "VoiceActivityDetector":
+        return VadStep()
+
+    if case.step == "VadVoskTranscriber":
+        from vosk import Model as VoskModel
+        from src.transcription.base import VoskTranscriber
+        if not case.model_path:
+            raise ValueError("The VadVoskTranscriber benchmark needs a Vosk model path.")
+        return VoskTranscriber(VoskModel(case.model_path), os.path.basename(case.model_path), workers=1, vad=True)
+
+    if case.step == "Summarizer":
+        from src.clients.factory import ClientFactory
+        from src.llm.factory import LLMFactory
+        from src.summarization.base import Summarizer
+        # The stub replaces the provider client, but the client is still created on construction.
+        os.environ.setdefault(ClientFactory._tokens[Client.OPENROUTER.value], "benchmark")
+        summarizer = Summarizer(SummerizerConfig(Prompt.THEMATIC_SUMMARIZER, Client.OPENROUTER, LLMFactory.create(Client.OPENROUTER)[0]))
+        summarizer.client = StubChatClient(case.stub_latency)
+        return summarizer
+
+    if case.step == "MapReduceSummarizer":
+        # Uses SUMMARY_CHUNK_TOKENS, SUMMARY_CHUNK_OVERLAP_TOKENS and SUMMARY_CONCURRENCY; with a
+        # stub latency, the concurrent parts show in the throughput.
+        from src.clients.factory import ClientFactory
+        from src.llm.factory import LLMFactory
+        from src.summarization.base import Summarizer
+        os.environ.setdefault(ClientFactory._tokens[Client.OPENROUTER.value], "benchmark")
+        summarizer = Summarizer(SummerizerConfig(Prompt.THEMATIC_SUMMARIZER, Client.OPENROUTER, LLMFactory.create(Client.OPENROUTER)[0]), map_reduce=True)
+        summarizer.client = StubChatClient(case.stub_latency)
+        return summarizer
+
+    raise ValueError(f"There is no benchmark for {case.step}")
+
+
+def _measure(case: BenchmarkCase, input_path: str, repeat: int, connection: Any) -> None:
+    """
+    Runs a benchmark case and sends its measurements through a pipe.
+
+    Runs in a fresh process, so the peak memory belongs to this case alone. The step runs with
+    the artifact stores bypassed, so every repetition does the full work.
+
+    Args:
+        case (BenchmarkCase): The benchmark case.
+        input_path (str): Path to the synthetic input.
+        repeat (int): The number of repetitions.
+        connection (Any): The sending end of a pipe.
+    """
+    from src.pipeline.context import PipelineContext
+
+    result = BenchmarkResult(name=case.name, step=case.step, size=case.size, unit=case.unit)
+    try:
+        if case.sample:
+            with wave.open(input_path, "rb") as wave_file:
+                result.size = round(wave_file.getnframes() / wave_file.getframerate())
+
+        step = _create_step(case)
+        baseline_rss = _peak_rss(resource.RUSAGE_SELF) if resource else None
+        vad_reports = []
+
+        for _ in range(repeat):
+            context = PipelineContext(
+                use_cache=False,
+                listener=lambda event: vad_reports.append(event) if event["event"] == "vad" else None,
+            )
+            start = time.perf_counter()
+            output = step.run(input_path, context)
+            result.runs.append(time.perf_counter() - start)
+            if case.step.endswith("Convertor") and os.path.isfile(output):
+                os.remove(output)
+
+        result.wall_seconds = min(result.runs)
+        result.throughput = result.size / result.wall_seconds if result.wall_seconds else None
+        if vad_reports:
+            result.skipped_ratio = vad_reports[-1]["skipped_ratio"]
+        if resource is not None:
+            result.peak_rss_bytes = _peak_rss(resource.RUSAGE_SELF)
+            result.peak_rss_delta_bytes = result.peak_rss_bytes - baseline_rss
+            result.children_peak_rss_bytes = _peak_rss(resource.RUSAGE_CHILDREN)
+    except Exception as e:
+        result.error = f"{type(e).__name__}: {e}"
+
+    connection.send(asdict(result))
+    connection.close()
+
+
+class BenchmarkSuite:
+    """
+    Benchmarks the pipeline steps on synthetic inputs, offline.
+
+    Each case runs in its own spawned process, so models, caches and memory peaks do not leak
+    from one case into another. Synthetic inputs are generated once and reused across runs.
+
+    Attributes:
+        input_directory (str): The directory of the synthetic inputs.
+        repeat (int): The number of repetitions of each case.
+
+    Methods:
+        cases: Builds the benchmark cases.
+        prepare: Generates the synthetic input of a case, if needed.
+        run_case: Runs a single case.
+        run: Runs the cases and returns the report.
+    """
+
+    def __init__(self, input_directory: str, repeat: int = 1):
+        """
+        Initializes the suite.
+
+        Args:
+            input_directory (str): The directory of the synthetic inputs.
+            repeat (int): The number of repetitions of each case.
+        """
+        self.input_directory = input_directory
+        self.repeat = repeat
+        os.makedirs(self.input_directory, exist_ok=True)
+
+    @staticmethod
+    def cases(
+        durations: List[int],
+        text_sizes: List[int],
+        model_path: Optional[str] = None,
+        steps: Optional[List[str]] = None,
+        stub_latency: float = 0.0,
+        samples: Optional[List[str]] = None,
+    ) -> List[BenchmarkCase]:
+        """
+        Builds the benchmark cases.
+
+        The voice activity detection steps run on the recordings of `samples/`, and so does the
+        transcriber (in addition to the synthetic inputs), so transcription with and without
+        voice activity detection can be compared on the same audio.
+
+        Args:
+            durations (List[int]): The durations of the media inputs, in seconds.
+            text_sizes (List[int]): The word counts of the text inputs.
+            model_path (Optional[str]): Path to the Vosk model; the transcriber is skipped without it.
+            steps (Optional[List[str]]): The steps to benchmark (all by default).
+            stub_latency (float): The simulated latency of the stub LLM, in seconds.
+            samples (Optional[List[str]]): The recordings of `samples/` to use (`SAMPLES` by default).
+
+        Returns:
+            List[BenchmarkCase]: The benchmark cases.
+        """
+        steps = steps or list(STEPS)
+        samples = list(SAMPLES) if samples is None else samples
+        cases = []
+        for step in steps:
+            if step in ("VoskTranscriber", "ParallelVoskTranscriber", "VadVoskTranscriber") and not model_path:
+                continue
+            if step in ("VoiceActivityDetector", "VadVoskTranscriber", "VoskTranscriber"):
+                cases.extend(BenchmarkCase(step, 0, model_path, stub_latency, sample) for sample in samples)
+            if step in ("VoiceActivityDetector", "VadVoskTranscriber"):
+                continue
+            sizes = text_sizes if step in TEXT_STEPS else durations
+            cases.extend(BenchmarkCase(step, size, model_path, stub_latency) for size in sizes)
+        return cases
+
+    def prepare(self, case: BenchmarkCase) -> str:
+        """
+        Generates the synthetic input of a case, if needed.
+
+        Args:
+            case (BenchmarkCase): The benchmark case.
+
+        Returns:
+            str: Path to the synthetic input.
+        """
+        if case.sample:
+            path = os.path.join(self.input_directory, f"sample-{case.sample}-16000-mono.wav")
+            generate = lambda: _decode_sample(case.sample, path)
+        elif case.step in ("VideoToWavConvertor", "SegmentedVideoToWavConvertor"):
+            path = os.path.join(self.input_directory, f"video-{case.size}s.mp4")
+            generate = lambda: SyntheticMedia.mp4(path, case.size)
+        elif case.step == "AudioToWavConvertor":
+            path = os.path.join(self.input_directory, f"audio-{case.size}s-44100-stereo.wav")
+            generate = lambda: SyntheticMedia.wav(path, case.size)
+        elif case.step in ("VoskTranscriber", "ParallelVoskTranscriber"):
+            path = os.path.join(self.input_directory, f"audio-{case.size}s-16000-mono.wav")
+            generate = lambda: SyntheticMedia.wav(path, case.size, sample_rate=16000, channels=1)
+        else:
+            path = os.path.join(self.input_directory, f"text-{case.size}words.txt")
+            generate = lambda: SyntheticMedia.text(path, case.size)
+
+        if not os.path.isfile(path):
+            generate()
+        return path
+
+    def run_case(self, case: BenchmarkCase) -> Dict[str, Any]:
+        """
+        Runs a single case in a fresh process.
+
+        Args:
+            case (BenchmarkCase): The benchmark case.
+
+        Returns:
+            Dict[str, Any]: The measurements of the case (see `BenchmarkResult`).
+        """
+        try:
+            input_path = self.prepare(case)
+        except Exception as e:
+            result = BenchmarkResult(name=case.name, step=case.step, size=case.size, unit=case.unit)
+            result.error = f"{type(e).__name__}: {e}"
+            return asdict(result)
+
+        spawn = multiprocessing.get_context("spawn")
+        receiver, sender = spawn.Pipe(duplex=False)
+        process = spawn.Process(target=_measure, args=(case, input_path, self.repeat, sender))
+        process.start()
+        sender.close()
+
+        try:
+            result = receiver.recv()
+        except EOFError:
+            result = asdict(BenchmarkResult(name=case.name, step=case.step, size=case.size, unit=case.unit))
+            result["error"] = "The benchmark process exited without a result."
+        process.join()
+
+        return result
+
+    def run(self, cases: List[BenchmarkCase]) -> Dict[str, Any]:
+        """
+        Runs the cases and returns the report.
+
+        Args:
+            cases (List[BenchmarkCase]): The benchmark cases.
+
+        Returns:
+            Dict[str, Any]: The environment of the run and the results of every case.
+        """
+        results = []
+        for case in cases:
+            print(f"Running {case.name}...", flush=True)
+            results.append(self.run_case(case))
+
+        return {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "repeat": self.repeat,
+            "results": results,
+        }
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], threshold: float = 0.1) -> List[Dict[str, Any]]:
+    """
+    Compares a benchmark report against a baseline report.
+
+    A case regresses when its throughput dropped, or its memory grew, by more than the threshold.
+    Cases that fail, or that only exist in one of the reports, are reported too.
+
+    Args:
+        report (Dict[str, Any]): The new benchmark report.
+        baseline (Dict[str, Any]): The baseline benchmark report.
+        threshold (float): The tolerated relative change (e.g., 0.1 for 10%).
+
+    Returns:
+        List[Dict[str, Any]]: One finding per regression, with the case, the metric, both values
+                              and the relative change.
+    """
+    findings = []
+    baseline_results = {result["name"]: result for result in baseline.get("results", [])}
+
+    for result in report.get("results", []):
+        name = result["name"]
+        if result.get("error"):
+            findings.append({"case": name, "metric": "error", "new": result["error"], "baseline": None, "change": None})
+            continue
+
+        previous = baseline_results.get(name)
+        if previous is None or previous.get("error"):
+            continue
+
+        checks = (
+            ("throughput", -1),
+            ("peak_rss_delta_bytes", 1),
+            ("children_peak_rss_bytes", 1),
+        )
+        for metric, direction in checks:
+            new, old = result.get(metric), previous.get(metric)
+            if not new or not old:
+                continue
+            change = (new - old) / old
+            if change * direction > threshold:
+                findings.append({"case": name, "metric": metric, "new": new, "baseline": old, "change": change})
+
+    return findings
+
+
+def load_report(path: str) -> Dict[str, Any]:
+    """
+    Loads a benchmark report.
+
+    Args:
+        path (str): Path to the JSON report.
+
+    Returns:
+        Dict[str, Any]: The report.
+    """
+    with open(path, mode="r", encoding="UTF-8") as f:
+        return json.load(f)
+
+
+def save_report(report: Dict[str, Any], path: str) -> str:
+    """
+    Writes a benchmark report as JSON.
+
+    Args:
+        report (Dict[str, Any]): The report.
+        path (str): Path to the JSON report.
+
+    Returns:
+        str: The path of the report.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, mode="w", encoding="UTF-8") as f:
+        json.dump(report, f, indent=2)
+    return path
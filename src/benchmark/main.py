@@ -0,0 +1,67 @@
+import sys
+import json
+import argparse
+
+from path_handler import PathManager
+
+path_manager = PathManager()
+sys.path.append(str(path_manager.get_base_directory()))
+
+from src.benchmark.base import SAMPLES, STEPS, BenchmarkSuite, compare, load_report, save_report
+
+BENCHMARK_DIRECTORY = path_manager.get_base_directory() / "benchmarks"
+
+
+def parse_args() -> argparse.Namespace:
+    """
+    Parses the command line.
+
+    Returns:
+        argparse.Namespace: The parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description="Benchmarks the pipeline steps on synthetic inputs.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Runs the benchmarks and writes the results as JSON.")
+    run.add_argument("--output", default=str(BENCHMARK_DIRECTORY / "results.json"), help="Path to the results.")
+    run.add_argument("--durations", type=int, nargs="+", default=[60, 600, 3600], help="Durations of the media inputs, in seconds.")
+    run.add_argument("--long", action="store_true", help="Adds 3-hour inputs, to check that peak memory does not grow with duration.")
+    run.add_argument("--text-sizes", type=int, nargs="+", default=[1000, 10000, 100000], help="Word counts of the text inputs.")
+    run.add_argument("--samples", nargs="*", default=list(SAMPLES), help="Recordings of samples/ for the voice activity detection cases.")
+    run.add_argument("--steps", nargs="+", choices=STEPS, help="The steps to benchmark (all by default).")
+    run.add_argument("--vosk-model", help="Path to a (small) Vosk model. The transcriber is skipped without it.")
+    run.add_argument("--stub-latency", type=float, default=0.0, help="Simulated latency of the stub LLM, in seconds.")
+    run.add_argument("--repeat", type=int, default=1, help="Repetitions of each case; the fastest one is kept.")
+    run.add_argument("--inputs", default=str(BENCHMARK_DIRECTORY / "inputs"), help="Directory of the synthetic inputs.")
+    run.add_argument("--save-baseline", action="store_true", help="Also stores the results as the baseline.")
+    run.add_argument("--baseline", default=str(BENCHMARK_DIRECTORY / "baseline.json"), help="Path to the baseline.")
+
+    comparison = commands.add_parser("compare", help="Compares results against the baseline.")
+    comparison.add_argument("results", help="Path to the results.")
+    comparison.add_argument("--baseline", default=str(BENCHMARK_DIRECTORY / "baseline.json"), help="Path to the baseline.")
+    comparison.add_argument("--threshold", type=float, default=0.1, help="Tolerated relative change (0.1 is 10%%).")
+
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    if args.command == "run":
+        durations = args.durations + ([3 * 3600] if args.long else [])
+        suite = BenchmarkSuite(args.inputs, repeat=args.repeat)
+        cases = suite.cases(durations, args.text_sizes, args.vosk_model, args.steps, args.stub_latency, args.samples)
+        report = suite.run(cases)
+        print(json.dumps(report["results"], indent=2))
+        print(f"Results written to {save_report(report, args.output)}")
+        if args.save_baseline:
+            print(f"Baseline written to {save_report(report, args.baseline)}")
+
+    else:
+        findings = compare(load_report(args.results), load_report(args.baseline), args.threshold)
+        for finding in findings:
+            print(json.dumps(finding))
+        if findings:
+            print(f"{len(findings)} regression(s) against {args.baseline}")
+            sys.exit(1)
+        print("No regressions.")
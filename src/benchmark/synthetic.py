@@ -0,0 +1,176 @@
+import os
+import sys
+import math
+import wave
+import random
+import array
+import subprocess
+
+from path_handler import PathManager
+
+path_manager = PathManager()
+sys.path.append(str(path_manager.get_base_directory()))
+
+
+class SyntheticMedia:
+    """
+    Generates deterministic synthetic inputs for the benchmarks.
+
+    The inputs only need to exercise the pipeline steps realistically (sample rates, channels,
+    containers, sizes), not to be intelligible, so they are built offline without any sample files.
+
+    Attributes:
+        _vocabulary (List[str]): The words used to build synthetic texts.
+
+    Methods:
+        wav: Writes a speech-like WAV file.
+        mp4: Writes a video file with a speech-like audio track.
+        text: Writes a text file.
+    """
+
+    _vocabulary = (
+        "the pipeline converts audio and video into text before the model writes a short summary "
+        "of the main ideas key points decisions and open questions raised during the meeting lecture "
+        "or interview while keeping the original meaning clear concise and easy to follow"
+    ).split()
+
+    @staticmethod
+    def _block(seconds: float, sample_rate: int, channels: int, silence_ratio: float) -> bytes:
+        """
+        Builds a block of speech-like 16-bit PCM: voiced syllables separated by near-silent pauses.
+
+        Args:
+            seconds (float): The duration of the block.
+            sample_rate (int): The sample rate in Hz.
+            channels (int): The number of channels.
+            silence_ratio (float): The fraction of the block that is near-silent.
+
+        Returns:
+            bytes: The interleaved little-endian PCM samples.
+        """
+        rng = random.Random(0)
+        samples = array.array("h")
+        frames = int(seconds * sample_rate)
+        voiced_frames = int(frames * (1 - silence_ratio))
+
+        for i in range(frames):
+            t = i / sample_rate
+            if i < voiced_frames:
+                envelope = 0.5 * (1 - math.cos(2 * math.pi * 4 * t))
+                pitch = 120 + 30 * math.sin(2 * math.pi * 0.5 * t)
+                value = envelope * (
+                    0.6 * math.sin(2 * math.pi * pitch * t)
+                    + 0.3 * math.sin(2 * math.pi * 2 * pitch * t)
+                    + 0.1 * math.sin(2 * math.pi * 3 * pitch * t)
+                )
+                value += 0.02 * (rng.random() - 0.5)
+            else:
+                value = 0.002 * (rng.random() - 0.5)
+            sample = int(max(-1.0, min(1.0, value)) * 12000)
+            for _ in range(channels):
+                samples.append(sample)
+
+        if sys.byteorder == "big":
+            samples.byteswap()
+        return samples.tobytes()
+
+    @classmethod
+    def wav(
+        cls,
+        path: str,
+        seconds: float,
+        sample_rate: int = 44100,
+        channels: int = 2,
+        silence_ratio: float = 0.2,
+    ) -> str:
+        """
+        Writes a speech-like WAV file.
+
+        A 10-second block is generated once and repeated, so long files are written quickly and
+        in constant memory.
+
+        Args:
+            path (str): Path to the output file.
+            seconds (float): The duration of the file.
+            sample_rate (int): The sample rate in Hz.
+            channels (int): The number of channels.
+            silence_ratio (float): The fraction of the audio that is near-silent.
+
+        Returns:
+            str: The path of the written file.
+        """
+        block_seconds = min(10.0, seconds)
+        block = cls._block(block_seconds, sample_rate, channels, silence_ratio)
+        frame_size = 2 * channels
+        remaining = int(seconds * sample_rate) * frame_size
+
+        with wave.open(path, "wb") as wave_file:
+            wave_file.setnchannels(channels)
+            wave_file.setsampwidth(2)
+            wave_file.setframerate(sample_rate)
+            while remaining > 0:
+                chunk = block[:remaining]
+                wave_file.writeframes(chunk)
+                remaining -= len(chunk)
+
+        return path
+
+    @classmethod
+    def mp4(cls, path: str, seconds: float) -> str:
+        """
+        Writes a video file with a speech-like audio track.
+
+        The audio track is the synthetic WAV encoded as AAC, the video a small test pattern.
+
+        Args:
+            path (str): Path to the output file.
+            seconds (float): The duration of the file.
+
+        Returns:
+            str: The path of the written file.
+
+        Raises:
+            Exception: If FFmpeg encounters an error.
+        """
+        audio_path = f"{path}.wav"
+        cls.wav(audio_path, seconds)
+
+        ffmpeg_command = [
+            "ffmpeg", "-y",
+            "-f", "lavfi", "-i", f"testsrc=size=320x240:rate=10:duration={seconds}",
+            "-i", audio_path,
+            "-c:v", "libx264", "-preset", "ultrafast",
+            "-c:a", "aac",
+            "-shortest",
+            path
+        ]
+
+        try:
+            process = subprocess.run(ffmpeg_command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        finally:
+            os.remove(audio_path)
+
+        if process.returncode != 0:
+            raise Exception(f"FFmpeg error: {process.stderr.decode()}")
+
+        return path
+
+    @classmethod
+    def text(cls, path: str, words: int) -> str:
+        """
+        Writes a text file.
+
+        Args:
+            path (str): Path to the output file.
+            words (int): The number of words.
+
+        Returns:
+            str: The path of the written file.
+        """
+        rng = random.Random(0)
+        with open(path, mode="w", encoding="UTF-8") as f:
+            for i in range(words):
+                f.write(rng.choice(cls._vocabulary))
+                f.write(".\n" if i % 20 == 19 else " ")
+
+        return path
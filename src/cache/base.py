@@ -0,0 +1,399 @@
+import os
+import sys
+import json
+import time
+import errno
+import shutil
+import sqlite3
+import hashlib
+import threading
+from contextlib import closing
+from typing import Any, Dict, Optional
+
+from path_handler import PathManager
+
+path_manager = PathManager()
+sys.path.append(str(path_manager.get_base_directory()))
+
+from src.metrics.base import CACHE_REQUESTS
+
+
+def make_cache_key(**parts: Any) -> str:
+    """
+    Builds a cache key from named parts.
+
+    Args:
+        **parts: The values that identify the cached item. They must be JSON-serializable.
+
+    Returns:
+        str: The hex SHA-256 digest of the parts, independent of their order.
+    """
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("UTF-8")).hexdigest()
+
+
+class ResultCache:
+    """
+    A persistent key-value cache for finished results, backed by SQLite.
+
+    Entries expire after a time to live, and the least recently used entries are evicted once the
+    total size of the stored values exceeds the budget. A connection is opened per operation, so the
+    cache can be shared by threads and by worker processes.
+
+    Attributes:
+        path (str): Path to the SQLite database.
+        ttl_seconds (int): How long an entry stays valid (0 means forever).
+        max_bytes (int): The budget for the total size of the stored values (0 means unlimited).
+        name (str): The name of the cache in the metrics.
+
+    Methods:
+        get: Returns a cached value.
+        set: Stores a value.
+        stats: Returns the number and total size of the cached entries.
+    """
+
+    def __init__(self, path: str, ttl_seconds: int, max_bytes: int, name: str = "results"):
+        """
+        Initializes the cache, creating the database if needed.
+
+        Args:
+            path (str): Path to the SQLite database.
+            ttl_seconds (int): How long an entry stays valid (0 means forever).
+            max_bytes (int): The budget for the total size of the stored values (0 means unlimited).
+            name (str): The name of the cache in the metrics.
+        """
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.name = name
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with closing(self._connect()) as connection, connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Opens a connection to the database.
+
+        Returns:
+            sqlite3.Connection: A new connection.
+        """
+        return sqlite3.connect(self.path, timeout=30)
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Returns a cached value.
+
+        Args:
+            key (str): The key of the entry.
+
+        Returns:
+            Optional[str]: The value, or None if there is no valid entry for the key.
+        """
+        now = time.time()
+
+        with closing(self._connect()) as connection, connection:
+            row = connection.execute("SELECT value, created_at FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                CACHE_REQUESTS.labels(cache=self.name, result="miss").inc()
+                return None
+
+            value, created_at = row
+            if self.ttl_seconds and created_at < now - self.ttl_seconds:
+                connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+                CACHE_REQUESTS.labels(cache=self.name, result="miss").inc()
+                return None
+
+            connection.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+
+        CACHE_REQUESTS.labels(cache=self.name, result="hit").inc()
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        """
+        Stores a value, then drops expired entries and evicts the least recently used ones over the budget.
+
+        Args:
+            key (str): The key of the entry.
+            value (str): The value to store.
+        """
+        now = time.time()
+        size = len(value.encode("UTF-8"))
+
+        with closing(self._connect()) as connection, connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now),
+            )
+
+            if self.ttl_seconds:
+                connection.execute("DELETE FROM entries WHERE created_at < ?", (now - self.ttl_seconds,))
+
+            if self.max_bytes:
+                used = connection.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+                if used > self.max_bytes:
+                    rows = connection.execute("SELECT key, size FROM entries ORDER BY accessed_at").fetchall()
+                    for old_key, old_size in rows:
+                        if used <= self.max_bytes:
+                            break
+                        connection.execute("DELETE FROM entries WHERE key = ?", (old_key,))
+                        used -= old_size
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns the number and total size of the cached entries.
+
+        Returns:
+            Dict[str, int]: The entry count, the used bytes and the budget.
+        """
+        with closing(self._connect()) as connection:
+            count, used = connection.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+
+        return {"entries": count, "used_bytes": used, "max_bytes": self.max_bytes}
+
+
+def hash_file(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+    """
+    Computes the SHA-256 digest of a file, reading it in chunks.
+
+    Args:
+        file_path (str): Path to the file.
+        chunk_size (int): The number of bytes read at a time.
+
+    Returns:
+        str: The hex digest of the file content.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, mode="rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ArtifactStore:
+    """
+    A content-addressed directory of intermediate artifacts (e.g., converted audio, transcriptions).
+
+    Files are named after the key of their content, so concurrent jobs never overwrite each other's
+    files and an artifact produced once is reused by every later job with the same content. Files are
+    moved into the store atomically, and the least recently used ones are deleted once the total size
+    of the store exceeds its budget. Hidden files (such as `.gitkeep`) are never touched.
+
+    Attributes:
+        directory (str): The directory of the store.
+        max_bytes (int): The budget for the total size of the stored files (0 means unlimited).
+        name (str): The name of the store in the metrics.
+
+    Methods:
+        path: Returns the path of an artifact in the store.
+        get: Returns the path of a stored artifact, if any.
+        read_text: Returns the content of a stored text artifact, if any.
+        link: Links a stored artifact into another directory, where eviction cannot delete it.
+        temp_path: Returns a path where a new artifact can be written before it is added.
+        put: Moves a file into the store.
+        put_text: Writes a text artifact into the store.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, name: str = "artifacts"):
+        """
+        Initializes the store, creating its directory if needed.
+
+        Args:
+            directory (str): The directory of the store.
+            max_bytes (int): The budget for the total size of the stored files (0 means unlimited).
+            name (str): The name of the store in the metrics.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.name = name
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, key: str, suffix: str) -> str:
+        """
+        Returns the path of an artifact in the store.
+
+        Args:
+            key (str): The key of the artifact.
+            suffix (str): The file suffix of the artifact (e.g., ".wav").
+
+        Returns:
+            str: The path of the artifact, whether or not it exists.
+        """
+        return os.path.join(self.directory, f"{key}{suffix}")
+
+    def get(self, key: str, suffix: str) -> Optional[str]:
+        """
+        Returns the path of a stored artifact, marking it as recently used.
+
+        The artifact may still be evicted by a concurrent `put` before the caller opens it: callers
+        that read it should use `read_text`, and callers that pass it on should use `link`.
+
+        Args:
+            key (str): The key of the artifact.
+            suffix (str): The file suffix of the artifact.
+
+        Returns:
+            Optional[str]: The path of the artifact, or None if it is not stored.
+        """
+        path = self.path(key, suffix)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            CACHE_REQUESTS.labels(cache=self.name, result="miss").inc()
+            return None
+        CACHE_REQUESTS.labels(cache=self.name, result="hit").inc()
+        return path
+
+    def read_text(self, key: str, suffix: str) -> Optional[str]:
+        """
+        Returns the content of a stored text artifact, marking it as recently used.
+
+        The artifact is opened right away, so an artifact evicted meanwhile is a miss rather than
+        an error.
+
+        Args:
+            key (str): The key of the artifact.
+            suffix (str): The file suffix of the artifact.
+
+        Returns:
+            Optional[str]: The content of the artifact, or None if it is not stored.
+        """
+        try:
+            with open(self.path(key, suffix), mode="r", encoding="UTF-8") as f:
+                os.utime(f.fileno())
+                text = f.read()
+        except FileNotFoundError:
+            CACHE_REQUESTS.labels(cache=self.name, result="miss").inc()
+            return None
+        CACHE_REQUESTS.labels(cache=self.name, result="hit").inc()
+        return text
+
+    def link(self, key: str, suffix: str, directory: str) -> Optional[str]:
+        """
+        Links a stored artifact into another directory, marking it as recently used.
+
+        The hard link keeps the content on disk until the link is deleted (e.g., with the workspace
+        of the job), even if the artifact is evicted from the store meanwhile. If the directory is on
+        another file system, the path in the store is returned instead, as `get` does.
+
+        Args:
+            key (str): The key of the artifact.
+            suffix (str): The file suffix of the artifact.
+            directory (str): The directory of the link.
+
+        Returns:
+            Optional[str]: The path of the link, or None if the artifact is not stored.
+        """
+        path = self.path(key, suffix)
+        link_path = os.path.join(directory, f"{key}{suffix}")
+        try:
+            if os.path.lexists(link_path):
+                os.remove(link_path)
+            os.link(path, link_path)
+        except FileNotFoundError:
+            CACHE_REQUESTS.labels(cache=self.name, result="miss").inc()
+            return None
+        except OSError:
+            return self.get(key, suffix)
+        os.utime(link_path)
+        CACHE_REQUESTS.labels(cache=self.name, result="hit").inc()
+        return link_path
+
+    def temp_path(self, key: str, suffix: str) -> str:
+        """
+        Returns a path where a new artifact can be written before it is added.
+
+        The path is unique per process and thread, and lies in the store directory so that `put`
+        is an atomic rename.
+
+        Args:
+            key (str): The key of the artifact.
+            suffix (str): The file suffix of the artifact.
+
+        Returns:
+            str: A temporary path for the artifact.
+        """
+        return os.path.join(self.directory, f".{key}.{os.getpid()}.{threading.get_ident()}.tmp{suffix}")
+
+    def put(self, key: str, suffix: str, source_path: str) -> str:
+        """
+        Moves a file into the store, then evicts the least recently used artifacts over the budget.
+
+        Args:
+            key (str): The key of the artifact.
+            suffix (str): The file suffix of the artifact.
+            source_path (str): The file to move (ideally a `temp_path` of the store, or a file on
+                               the same file system).
+
+        Returns:
+            str: The path of the stored artifact.
+        """
+        path = self.path(key, suffix)
+        try:
+            os.replace(source_path, path)
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+            # The file is on another file system (e.g., a tmpfs workspace): copy it next to its
+            # final path first, so the store still only ever sees complete files.
+            temp_path = self.temp_path(key, suffix)
+            shutil.copyfile(source_path, temp_path)
+            os.replace(temp_path, path)
+            os.remove(source_path)
+        self._evict(keep=path)
+        return path
+
+    def put_text(self, key: str, suffix: str, text: str) -> str:
+        """
+        Writes a text artifact into the store.
+
+        Args:
+            key (str): The key of the artifact.
+            suffix (str): The file suffix of the artifact.
+            text (str): The content of the artifact.
+
+        Returns:
+            str: The path of the stored artifact.
+        """
+        temp_path = self.temp_path(key, suffix)
+        with open(temp_path, mode="w", encoding="UTF-8") as f:
+            f.write(text)
+        return self.put(key, suffix, temp_path)
+
+    def _evict(self, keep: str) -> None:
+        """
+        Deletes the least recently used artifacts until the store fits its budget.
+
+        Args:
+            keep (str): The path of an artifact that must not be deleted.
+        """
+        if not self.max_bytes:
+            return
+
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.startswith(".") or not entry.is_file():
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        used = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if used <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            used -= size
@@ -1,30 +1,194 @@
 import os
 import sys
+import threading
+import warnings
+from typing import Any, Dict, Iterable
 
+import httpx
 from dotenv import load_dotenv
 from path_handler import PathManager
-from together import Client as TogetherClient
 from openai import OpenAI
 
 path_manager = PathManager()
 sys.path.append(str(path_manager.get_base_directory()))
 
 from src.config.config import Client
+from src.config.settings import SETTINGS
 
 load_dotenv(str(path_manager.get_base_directory() / ".env"))
 
 
 class ClientFactory:
+    """
+    Factory class for LLM clients.
+
+    Both providers expose an OpenAI-compatible API, so each one is served by an `OpenAI` client
+    pointed at its base URL. One client is created per provider and process, on top of a
+    long-lived HTTP connection pool, so requests reuse warm (DNS-resolved, TLS-established)
+    connections instead of paying the setup cost every time. When `LLM_BASE_URL` is set, every
+    provider is pointed at that URL instead (e.g., the local stub server in `src/stub`).
+
+    Attributes:
+        _base_urls (Dict[str, str]): The API base URL of each provider.
+        _tokens (Dict[str, str]): The environment variable holding the API key of each provider.
+        _clients (Dict[str, OpenAI]): The clients created so far, keyed by provider.
+        _http_clients (Dict[str, httpx.Client]): The HTTP clients (connection pools) behind them.
+        _lock (threading.Lock): Guards the creation of clients.
+
+    Methods:
+        _base_url: Returns the base URL that the client of a provider is pointed at.
+        create: Returns the shared client of a provider.
+        warmup: Opens connections to the providers ahead of the first request.
+        stats: Returns the connection pool usage of each created client.
+    """
+
+    _base_urls = {
+        "Together": "https://api.together.xyz/v1",
+        "OpenRouter": "https://openrouter.ai/api/v1",
+    }
+
+    _tokens = {
+        "Together": "TOGETHER_TOKEN",
+        "OpenRouter": "OPENROUTER_TOKEN",
+    }
+
+    _clients: Dict[str, OpenAI] = {}
+    _http_clients: Dict[str, httpx.Client] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def _http_client(cls) -> httpx.Client:
+        """
+        Builds the HTTP client (and its connection pool) behind an LLM client.
+
+        Returns:
+            httpx.Client: An HTTP client with the configured pool limits, keep-alive and HTTP/2 support.
+        """
+        http2 = SETTINGS.llm_http2
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                warnings.warn("HTTP/2 was requested but the h2 package is not installed. Falling back to HTTP/1.1.", UserWarning)
+                http2 = False
+
+        return httpx.Client(
+            http2=http2,
+            timeout=httpx.Timeout(SETTINGS.llm_timeout_seconds, connect=10.0),
+            limits=httpx.Limits(
+                max_connections=SETTINGS.llm_max_connections,
+                max_keepalive_connections=SETTINGS.llm_max_keepalive_connections,
+                keepalive_expiry=SETTINGS.llm_keepalive_expiry_seconds,
+            ),
+        )
+
     @classmethod
-    def create(cls, client: Client):
-        if client.value == "Together":
-            return TogetherClient.client(
-                api_key=os.getenv("TOGETHER_TOKEN")
-            )
-        elif client.value == "OpenRouter":
-            return OpenAI(
-                base_url="https://openrouter.ai/api/v1",
-                api_key=os.getenv("OPENROUTER_TOKEN"),
-            )
-        else:
-            raise ValueError(f"There is no client named {client.value}")
\ No newline at end of file
+    def _base_url(cls, client: Client) -> str:
+        """
+        Returns the base URL that the client of a provider is pointed at.
+
+        Args:
+            client (Client): The LLM provider (e.g., Together, OpenRouter).
+
+        Returns:
+            str: The configured override, or the URL of the provider.
+
+        Raises:
+            ValueError: If the specified provider is not supported.
+        """
+        base_url = cls._base_urls.get(client.value)
+        if base_url is None:
+            raise ValueError(f"There is no client named {client.value}")
+
+        return SETTINGS.llm_base_url or base_url
+
+    @classmethod
+    def create(cls, client: Client) -> OpenAI:
+        """
+        Returns the shared client of a provider, creating it on first use.
+
+        Args:
+            client (Client): The LLM provider (e.g., Together, OpenRouter).
+
+        Returns:
+            OpenAI: The client of the provider.
+
+        Raises:
+            ValueError: If the specified provider is not supported.
+        """
+        base_url = cls._base_url(client)
+        api_key = os.getenv(cls._tokens[client.value])
+        if SETTINGS.llm_base_url and not api_key:
+            # The stub server does not check keys, but the OpenAI client requires one.
+            api_key = "stub"
+
+        with cls._lock:
+            if client.value not in cls._clients:
+                cls._http_clients[client.value] = cls._http_client()
+                cls._clients[client.value] = OpenAI(
+                    base_url=base_url,
+                    api_key=api_key,
+                    http_client=cls._http_clients[client.value],
+                )
+            return cls._clients[client.value]
+
+    @classmethod
+    def warmup(cls, clients: Iterable[Client]) -> None:
+        """
+        Opens connections to the providers ahead of the first request.
+
+        Providers without an API key are skipped, and connection failures are ignored: warming up
+        only saves the handshake of the first request.
+
+        Args:
+            clients (Iterable[Client]): The providers to connect to.
+        """
+        for client in clients:
+            if not os.getenv(cls._tokens.get(client.value, "")) and not SETTINGS.llm_base_url:
+                continue
+            cls.create(client)
+            try:
+                cls._http_clients[client.value].head(cls._base_url(client), timeout=5.0)
+            except httpx.HTTPError:
+                continue
+
+    @classmethod
+    def stats(cls) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns the connection pool usage of each created client.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: For each provider, the number of open, idle and active
+                                       connections, and the configured limits.
+        """
+        with cls._lock:
+            http_clients = dict(cls._http_clients)
+
+        stats = {}
+        for name, http_client in http_clients.items():
+            pool = getattr(getattr(http_client, "_transport", None), "_pool", None)
+            connections = list(getattr(pool, "connections", []))
+            idle = sum(1 for connection in connections if connection.is_idle())
+            stats[name] = {
+                "connections": len(connections),
+                "idle": idle,
+                "active": len(connections) - idle,
+                "max_connections": SETTINGS.llm_max_connections,
+                "max_keepalive_connections": SETTINGS.llm_max_keepalive_connections,
+            }
+
+        return stats
+
+    @classmethod
+    def _reset(cls) -> None:
+        """
+        Forgets the clients inherited from the parent process.
+
+        Connections must not be shared across a fork, so a forked worker starts with its own pools.
+        """
+        cls._clients = {}
+        cls._http_clients = {}
+        cls._lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=ClientFactory._reset)
@@ -78,11 +78,14 @@ class PipelineType(Enum):
     TEXT = "Text"
 
 
-@dataclass
+@dataclass(frozen=True)
 class SummerizerConfig:
     """
     Configuration class for the summarizer.
 
+    The configuration is immutable and hashable: it names the prompt and client instead of holding
+    them, so it can be used as a cache key and sent to worker processes.
+
     Attributes:
         prompt (Prompt): The type of summarization prompt (e.g., thematic, priority).
         client (Client): The LLM client to use (e.g., OpenRouter, Together).
@@ -93,20 +96,27 @@ class SummerizerConfig:
     model: str
 
 
-@dataclass
+@dataclass(frozen=True)
 class PipelineConfig:
     """
     Configuration class for the processing pipeline.
 
+    The configuration is immutable and hashable, so it can be used as a cache key.
+
     Attributes:
         summerizer_config (SummerizerConfig): Configuration for the summarizer.
         audio_format (AudioFormat): The audio format to use for processing.
         provider (Provider): The transcription provider to use.
         language (Language): The language of the input data.
         pipeline_type (PipelineType): The type of pipeline (e.g., video, audio, text).
+        streaming (bool): Whether audio is decoded into a PCM stream that the transcriber reads
+                          as it is produced, instead of being converted to a WAV file first.
+        vad (bool): Whether non-speech audio is dropped before it reaches the recognizer.
     """
     summerizer_config: SummerizerConfig
     audio_format: AudioFormat
     provider: Provider
     language: Language
-    pipeline_type: PipelineType 
\ No newline at end of file
+    pipeline_type: PipelineType
+    streaming: bool = False
+    vad: bool = False 
\ No newline at end of file
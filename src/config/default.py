@@ -16,13 +16,11 @@ from src.config.config import (
     Provider,
     PipelineType
 )
-from src.prompts.factory import PromptFactory
-from src.clients.factory import ClientFactory
 from src.llm.factory import LLMFactory
 
 SUMMERIZER_CONFIG_DEFAULT = SummerizerConfig(
-    prompt=PromptFactory.create(Prompt.THEMATIC_SUMMARIZER),
-    client=ClientFactory.create(Client.OPENROUTER),
+    prompt=Prompt.THEMATIC_SUMMARIZER,
+    client=Client.OPENROUTER,
     model=LLMFactory.create(Client.OPENROUTER)[0]
 )
 
@@ -0,0 +1,316 @@
+import os
+import sys
+from dataclasses import dataclass
+from typing import Tuple
+
+from dotenv import load_dotenv
+from path_handler import PathManager
+
+path_manager = PathManager()
+sys.path.append(str(path_manager.get_base_directory()))
+
+load_dotenv(str(path_manager.get_base_directory() / ".env"))
+
+
+def _get_int(name: str, default: int) -> int:
+    """
+    Reads an integer environment variable.
+
+    Args:
+        name (str): The name of the environment variable.
+        default (int): The value to use if the variable is not set.
+
+    Returns:
+        int: The parsed value.
+
+    Raises:
+        ValueError: If the variable is set but is not a valid integer.
+    """
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"The environment variable {name} must be an integer, got {value!r}") from None
+
+
+def _get_float(name: str, default: float) -> float:
+    """
+    Reads a floating-point environment variable.
+
+    Args:
+        name (str): The name of the environment variable.
+        default (float): The value to use if the variable is not set.
+
+    Returns:
+        float: The parsed value.
+
+    Raises:
+        ValueError: If the variable is set but is not a valid number.
+    """
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        raise ValueError(f"The environment variable {name} must be a number, got {value!r}") from None
+
+
+def _get_bool(name: str, default: bool) -> bool:
+    """
+    Reads a boolean environment variable ("1", "true", "yes" or "on" are true).
+
+    Args:
+        name (str): The name of the environment variable.
+        default (bool): The value to use if the variable is not set.
+
+    Returns:
+        bool: The parsed value.
+    """
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _get_list(name: str, default: Tuple[str, ...]) -> Tuple[str, ...]:
+    """
+    Reads a comma-separated environment variable.
+
+    Args:
+        name (str): The name of the environment variable.
+        default (Tuple[str, ...]): The value to use if the variable is not set.
+
+    Returns:
+        Tuple[str, ...]: The non-empty, stripped items of the list.
+    """
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return tuple(item.strip() for item in value.split(",") if item.strip())
+
+
+def _get_int_map(name: str) -> Tuple[Tuple[str, int], ...]:
+    """
+    Reads a comma-separated environment variable of `key=integer` pairs (e.g., "Persian=2,English=4").
+
+    Args:
+        name (str): The name of the environment variable.
+
+    Returns:
+        Tuple[Tuple[str, int], ...]: The pairs, in order (empty if the variable is not set).
+
+    Raises:
+        ValueError: If an item is not a `key=integer` pair.
+    """
+    pairs = []
+    for item in _get_list(name, ()):
+        key, separator, value = item.partition("=")
+        try:
+            if not separator or not key.strip():
+                raise ValueError
+            pairs.append((key.strip(), int(value)))
+        except ValueError:
+            raise ValueError(f"The environment variable {name} must list key=integer pairs, got {item!r}") from None
+    return tuple(pairs)
+
+
+@dataclass(frozen=True)
+class Settings:
+    """
+    Process-wide runtime settings, read once from the environment (and the `.env` file).
+
+    Attributes:
+        vosk_model_cache_bytes (int): Memory budget for loaded Vosk models. Least recently used
+                                      models are evicted once the budget is exceeded. 0 disables the limit.
+        preload_languages (Tuple[str, ...]): Languages whose Vosk models are loaded at startup.
+                                             The service reports ready only once all of them are loaded.
+        job_executor (str): The kind of worker pool that runs jobs ("thread" or "process").
+        job_workers (int): The number of job workers.
+        job_retention_seconds (int): How long finished jobs are kept before they are dropped.
+        max_upload_bytes (int): The largest accepted upload in bytes (0 means unlimited).
+        upload_chunk_bytes (int): The chunk size used to stream uploads to disk.
+        max_form_field_bytes (int): The largest accepted text form field in bytes (0 means unlimited).
+        pipeline_cache_size (int): How many built pipelines are kept for reuse.
+        asr_streaming (bool): Whether audio is streamed from FFmpeg into the transcriber instead of
+                              being converted to a WAV file first.
+        vad (bool): Whether non-speech audio is dropped before recognition, unless a request says otherwise.
+        asr_parallel (bool): Whether long audio is split at silences into chunks transcribed in parallel.
+        asr_workers (int): The number of worker processes of each parallel transcription pool.
+        asr_language_workers (Tuple[Tuple[str, int], ...]): The number of worker processes of the
+                                                            pools of some languages, overriding `asr_workers`.
+        asr_chunk_seconds (int): The target duration of the chunks of a parallel transcription.
+        transcode_segmented (bool): Whether long videos are split into segments that are transcoded in parallel.
+        transcode_workers (int): The most segments of a video transcoded at once.
+        transcode_segment_min_seconds (int): The shortest segment; videos shorter than two segments
+                                             are transcoded in a single pass.
+        live_max_sessions (int): The most live transcription sessions served at once (0 means unlimited).
+        live_workers (int): The number of recognizer threads shared by the live sessions.
+        live_queue_chunks (int): The most audio messages of a live session that wait for its recognizer.
+        live_max_chunk_bytes (int): The largest accepted audio message of a live session.
+        live_max_speed (float): How much faster than real time live clients may send audio (0 means unlimited).
+        live_burst_seconds (float): The audio a live client may send ahead of that pace.
+        llm_max_connections (int): The most connections each LLM client opens at once.
+        llm_max_keepalive_connections (int): The most idle connections each LLM client keeps open.
+        llm_keepalive_expiry_seconds (float): How long an idle LLM connection is kept open.
+        llm_http2 (bool): Whether the LLM clients negotiate HTTP/2 (requires the h2 package).
+        llm_timeout_seconds (float): The read timeout of LLM requests.
+        llm_base_url (str): A base URL that replaces the URL of every LLM provider, such as the local
+                            stub server (empty means each provider's own URL).
+        summary_map_reduce (bool): Whether texts longer than a chunk are summarized part by part and the
+                                   partial summaries then summarized together.
+        summary_chunk_tokens (int): The most tokens of a part.
+        summary_chunk_overlap_tokens (int): The tokens a part repeats from the previous one.
+        summary_concurrency (int): The number of parts summarized at once.
+        cache_directory (str): The directory of the persistent caches.
+        result_cache_ttl_seconds (int): How long cached summaries stay valid (0 means forever).
+        result_cache_max_bytes (int): The budget for cached summaries (0 means unlimited).
+        audio_cache_max_bytes (int): The budget for converted audio kept in `audios/` (0 means unlimited).
+        transcript_cache_max_bytes (int): The budget for transcriptions kept in `transcriptions/` (0 means unlimited).
+        trace_jobs (bool): Whether the steps of each job are traced.
+        trace_directory (str): The directory where job traces and profiles are written.
+        trace_max_bytes (int): The budget for the trace directory (0 means unlimited).
+        profile_sample_rate (float): The fraction of jobs that are also profiled with cProfile.
+        workspace_directory (str): The directory of the per-job scratch workspaces.
+        workspace_tmpfs_directory (str): A tmpfs directory for the workspaces of small jobs ("" disables it).
+        workspace_tmpfs_max_input_bytes (int): The largest input whose job gets a tmpfs workspace.
+        workspace_job_max_bytes (int): The disk quota of each job workspace (0 means unlimited).
+        workspace_max_bytes (int): The disk quota of all workspaces together (0 means unlimited).
+        workspace_ttl_seconds (int): The age after which left-behind workspaces and temporary files are deleted.
+        workspace_sweep_interval_seconds (int): The time between two sweeps for left-behind files.
+
+    Methods:
+        from_env: Builds the settings from environment variables.
+        asr_workers_for: Returns the number of worker processes of the transcription pool of a language.
+    """
+    vosk_model_cache_bytes: int
+    preload_languages: Tuple[str, ...]
+    job_executor: str
+    job_workers: int
+    job_retention_seconds: int
+    max_upload_bytes: int
+    upload_chunk_bytes: int
+    max_form_field_bytes: int
+    pipeline_cache_size: int
+    asr_streaming: bool
+    vad: bool
+    asr_parallel: bool
+    asr_workers: int
+    asr_language_workers: Tuple[Tuple[str, int], ...]
+    asr_chunk_seconds: int
+    transcode_segmented: bool
+    transcode_workers: int
+    transcode_segment_min_seconds: int
+    live_max_sessions: int
+    live_workers: int
+    live_queue_chunks: int
+    live_max_chunk_bytes: int
+    live_max_speed: float
+    live_burst_seconds: float
+    llm_max_connections: int
+    llm_max_keepalive_connections: int
+    llm_keepalive_expiry_seconds: float
+    llm_http2: bool
+    llm_timeout_seconds: float
+    llm_base_url: str
+    summary_map_reduce: bool
+    summary_chunk_tokens: int
+    summary_chunk_overlap_tokens: int
+    summary_concurrency: int
+    cache_directory: str
+    result_cache_ttl_seconds: int
+    result_cache_max_bytes: int
+    audio_cache_max_bytes: int
+    transcript_cache_max_bytes: int
+    trace_jobs: bool
+    trace_directory: str
+    trace_max_bytes: int
+    profile_sample_rate: float
+    workspace_directory: str
+    workspace_tmpfs_directory: str
+    workspace_tmpfs_max_input_bytes: int
+    workspace_job_max_bytes: int
+    workspace_max_bytes: int
+    workspace_ttl_seconds: int
+    workspace_sweep_interval_seconds: int
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        """
+        Builds the settings from environment variables.
+
+        Returns:
+            Settings: The settings for the current process.
+        """
+        return cls(
+            vosk_model_cache_bytes=_get_int("VOSK_MODEL_CACHE_MB", 8192) * 1024 * 1024,
+            preload_languages=_get_list("PRELOAD_LANGUAGES", ("English",)),
+            job_executor=os.getenv("JOB_EXECUTOR", "thread").strip().lower(),
+            job_workers=_get_int("JOB_WORKERS", os.cpu_count() or 1),
+            job_retention_seconds=_get_int("JOB_RETENTION_SECONDS", 3600),
+            max_upload_bytes=_get_int("MAX_UPLOAD_MB", 4096) * 1024 * 1024,
+            upload_chunk_bytes=_get_int("UPLOAD_CHUNK_KB", 1024) * 1024,
+            max_form_field_bytes=_get_int("MAX_FORM_FIELD_MB", 4) * 1024 * 1024,
+            pipeline_cache_size=_get_int("PIPELINE_CACHE_SIZE", 16),
+            asr_streaming=_get_bool("ASR_STREAMING", False),
+            vad=_get_bool("VAD", False),
+            asr_parallel=_get_bool("ASR_PARALLEL", False),
+            asr_workers=_get_int("ASR_WORKERS", os.cpu_count() or 1),
+            asr_language_workers=_get_int_map("ASR_LANGUAGE_WORKERS"),
+            asr_chunk_seconds=_get_int("ASR_CHUNK_SECONDS", 60),
+            transcode_segmented=_get_bool("TRANSCODE_SEGMENTED", False),
+            transcode_workers=_get_int("TRANSCODE_WORKERS", os.cpu_count() or 1),
+            transcode_segment_min_seconds=_get_int("TRANSCODE_SEGMENT_MIN_SECONDS", 300),
+            live_max_sessions=_get_int("LIVE_MAX_SESSIONS", 64),
+            live_workers=_get_int("LIVE_WORKERS", os.cpu_count() or 1),
+            live_queue_chunks=_get_int("LIVE_QUEUE_CHUNKS", 8),
+            live_max_chunk_bytes=_get_int("LIVE_MAX_CHUNK_KB", 64) * 1024,
+            live_max_speed=_get_float("LIVE_MAX_SPEED", 1.5),
+            live_burst_seconds=_get_float("LIVE_BURST_SECONDS", 5.0),
+            llm_max_connections=_get_int("LLM_MAX_CONNECTIONS", 100),
+            llm_max_keepalive_connections=_get_int("LLM_MAX_KEEPALIVE_CONNECTIONS", 20),
+            llm_keepalive_expiry_seconds=_get_float("LLM_KEEPALIVE_EXPIRY_SECONDS", 60.0),
+            llm_http2=_get_bool("LLM_HTTP2", False),
+            llm_timeout_seconds=_get_float("LLM_TIMEOUT_SECONDS", 600.0),
+            llm_base_url=os.getenv("LLM_BASE_URL", "").strip(),
+            summary_map_reduce=_get_bool("SUMMARY_MAP_REDUCE", False),
+            summary_chunk_tokens=_get_int("SUMMARY_CHUNK_TOKENS", 8000),
+            summary_chunk_overlap_tokens=_get_int("SUMMARY_CHUNK_OVERLAP_TOKENS", 200),
+            summary_concurrency=_get_int("SUMMARY_CONCURRENCY", 4),
+            cache_directory=os.getenv("CACHE_DIRECTORY", str(path_manager.get_base_directory() / "cache")),
+            result_cache_ttl_seconds=_get_int("RESULT_CACHE_TTL_SECONDS", 7 * 24 * 3600),
+            result_cache_max_bytes=_get_int("RESULT_CACHE_MAX_MB", 256) * 1024 * 1024,
+            audio_cache_max_bytes=_get_int("AUDIO_CACHE_MAX_MB", 4096) * 1024 * 1024,
+            transcript_cache_max_bytes=_get_int("TRANSCRIPT_CACHE_MAX_MB", 512) * 1024 * 1024,
+            trace_jobs=_get_bool("TRACE_JOBS", True),
+            trace_directory=os.getenv("TRACE_DIRECTORY", str(path_manager.get_base_directory() / "traces")),
+            trace_max_bytes=_get_int("TRACE_MAX_MB", 256) * 1024 * 1024,
+            profile_sample_rate=_get_float("PROFILE_SAMPLE_RATE", 0.0),
+            workspace_directory=os.getenv("WORKSPACE_DIRECTORY", str(path_manager.get_base_directory() / "workspaces")),
+            workspace_tmpfs_directory=os.getenv(
+                "WORKSPACE_TMPFS_DIRECTORY",
+                "/dev/shm/summarizer-workspaces" if os.path.isdir("/dev/shm") else ""
+            ).strip(),
+            workspace_tmpfs_max_input_bytes=_get_int("WORKSPACE_TMPFS_MAX_INPUT_MB", 16) * 1024 * 1024,
+            workspace_job_max_bytes=_get_int("WORKSPACE_JOB_MAX_MB", 4096) * 1024 * 1024,
+            workspace_max_bytes=_get_int("WORKSPACE_MAX_MB", 32768) * 1024 * 1024,
+            workspace_ttl_seconds=_get_int("WORKSPACE_TTL_SECONDS", 6 * 3600),
+            workspace_sweep_interval_seconds=_get_int("WORKSPACE_SWEEP_INTERVAL_SECONDS", 600),
+        )
+
+    def asr_workers_for(self, language: str) -> int:
+        """
+        Returns the number of worker processes of the transcription pool of a language.
+
+        Args:
+            language (str): The language of the pool.
+
+        Returns:
+            int: The `ASR_LANGUAGE_WORKERS` entry of the language, or `ASR_WORKERS`.
+        """
+        return dict(self.asr_language_workers).get(language, self.asr_workers)
+
+
+SETTINGS = Settings.from_env()
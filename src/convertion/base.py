@@ -1,21 +1,320 @@
 import os
-import io
 import sys
+import wave
+import tempfile
 import warnings
 import subprocess
 from enum import Enum
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple, Union
 
-from pydub import AudioSegment
-from moviepy import VideoFileClip
 from path_handler import PathManager
 
 path_manager = PathManager()
 sys.path.append(str(path_manager.get_base_directory()))
 
+from src.utils import Utility
 from src.config.config import AudioFormat
+from src.config.settings import SETTINGS
+from src.cache.base import ArtifactStore, hash_file, make_cache_key
+from src.media.base import MediaInfo, MediaProbe, PcmStream
 from src.convertion.registry import AudioConvertorRegistry, VideoToAudioRegistry
-from src.utils import Utility
+from src.pipeline.context import PipelineContext
+from src.workspace.base import QuotaExceededError, Workspace
+
+AUDIO_STORE = ArtifactStore(
+    str(path_manager.get_base_directory() / "audios"),
+    max_bytes=SETTINGS.audio_cache_max_bytes,
+    name="audios"
+)
+
+
+def _artifact_key(convertor: object, file_path: str, context: PipelineContext) -> str:
+    """
+    Returns the key of the converted audio of an input file in the audio store.
+
+    Args:
+        convertor (object): The convertor that produces the audio.
+        file_path (str): Path to the input file.
+        context (PipelineContext): The state of the pipeline run, whose content hash is used if known.
+
+    Returns:
+        str: The artifact key, derived from the input content and the convertor.
+    """
+    return make_cache_key(
+        content=context.content_hash or hash_file(file_path),
+        convertor=type(convertor).__name__,
+    )
+
+
+def _cached_audio(file_name: str, context: PipelineContext) -> Optional[str]:
+    """
+    Returns the stored converted audio of an input, if any.
+
+    With a workspace, the audio is hard-linked into it, so the transcriber can still open it
+    if the audio store evicts it meanwhile; the link goes away with the workspace.
+
+    Args:
+        file_name (str): The artifact key of the input.
+        context (PipelineContext): The state of the pipeline run.
+
+    Returns:
+        Optional[str]: Path to the WAV file, or None if it is not stored.
+    """
+    if context.workspace is not None:
+        return AUDIO_STORE.link(file_name, ".wav", context.workspace.directory)
+    return AUDIO_STORE.get(file_name, ".wav")
+
+
+def _is_transcribable(file_path: str) -> bool:
+    """
+    Checks whether a file is already a WAV file in the format the transcriber expects.
+
+    Only the WAV header is read: the file must be mono, 16-bit PCM, at 8000 Hz or 16000 Hz.
+
+    Args:
+        file_path (str): Path to the input file.
+
+    Returns:
+        bool: True if the file can be transcribed as it is.
+    """
+    try:
+        with wave.open(file_path, "rb") as wave_file:
+            return (
+                wave_file.getnchannels() == 1
+                and wave_file.getsampwidth() == 2
+                and wave_file.getframerate() in [8000, 16000]
+                and wave_file.getcomptype() == "NONE"
+            )
+    except (wave.Error, EOFError, OSError):
+        return False
+
+
+def _pass_through(file_path: str, file_name: str) -> str:
+    """
+    Adds a file that needs no conversion to the audio store without copying it.
+
+    The file is hard-linked into the store. Where hard links are not possible (e.g., across
+    file systems), the input is used in place and not stored: copying it would cost as much as
+    the conversion it skips, and the transcriber already caches its results by audio content.
+
+    Args:
+        file_path (str): Path to the input file.
+        file_name (str): Name of the output file (the artifact key of the input).
+
+    Returns:
+        str: Path to the WAV file.
+    """
+    link_path = AUDIO_STORE.temp_path(file_name, ".wav")
+    try:
+        os.link(file_path, link_path)
+    except OSError:
+        return file_path
+
+    return AUDIO_STORE.put(file_name, ".wav", link_path)
+
+
+def _convert_to_wav(
+    file_path: str,
+    file_name: str,
+    info: MediaInfo,
+    sample_rate: int = 16000,
+    workspace: Optional[Workspace] = None
+) -> str:
+    """
+    Converts the first audio stream of a media file to a mono 16-bit WAV file in the audio store.
+
+    FFmpeg decodes, downmixes and resamples the audio in a single streaming pass, so memory use
+    does not depend on the duration of the input. With a workspace, the file is written there
+    first, and FFmpeg stops as soon as it would exceed the disk quota of the job.
+
+    Args:
+        file_path (str): Path to the input file.
+        file_name (str): Name of the output file (the artifact key of the input).
+        info (MediaInfo): The metadata of the input file.
+        sample_rate (int): The sample rate of the output.
+        workspace (Optional[Workspace]): The workspace of the job, if any.
+
+    Returns:
+        str: Path to the converted WAV file in the audio store.
+
+    Raises:
+        QuotaExceededError: If the converted audio exceeds the disk quota of the job.
+        Exception: If FFmpeg encounters an error during the conversion.
+    """
+    if workspace is not None:
+        workspace.check()
+        output_path = workspace.path(f"{file_name}.wav")
+        limit = workspace.remaining_bytes()
+    else:
+        output_path = AUDIO_STORE.temp_path(file_name, ".wav")
+        limit = None
+    
+    ffmpeg_command = [
+        "ffmpeg",
+        "-v", "error",
+        "-nostdin",
+        "-y",
+        "-i", file_path,
+        "-map", f"0:{info.audio.index}",
+        "-vn",
+        "-ac", "1",
+        "-ar", str(sample_rate),
+        "-acodec", "pcm_s16le",
+    ]
+    if limit is not None:
+        ffmpeg_command += ["-fs", str(limit)]
+    ffmpeg_command.append(output_path)
+    
+    process = subprocess.Popen(ffmpeg_command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    stdout, stderr = process.communicate()
+
+    if process.returncode != 0:
+        if os.path.exists(output_path):
+            os.remove(output_path)
+        raise Exception(f"FFmpeg error: {stderr.decode()}")
+    
+    # FFmpeg stops quietly at the -fs limit, leaving a truncated file.
+    if limit is not None and os.path.getsize(output_path) >= limit:
+        os.remove(output_path)
+        raise QuotaExceededError(f"The converted audio exceeds the disk quota of the job {workspace.job_id}.")
+    
+    return AUDIO_STORE.put(file_name, ".wav", output_path)
+
+
+def _transcode_segment(ffmpeg_command: List[str]) -> Tuple[int, bytes]:
+    """
+    Runs the FFmpeg process that transcodes one segment of a media file.
+
+    Args:
+        ffmpeg_command (List[str]): The FFmpeg command line.
+
+    Returns:
+        Tuple[int, bytes]: The exit code and the error output of FFmpeg.
+    """
+    process = subprocess.run(ffmpeg_command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    return process.returncode, process.stderr
+
+
+def _convert_to_wav_segmented(
+    file_path: str,
+    file_name: str,
+    info: MediaInfo,
+    workers: int,
+    segment_min_seconds: int,
+    workspace: Optional[Workspace] = None
+) -> str:
+    """
+    Converts the first audio stream of a media file to a 16 kHz mono 16-bit WAV file in the audio
+    store, transcoding segments of the input in parallel.
+
+    The probed duration is split into up to `workers` segments of at least `segment_min_seconds`,
+    each decoded by its own FFmpeg process (seeking to its start with `-ss` and stopping after `-t`)
+    into a raw PCM file. The segments are then appended in order to the WAV file, each deleted once
+    copied, so memory use does not depend on the duration of the input. Segment boundaries fall on
+    whole samples, so the segments join without gaps or overlaps. Inputs too short for two segments,
+    or whose duration is unknown, are converted in a single pass.
+
+    Args:
+        file_path (str): Path to the input file.
+        file_name (str): Name of the output file (the artifact key of the input).
+        info (MediaInfo): The metadata of the input file.
+        workers (int): The most segments transcoded at once.
+        segment_min_seconds (int): The shortest segment, in seconds.
+        workspace (Optional[Workspace]): The workspace of the job, if any.
+
+    Returns:
+        str: Path to the converted WAV file in the audio store.
+
+    Raises:
+        QuotaExceededError: If the converted audio exceeds the disk quota of the job.
+        Exception: If FFmpeg encounters an error during the conversion.
+    """
+    sample_rate = PcmStream.sample_rate
+    duration = info.duration or info.audio.duration or 0
+    segments = min(workers, int(duration // max(segment_min_seconds, 1)))
+    if segments < 2:
+        return _convert_to_wav(file_path, file_name, info, sample_rate, workspace)
+
+    if workspace is not None:
+        workspace.check()
+        scratch_directory = None
+        segment_directory = workspace.directory
+        output_path = workspace.path(f"{file_name}.wav")
+        # The segments and the WAV file briefly coexist while the segments are appended.
+        remaining = workspace.remaining_bytes()
+        limit = remaining // (segments + 1) if remaining is not None else None
+    else:
+        scratch_directory = tempfile.TemporaryDirectory(prefix="segments-")
+        segment_directory = scratch_directory.name
+        output_path = AUDIO_STORE.temp_path(file_name, ".wav")
+        limit = None
+
+    total_frames = int(duration * sample_rate)
+    boundaries = [round(total_frames * k / segments) for k in range(segments + 1)]
+    segment_paths = [os.path.join(segment_directory, f"{file_name}.{k}.pcm") for k in range(segments)]
+
+    commands = []
+    for k, segment_path in enumerate(segment_paths):
+        ffmpeg_command = [
+            "ffmpeg",
+            "-v", "error",
+            "-nostdin",
+            "-y",
+            "-ss", f"{boundaries[k] / sample_rate:.6f}",
+        ]
+        # The last segment runs to the end, in case the probed duration is short.
+        if k < segments - 1:
+            ffmpeg_command += ["-t", f"{(boundaries[k + 1] - boundaries[k]) / sample_rate:.6f}"]
+        ffmpeg_command += [
+            "-i", file_path,
+            "-map", f"0:{info.audio.index}",
+            "-vn",
+            "-ac", "1",
+            "-ar", str(sample_rate),
+            "-acodec", "pcm_s16le",
+            "-f", "s16le",
+        ]
+        if limit is not None:
+            ffmpeg_command += ["-fs", str(limit)]
+        ffmpeg_command.append(segment_path)
+        commands.append(ffmpeg_command)
+
+    try:
+        # The work happens in the FFmpeg processes; the threads only wait for them.
+        with ThreadPoolExecutor(max_workers=segments, thread_name_prefix="transcode") as executor:
+            outcomes = list(executor.map(_transcode_segment, commands))
+
+        for returncode, stderr in outcomes:
+            if returncode != 0:
+                raise Exception(f"FFmpeg error: {stderr.decode()}")
+
+        # FFmpeg stops quietly at the -fs limit, leaving a truncated segment.
+        if limit is not None and any(os.path.getsize(path) >= limit for path in segment_paths):
+            raise QuotaExceededError(f"The converted audio exceeds the disk quota of the job {workspace.job_id}.")
+
+        with wave.open(output_path, "wb") as wave_file:
+            wave_file.setnchannels(1)
+            wave_file.setsampwidth(2)
+            wave_file.setframerate(sample_rate)
+            for segment_path in segment_paths:
+                with open(segment_path, "rb") as segment:
+                    for chunk in iter(lambda: segment.read(1024 * 1024), b""):
+                        wave_file.writeframesraw(chunk)
+                os.remove(segment_path)
+    except BaseException:
+        if os.path.exists(output_path):
+            os.remove(output_path)
+        raise
+    finally:
+        for segment_path in segment_paths:
+            if os.path.exists(segment_path):
+                os.remove(segment_path)
+        if scratch_directory is not None:
+            scratch_directory.cleanup()
+
+    return AUDIO_STORE.put(file_name, ".wav", output_path)
 
 
 class AudioConvertor(ABC):
@@ -25,47 +324,56 @@ class AudioConvertor(ABC):
     This class provides a template for converting audio files to a specific format.
     Subclasses must implement the `_convert` and `run` methods.
 
+    Attributes:
+        stage (str): The name of the pipeline stage this step performs.
+
     Methods:
         _validate_audio: Validates the input audio file.
         _convert: Converts the audio file (to be implemented by subclasses).
         run: Executes the conversion process (to be implemented by subclasses).
     """
     
+    stage = "converting"
+    
     def __init__(self):
         """Initializes the audio convertor."""
         ...
     
-    def _validate_audio(self, file_path: str) -> AudioSegment:
+    def _validate_audio(self, file_path: str) -> MediaInfo:
         """
         Validates the input audio file.
 
+        Only the container headers are read (with ffprobe); the audio is not decoded.
+
         Args:
             file_path (str): Path to the audio file.
 
         Returns:
-            AudioSegment: The validated audio segment.
+            MediaInfo: The metadata of the audio file.
 
         Raises:
             FileNotFoundError: If the file does not exist.
             ValueError: If the file is not a valid audio file.
         """
-        if not os.path.exists(file_path):
-            raise FileNotFoundError("The file does not exist!")
         try:
-            audio = AudioSegment.from_file(file_path)
-        except Exception as e:
+            info = MediaProbe.probe(file_path)
+        except ValueError as e:
             raise ValueError(f"The file is not a valid audio file: {e}")
+        if info.audio is None:
+            raise ValueError("The file is not a valid audio file: it has no audio stream.")
 
-        return audio
+        return info
     
     @abstractmethod
-    def _convert(self) -> str:
+    def _convert(self, file_path: str, file_name: str, info: MediaInfo, workspace: Optional[Workspace] = None) -> str:
         """
         Converts the audio file to the target format.
 
         Args:
-            audio (AudioSegment): The audio segment to convert.
+            file_path (str): Path to the input audio file.
             file_name (str): The name of the output file.
+            info (MediaInfo): The metadata of the audio file.
+            workspace (Optional[Workspace]): The workspace of the job, if any.
 
         Returns:
             str: Path to the converted audio file.
@@ -73,12 +381,13 @@ class AudioConvertor(ABC):
         ...
     
     @abstractmethod
-    def run(self, file_path: str) -> str:
+    def run(self, file_path: str, context: Optional[PipelineContext] = None) -> str:
         """
         Executes the audio conversion process.
 
         Args:
             file_path (str): Path to the input audio file.
+            context (Optional[PipelineContext]): The state of the pipeline run, if any.
 
         Returns:
             str: Path to the converted audio file.
@@ -99,48 +408,63 @@ class AudioToWavConvertor(AudioConvertor):
         run: Executes the conversion process.
     """
     
-    def _convert(self, audio: AudioSegment, file_name: str) -> str:
+    def _convert(self, file_path: str, file_name: str, info: MediaInfo, workspace: Optional[Workspace] = None) -> str:
         """
         Converts the audio file to WAV format.
 
+        The audio is streamed through FFmpeg rather than decoded into memory, so long recordings
+        are converted in constant memory.
+
         Args:
-            audio (AudioSegment): The audio segment to convert.
-            file_name (str): The name of the output file.
+            file_path (str): Path to the input audio file.
+            file_name (str): The name of the output file (the artifact key of the input).
+            info (MediaInfo): The metadata of the audio file.
+            workspace (Optional[Workspace]): The workspace of the job, if any.
 
         Returns:
-            str: Path to the converted WAV file.
+            str: Path to the converted WAV file in the audio store.
         """
+        audio = info.audio
         if audio.channels != 1:
             warnings.warn("The audio file is not mono. Converting to mono...", UserWarning)
-            audio = audio.set_channels(1)
         
-        if audio.sample_width != 2:
-            warnings.warn("The audio file is not 16-bit. Converting to 16-bit...", UserWarning)
-            audio = audio.set_sample_width(2)
+        if audio.codec != "pcm_s16le":
+            warnings.warn("The audio file is not 16-bit PCM. Converting to 16-bit...", UserWarning)
         
-        if audio.frame_rate not in [8000, 16000]:
+        sample_rate = audio.sample_rate
+        if sample_rate not in [8000, 16000]:
             warnings.warn("The audio file sample rate is not 8000 Hz or 16000 Hz. Resampling to 16000 Hz...", UserWarning)
-            audio = audio.set_frame_rate(16000)
+            sample_rate = 16000
         
-        output_path = str(path_manager.get_base_directory() / f"audios/{file_name}.wav")
-        audio.export(output_path, format="wav")
-        
-        return output_path
+        return _convert_to_wav(file_path, file_name, info, sample_rate, workspace)
     
-    def run(self, file_path: str) -> str:
+    def run(self, file_path: str, context: Optional[PipelineContext] = None) -> str:
         """
         Executes the audio-to-WAV conversion process.
 
+        The converted audio is stored by the content of the input, so an input that was already
+        converted is not converted again. Inputs that already are mono 16-bit 8/16 kHz WAV files
+        are not converted at all.
+
         Args:
             file_path (str): Path to the input audio file.
+            context (Optional[PipelineContext]): The state of the pipeline run, if any.
 
         Returns:
             str: Path to the converted WAV file.
         """
-        file_name = Utility.get_file_name(file_path)
-        audio = self._validate_audio(file_path)
+        context = context or PipelineContext()
+        file_name = _artifact_key(self, file_path, context)
+        cached_path = _cached_audio(file_name, context) if context.use_cache else None
+        if cached_path:
+            return cached_path
+        
+        if _is_transcribable(file_path):
+            return _pass_through(file_path, file_name)
+        
+        context.media_info = self._validate_audio(file_path)
         
-        return self._convert(audio, file_name)
+        return self._convert(file_path, file_name, context.media_info, context.workspace)
 
 
 class VideoToAudio(ABC):
@@ -150,44 +474,55 @@ class VideoToAudio(ABC):
     This class provides a template for extracting audio from video files.
     Subclasses must implement the `_convert` and `run` methods.
 
+    Attributes:
+        stage (str): The name of the pipeline stage this step performs.
+
     Methods:
         _validate_video: Validates the input video file.
         _convert: Extracts audio from the video file (to be implemented by subclasses).
         run: Executes the conversion process (to be implemented by subclasses).
     """
     
+    stage = "converting"
+    
     def __init__(self):
         """Initializes the video-to-audio convertor."""
         ...
     
-    def _validate_video(self, file_path: str) -> None:
+    def _validate_video(self, file_path: str) -> MediaInfo:
         """
         Validates the input video file.
 
+        Only the container headers are read (with ffprobe), so validation is cheap even for long videos.
+
         Args:
             file_path (str): Path to the video file.
 
+        Returns:
+            MediaInfo: The metadata of the video file.
+
         Raises:
             FileNotFoundError: If the file does not exist.
-            ValueError: If the file is not a valid video file.
+            ValueError: If the file is not a valid video file or has no audio.
         """
-        if not os.path.exists(file_path):
-            raise FileNotFoundError("The file does not exist!")
-        try:
-            video = VideoFileClip(file_path)
-        except Exception as e:
-            raise ValueError(f"The file is not a valid video file: {e}")
+        info = MediaProbe.probe(file_path)
+        if not info.has_video:
+            raise ValueError("The file is not a valid video file: it has no video stream.")
+        if info.audio is None:
+            raise ValueError("The video file has no audio stream!")
 
-        video.close()
+        return info
     
     @abstractmethod
-    def _convert(self, file_path: str, file_name: str) -> str:
+    def _convert(self, file_path: str, file_name: str, info: MediaInfo, workspace: Optional[Workspace] = None) -> str:
         """
         Extracts audio from the video file.
 
         Args:
             file_path (str): Path to the input video file.
             file_name (str): Name of the output audio file.
+            info (MediaInfo): The metadata of the video file.
+            workspace (Optional[Workspace]): The workspace of the job, if any.
 
         Returns:
             str: Path to the extracted audio file.
@@ -195,12 +530,13 @@ class VideoToAudio(ABC):
         ...
     
     @abstractmethod
-    def run(self, file_path: str) -> str:
+    def run(self, file_path: str, context: Optional[PipelineContext] = None) -> str:
         """
         Executes the video-to-audio conversion process.
 
         Args:
             file_path (str): Path to the input video file.
+            context (Optional[PipelineContext]): The state of the pipeline run, if any.
 
         Returns:
             str: Path to the extracted audio file.
@@ -214,57 +550,128 @@ class VideoToWavConvertor(VideoToAudio):
     Extracts audio from video files and saves it in WAV format.
 
     This class uses FFmpeg to extract audio from video files and ensures the output
-    meets specific requirements (mono, 16-bit, 16 kHz sample rate).
+    meets specific requirements (mono, 16-bit, 16 kHz sample rate). Long videos can be split
+    into segments that are transcoded in parallel, one FFmpeg process per segment.
+
+    Attributes:
+        workers (int): The most segments of a video transcoded at once (1 transcodes in a single pass).
+        segment_min_seconds (int): The shortest segment, in seconds.
 
     Methods:
         _convert: Extracts audio from the video file and saves it as WAV.
         run: Executes the video-to-WAV conversion process.
     """
     
-    def _convert(self, file_path: str, file_name: str) -> str:
+    def __init__(self, workers: Optional[int] = None, segment_min_seconds: Optional[int] = None):
+        """
+        Initializes the video-to-WAV convertor.
+
+        Args:
+            workers (Optional[int]): The most segments transcoded at once. Defaults to
+                                     `TRANSCODE_WORKERS` if `TRANSCODE_SEGMENTED` is set, else 1.
+            segment_min_seconds (Optional[int]): The shortest segment, in seconds. Defaults to
+                                                 `TRANSCODE_SEGMENT_MIN_SECONDS`.
+        """
+        super().__init__()
+        if workers is None:
+            workers = SETTINGS.transcode_workers if SETTINGS.transcode_segmented else 1
+        self.workers = max(workers, 1)
+        self.segment_min_seconds = segment_min_seconds or SETTINGS.transcode_segment_min_seconds
+    
+    def _convert(self, file_path: str, file_name: str, info: MediaInfo, workspace: Optional[Workspace] = None) -> str:
         """
         Extracts audio from the video file and saves it as WAV.
 
+        Only the first audio stream is decoded; the video streams are skipped. With more than one
+        worker, long videos are transcoded in parallel segments.
+
         Args:
             file_path (str): Path to the input video file.
-            file_name (str): Name of the output audio file.
+            file_name (str): Name of the output audio file (the artifact key of the input).
+            info (MediaInfo): The metadata of the video file.
+            workspace (Optional[Workspace]): The workspace of the job, if any.
 
         Returns:
-            str: Path to the extracted WAV file.
+            str: Path to the extracted WAV file in the audio store.
 
         Raises:
+            QuotaExceededError: If the extracted audio exceeds the disk quota of the job.
             Exception: If FFmpeg encounters an error during the conversion.
         """
-        output_path = str(path_manager.get_base_directory() / f"audios/{file_name}.wav")
-        
-        ffmpeg_command = [
-            "ffmpeg",
-            "-i", file_path,
-            "-ac", "1",
-            "-ar", "16000",
-            "-acodec", "pcm_s16le",
-            output_path          
-        ]
-        
-        process = subprocess.Popen(ffmpeg_command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        stdout, stderr = process.communicate()
-
-        if process.returncode != 0:
-            raise Exception(f"FFmpeg error: {stderr.decode()}")
-        
-        return output_path
+        if self.workers > 1:
+            return _convert_to_wav_segmented(
+                file_path, file_name, info, self.workers, self.segment_min_seconds, workspace
+            )
+        return _convert_to_wav(file_path, file_name, info, workspace=workspace)
     
-    def run(self, file_path: str) -> str:
+    def run(self, file_path: str, context: Optional[PipelineContext] = None) -> str:
         """
         Executes the video-to-WAV conversion process.
 
+        The extracted audio is stored by the content of the input, so a video whose audio was
+        already extracted is not converted again.
+
         Args:
             file_path (str): Path to the input video file.
+            context (Optional[PipelineContext]): The state of the pipeline run, if any.
 
         Returns:
             str: Path to the extracted WAV file.
         """
-        file_name = Utility.get_file_name(file_path)
-        self._validate_video(file_path)
+        context = context or PipelineContext()
+        file_name = _artifact_key(self, file_path, context)
+        cached_path = _cached_audio(file_name, context) if context.use_cache else None
+        if cached_path:
+            return cached_path
+        
+        context.media_info = self._validate_video(file_path)
+        
+        return self._convert(file_path, file_name, context.media_info, context.workspace)
+
+
+class PcmStreamDecoder:
+    """
+    Decodes audio or video files into a stream of 16 kHz mono 16-bit PCM.
+
+    Unlike the convertors, no WAV file is written: the transcriber reads the PCM from the FFmpeg
+    pipe while FFmpeg is still decoding, so decoding and recognition overlap and memory stays
+    constant whatever the duration of the input. FFmpeg only starts when the stream is first read,
+    so nothing is decoded when the transcription is already stored.
+
+    Attributes:
+        stage (str): The name of the pipeline stage this step performs.
+
+    Methods:
+        run: Probes the input and returns its PCM stream.
+    """
+    
+    stage = "converting"
+    
+    def run(self, file_path: str, context: Optional[PipelineContext] = None) -> Union[PcmStream, str]:
+        """
+        Probes the input and returns its PCM stream.
+
+        WAV files that already are in the format of the transcriber are passed through as they
+        are, since the transcriber reads them directly.
+
+        Args:
+            file_path (str): Path to the input audio or video file.
+            context (Optional[PipelineContext]): The state of the pipeline run, if any.
+
+        Returns:
+            Union[PcmStream, str]: The decoded audio, keyed by the content of the input, or the
+                                   path of an input that needs no decoding.
+
+        Raises:
+            FileNotFoundError: If the file does not exist.
+            ValueError: If the file is not a valid media file or has no audio.
+        """
+        context = context or PipelineContext()
+        if Utility.get_file_format(file_path) == "wav" and _is_transcribable(file_path):
+            return file_path
+        
+        context.media_info = MediaProbe.probe(file_path)
+        if context.media_info.audio is None:
+            raise ValueError("The file has no audio stream!")
         
-        return self._convert(file_path, file_name)
\ No newline at end of file
+        return PcmStream(file_path, _artifact_key(self, file_path, context), context.media_info)
@@ -0,0 +1,640 @@
+import os
+import sys
+import json
+import time
+import uuid
+import hashlib
+import threading
+import warnings
+from enum import Enum
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, ContextManager, Dict, Iterator, Optional
+
+from path_handler import PathManager
+
+path_manager = PathManager()
+sys.path.append(str(path_manager.get_base_directory()))
+
+from src.config.config import (
+    SummerizerConfig,
+    PipelineConfig,
+    Prompt,
+    Client,
+    AudioFormat,
+    Language,
+    Provider,
+    PipelineType,
+)
+from src.config.settings import SETTINGS
+from src.cache.base import ArtifactStore, ResultCache, make_cache_key
+from src.metrics.base import MULTIPROCESS_DIRECTORY, init_worker_metrics
+from src.pipeline.base import PIPELINE_VERSION
+from src.pipeline.context import PipelineContext
+from src.pipeline.hooks import ProfilerHook, SpanRecorder
+from src.pipeline.factory import SummarizingPipelineFactory
+from src.transcription.base import TRANSCRIPT_STORE, load_transcript_segments
+from src.transcription.segments import segments_text, slice_segments
+from src.workspace.base import QuotaExceededError, Workspace, WorkspaceManager
+
+RESULT_CACHE = ResultCache(
+    os.path.join(SETTINGS.cache_directory, "results.sqlite"),
+    ttl_seconds=SETTINGS.result_cache_ttl_seconds,
+    max_bytes=SETTINGS.result_cache_max_bytes,
+)
+
+TRACE_STORE = ArtifactStore(
+    SETTINGS.trace_directory,
+    max_bytes=SETTINGS.trace_max_bytes,
+    name="traces",
+)
+
+WORKSPACES = WorkspaceManager.from_settings()
+
+
+@dataclass(frozen=True)
+class SummarizationRequest:
+    """
+    A picklable description of a summarization request.
+
+    The request only holds plain values, so it can be sent to a worker process, which then
+    builds (or reuses) the pipeline itself.
+
+    Attributes:
+        input_data (str): The text to summarize or the path to the input file.
+        pipeline_type (str): The type of pipeline (e.g., "Video", "Audio", "Text").
+        language (str): The language of the input.
+        audio_format (str): The audio format for conversion.
+        prompt (str): The summarization prompt type.
+        client (str): The LLM client to use.
+        model (str): The model to use for summarization.
+        content_hash (Optional[str]): The SHA-256 digest of the uploaded file or text, if known.
+        vad (Optional[bool]): Whether non-speech audio is dropped before recognition (None uses the `VAD` setting).
+
+    Methods:
+        to_pipeline_config: Builds the pipeline configuration for the request.
+        uses_vad: Checks whether non-speech audio is dropped before recognition.
+        cache_key: Returns the key of the request in the result cache.
+    """
+    input_data: str
+    pipeline_type: str
+    language: str
+    audio_format: str
+    prompt: str
+    client: str
+    model: str
+    content_hash: Optional[str] = None
+    vad: Optional[bool] = None
+
+    def to_pipeline_config(self) -> PipelineConfig:
+        """
+        Builds the pipeline configuration for the request.
+
+        Returns:
+            PipelineConfig: The configuration of the pipeline that serves the request.
+
+        Raises:
+            ValueError: If one of the values is not supported.
+        """
+        summerizer_config = SummerizerConfig(
+            prompt=Prompt(self.prompt),
+            client=Client(self.client),
+            model=self.model,
+        )
+
+        return PipelineConfig(
+            summerizer_config=summerizer_config,
+            audio_format=AudioFormat(self.audio_format),
+            provider=Provider.VOSK,
+            language=Language(self.language),
+            pipeline_type=PipelineType(self.pipeline_type),
+            streaming=SETTINGS.asr_streaming,
+            vad=self.uses_vad(),
+        )
+
+    def uses_vad(self) -> bool:
+        """
+        Checks whether non-speech audio is dropped before recognition for the request.
+
+        Returns:
+            bool: The option of the request, or the `VAD` setting if the request has none.
+        """
+        return SETTINGS.vad if self.vad is None else self.vad
+
+    def cache_key(self) -> Optional[str]:
+        """
+        Returns the key of the request in the result cache.
+
+        The key covers the input content and every option that changes the summary, so requests
+        for the same content with other options are cached separately.
+
+        Returns:
+            Optional[str]: The cache key, or None if the content hash is unknown.
+        """
+        if self.content_hash is None:
+            return None
+
+        return make_cache_key(
+            content=self.content_hash,
+            pipeline_type=self.pipeline_type,
+            language=self.language,
+            audio_format=self.audio_format,
+            prompt=self.prompt,
+            client=self.client,
+            model=self.model,
+            version=PIPELINE_VERSION,
+            # Only added when enabled, so the keys of existing summaries stay valid.
+            **({"vad": True} if self.uses_vad() else {}),
+            **({"map_reduce": SETTINGS.summary_chunk_tokens} if SETTINGS.summary_map_reduce else {}),
+        )
+
+
+def lookup_summary(request: SummarizationRequest) -> Optional[str]:
+    """
+    Returns the cached summary of a request, if any.
+
+    Args:
+        request (SummarizationRequest): The request to look up.
+
+    Returns:
+        Optional[str]: The cached summary, or None on a miss.
+    """
+    key = request.cache_key()
+    return RESULT_CACHE.get(key) if key else None
+
+
+def lookup_transcript(request: SummarizationRequest) -> Optional[str]:
+    """
+    Returns the key of the stored transcription a request was summarized from, if any.
+
+    Args:
+        request (SummarizationRequest): The request to look up.
+
+    Returns:
+        Optional[str]: The transcript id, or None for text requests and requests not served yet.
+    """
+    key = request.cache_key()
+    return TRANSCRIPT_STORE.read_text(key, ".ref") if key else None
+
+
+def remember_transcript(request: SummarizationRequest, context: PipelineContext) -> None:
+    """
+    Records which stored transcription a request was summarized from, so requests answered from
+    the result cache can still report it.
+
+    Args:
+        request (SummarizationRequest): The request that was served.
+        context (PipelineContext): The state of its run.
+    """
+    key = request.cache_key()
+    if key and context.transcript_id:
+        TRANSCRIPT_STORE.put_text(key, ".ref", context.transcript_id)
+
+
+def build_range_request(
+    transcript_id: str,
+    start_ms: int,
+    end_ms: Optional[int],
+    language: str,
+    prompt: str,
+    client: str,
+    model: str,
+) -> Optional[SummarizationRequest]:
+    """
+    Builds a request that summarizes a time range of a stored transcription.
+
+    The range is cut from the stored word timings, so no audio is read or transcribed again. The
+    text of the range is summarized (and cached) like any text input.
+
+    Args:
+        transcript_id (str): The key of the stored transcription.
+        start_ms (int): The start of the range, in milliseconds.
+        end_ms (Optional[int]): The end of the range, in milliseconds (None for the end of the audio).
+        language (str): The language of the transcription.
+        prompt (str): The summarization prompt type.
+        client (str): The LLM client to use.
+        model (str): The model to use for summarization.
+
+    Returns:
+        Optional[SummarizationRequest]: The request, or None if there are no timings for the transcript id.
+
+    Raises:
+        ValueError: If the range is invalid or contains no speech.
+    """
+    segments = load_transcript_segments(transcript_id)
+    if segments is None:
+        return None
+
+    text = segments_text(slice_segments(segments, start_ms, end_ms))
+    if not text:
+        raise ValueError("There is no speech in the requested time range.")
+
+    return SummarizationRequest(
+        input_data=text,
+        pipeline_type=PipelineType.TEXT.value,
+        language=language,
+        audio_format=AudioFormat.WAV.value,
+        prompt=prompt,
+        client=client,
+        model=model,
+        content_hash=hashlib.sha256(text.encode("UTF-8")).hexdigest(),
+    )
+
+
+def open_workspace(request: SummarizationRequest, job_id: Optional[str] = None) -> ContextManager[Optional[Workspace]]:
+    """
+    Provides a scratch workspace for the run of a request, deleted once the run is over.
+
+    Text requests produce no intermediate files, so they get no workspace.
+
+    Args:
+        request (SummarizationRequest): The request to serve.
+        job_id (Optional[str]): The identifier of the job the run belongs to, if any.
+
+    Returns:
+        ContextManager[Optional[Workspace]]: The workspace of the run (None for text requests).
+
+    Raises:
+        QuotaExceededError: If the workspaces already use the global quota.
+    """
+    if request.pipeline_type == PipelineType.TEXT.value:
+        return nullcontext()
+
+    input_bytes = os.path.getsize(request.input_data) if os.path.isfile(request.input_data) else None
+    return WORKSPACES.open(job_id, input_bytes)
+
+
+def run_summarization(request: SummarizationRequest, job_id: Optional[str] = None, skip_lookup: bool = False) -> str:
+    """
+    Returns the cached summary of a request, or builds the pipeline, runs it and caches the summary.
+
+    The transcription the summary was made from is recorded (see `lookup_transcript`).
+
+    Runs that belong to a job are traced: the spans of their steps are saved as `{job_id}.json`
+    in the trace store, and a sampled fraction of them is also profiled to `{job_id}.prof`.
+
+    This function is the unit of work submitted to the job workers, so it must stay importable
+    at module level.
+
+    Args:
+        request (SummarizationRequest): The request to serve.
+        job_id (Optional[str]): The identifier of the job the run belongs to, if any.
+        skip_lookup (bool): Whether the result cache was already checked for the request (e.g., by
+                            an endpoint that reports hits), so the pipeline runs right away.
+
+    Returns:
+        str: The summary.
+    """
+    if not skip_lookup:
+        summary = lookup_summary(request)
+        if summary is not None:
+            return summary
+
+    pipeline = SummarizingPipelineFactory.create(request.to_pipeline_config())
+    context = PipelineContext(content_hash=request.content_hash, job_id=job_id)
+
+    recorder = None
+    if job_id and SETTINGS.trace_jobs:
+        recorder = SpanRecorder()
+        context.hooks.append(recorder)
+        if ProfilerHook.sampled(SETTINGS.profile_sample_rate):
+            context.hooks.append(ProfilerHook(TRACE_STORE.temp_path(job_id, ".prof")))
+
+    try:
+        with open_workspace(request, job_id) as workspace:
+            context.workspace = workspace
+            summary = pipeline.summarize(request.input_data, context)
+    finally:
+        for hook in context.hooks:
+            # No profile is written if the run never started (e.g., the workspace quota is exceeded)
+            if isinstance(hook, ProfilerHook) and os.path.exists(hook.path):
+                TRACE_STORE.put(job_id, ".prof", hook.path)
+        if recorder is not None:
+            TRACE_STORE.put(job_id, ".json", recorder.export(TRACE_STORE.temp_path(job_id, ".json")))
+
+    remember_transcript(request, context)
+    key = request.cache_key()
+    if key:
+        RESULT_CACHE.set(key, summary)
+
+    return summary
+
+
+def load_trace(job_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Returns the trace of a job.
+
+    Args:
+        job_id (str): The identifier of the job.
+
+    Returns:
+        Optional[Dict[str, Any]]: The trace in the Trace Event Format, or None if the job was not traced.
+    """
+    trace = TRACE_STORE.read_text(job_id, ".json")
+    if trace is None:
+        return None
+
+    return json.loads(trace)
+
+
+def stream_summarization(request: SummarizationRequest) -> Iterator[Dict[str, Any]]:
+    """
+    Builds the pipeline for a request and yields the events of its run as they happen.
+
+    Args:
+        request (SummarizationRequest): The request to serve.
+
+    Yields:
+        Dict[str, Any]: The events of the run, ending with a "done" or an "error" event. On a cache
+                        hit, the "done" event is the only one and carries `"cached": True`. The
+                        "done" event carries the transcript id of audio and video inputs.
+    """
+    try:
+        summary = lookup_summary(request)
+        if summary is not None:
+            yield {"event": "done", "summary": summary, "cached": True, "transcript_id": lookup_transcript(request)}
+            return
+
+        pipeline = SummarizingPipelineFactory.create(request.to_pipeline_config())
+    except Exception as e:
+        yield {"event": "error", "detail": str(e), "status": getattr(e, "status_code", 500)}
+        return
+
+    try:
+        with open_workspace(request) as workspace:
+            context = PipelineContext(content_hash=request.content_hash, workspace=workspace)
+            for event in pipeline.stream(request.input_data, context):
+                if event["event"] == "done":
+                    remember_transcript(request, context)
+                    key = request.cache_key()
+                    if key:
+                        RESULT_CACHE.set(key, event["summary"])
+                    event["cached"] = False
+                    event["transcript_id"] = context.transcript_id
+                yield event
+    except QuotaExceededError as e:
+        yield {"event": "error", "detail": str(e), "status": 507}
+
+
+class JobStatus(Enum):
+    """
+    Enumeration for job states.
+
+    Attributes:
+        PENDING (str): The job is waiting for a free worker.
+        RUNNING (str): The job is being processed.
+        SUCCEEDED (str): The job finished and its summary is available.
+        FAILED (str): The job raised an error.
+        CANCELLED (str): The job was cancelled before it finished.
+    """
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+@dataclass
+class Job:
+    """
+    A summarization job tracked by the `JobManager`.
+
+    Attributes:
+        id (str): The unique identifier of the job.
+        status (JobStatus): The current state of the job.
+        created_at (float): The submission time (UNIX timestamp).
+        finished_at (Optional[float]): The completion time (UNIX timestamp), if finished.
+        result (Optional[str]): The summary, if the job succeeded.
+        error (Optional[str]): The error message, if the job failed.
+        error_status (Optional[int]): The HTTP status the error maps to, if the job failed (e.g., 413
+                                      for a text too long for the model, 500 for unexpected errors).
+        transcript_id (Optional[str]): The key of the stored transcription of the input, once the
+                                       job succeeded (None for text input).
+        cleanup_path (Optional[str]): A temporary file to delete once the job is over.
+        request (Optional[SummarizationRequest]): The request the job serves.
+
+    Methods:
+        is_finished: Checks whether the job reached a final state.
+        to_dict: Returns the public representation of the job.
+    """
+    id: str
+    status: JobStatus = JobStatus.PENDING
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+    result: Optional[str] = None
+    error: Optional[str] = None
+    error_status: Optional[int] = None
+    transcript_id: Optional[str] = None
+    cleanup_path: Optional[str] = None
+    request: Optional[SummarizationRequest] = field(default=None, repr=False)
+    future: Optional[Future] = field(default=None, repr=False)
+
+    def is_finished(self) -> bool:
+        """
+        Checks whether the job reached a final state.
+
+        Returns:
+            bool: True if the job succeeded, failed or was cancelled.
+        """
+        return self.status in (JobStatus.SUCCEEDED, JobStatus.FAILED, JobStatus.CANCELLED)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Returns the public representation of the job.
+
+        Returns:
+            Dict[str, Any]: The identifier, state, timestamps, summary, transcript id and error (with its
+                            HTTP status) of the job.
+        """
+        return {
+            "job_id": self.id,
+            "status": self.status.value,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "summary": self.result,
+            "transcript_id": self.transcript_id,
+            "error": self.error,
+            "error_status": self.error_status,
+        }
+
+
+class JobManager:
+    """
+    Runs summarization jobs on a background worker pool.
+
+    Jobs are submitted to a thread or process pool so that the event loop of the web server
+    never blocks on the (synchronous) pipeline. Finished jobs are kept for a retention period
+    and then dropped.
+
+    Attributes:
+        executor (Executor): The worker pool that runs the jobs.
+        retention_seconds (int): How long finished jobs are kept.
+
+    Methods:
+        from_settings: Creates a job manager configured from the process settings.
+        submit: Submits a summarization request as a new job.
+        get: Returns a job by its identifier.
+        cancel: Cancels a job and forgets it.
+        count: Returns the number of tracked jobs with a status.
+        shutdown: Stops the worker pool.
+    """
+
+    def __init__(self, executor: Executor, retention_seconds: int):
+        """
+        Initializes the job manager.
+
+        Args:
+            executor (Executor): The worker pool that runs the jobs.
+            retention_seconds (int): How long finished jobs are kept.
+        """
+        self.executor = executor
+        self.retention_seconds = retention_seconds
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls) -> "JobManager":
+        """
+        Creates a job manager configured from the process settings.
+
+        Returns:
+            JobManager: A job manager backed by a thread or process pool.
+
+        Raises:
+            ValueError: If the configured executor type is not supported.
+        """
+        if SETTINGS.job_executor == "thread":
+            executor = ThreadPoolExecutor(max_workers=SETTINGS.job_workers, thread_name_prefix="job")
+        elif SETTINGS.job_executor == "process":
+            if not MULTIPROCESS_DIRECTORY:
+                warnings.warn(
+                    "Metrics recorded in job worker processes are not exported without PROMETHEUS_MULTIPROC_DIR.",
+                    RuntimeWarning,
+                )
+            executor = ProcessPoolExecutor(max_workers=SETTINGS.job_workers, initializer=init_worker_metrics)
+        else:
+            raise ValueError(f"There is no job executor named {SETTINGS.job_executor}")
+
+        return cls(executor, SETTINGS.job_retention_seconds)
+
+    def _purge(self) -> None:
+        """Drops finished jobs that are older than the retention period."""
+        deadline = time.time() - self.retention_seconds
+        for job_id, job in list(self._jobs.items()):
+            if job.is_finished() and job.finished_at is not None and job.finished_at < deadline:
+                del self._jobs[job_id]
+
+    def _on_done(self, job: Job, future: Future) -> None:
+        """
+        Records the outcome of a job and deletes its temporary file.
+
+        Args:
+            job (Job): The job that finished.
+            future (Future): The future of the job.
+        """
+        succeeded = not future.cancelled() and future.exception() is None
+        transcript_id = lookup_transcript(job.request) if succeeded and job.request is not None else None
+
+        with self._lock:
+            if job.status != JobStatus.CANCELLED:
+                if future.cancelled():
+                    job.status = JobStatus.CANCELLED
+                elif future.exception() is not None:
+                    job.status = JobStatus.FAILED
+                    job.error = str(future.exception())
+                    job.error_status = getattr(future.exception(), "status_code", 500)
+                else:
+                    job.status = JobStatus.SUCCEEDED
+                    job.result = future.result()
+                    job.transcript_id = transcript_id
+            job.finished_at = time.time()
+            job.future = None
+
+        if job.cleanup_path and os.path.exists(job.cleanup_path):
+            os.remove(job.cleanup_path)
+
+    def submit(self, request: SummarizationRequest, cleanup_path: Optional[str] = None) -> Job:
+        """
+        Submits a summarization request as a new job.
+
+        Args:
+            request (SummarizationRequest): The request to serve.
+            cleanup_path (Optional[str]): A temporary file to delete once the job is over.
+
+        Returns:
+            Job: The submitted job.
+        """
+        job = Job(id=uuid.uuid4().hex, cleanup_path=cleanup_path, request=request)
+
+        with self._lock:
+            self._purge()
+            self._jobs[job.id] = job
+
+        job.future = self.executor.submit(run_summarization, request, job.id)
+        job.future.add_done_callback(lambda future: self._on_done(job, future))
+
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """
+        Returns a job by its identifier.
+
+        Args:
+            job_id (str): The identifier of the job.
+
+        Returns:
+            Optional[Job]: The job, or None if it does not exist (or was already dropped).
+        """
+        with self._lock:
+            self._purge()
+            job = self._jobs.get(job_id)
+            if job and job.status == JobStatus.PENDING and job.future is not None and job.future.running():
+                job.status = JobStatus.RUNNING
+            return job
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """
+        Cancels a job and forgets it.
+
+        Pending jobs never start. A running job cannot be interrupted, but its workspace is
+        deleted, so it fails at its next file operation; its result is discarded either way.
+
+        Args:
+            job_id (str): The identifier of the job.
+
+        Returns:
+            Optional[Job]: The cancelled job, or None if it does not exist.
+        """
+        with self._lock:
+            job = self._jobs.pop(job_id, None)
+            if job is None:
+                return None
+            future = job.future
+            if not job.is_finished():
+                job.status = JobStatus.CANCELLED
+
+        if future is not None and not future.cancel():
+            WORKSPACES.remove(job_id)
+
+        return job
+
+    def count(self, status: JobStatus) -> int:
+        """
+        Returns the number of tracked jobs with a status.
+
+        Args:
+            status (JobStatus): The status to count.
+
+        Returns:
+            int: The number of jobs with the status.
+        """
+        with self._lock:
+            for job in self._jobs.values():
+                if job.status == JobStatus.PENDING and job.future is not None and job.future.running():
+                    job.status = JobStatus.RUNNING
+            return sum(1 for job in self._jobs.values() if job.status == status)
+
+    def shutdown(self) -> None:
+        """Stops the worker pool, cancelling the jobs that did not start yet."""
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,315 @@
+import sys
+import json
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from path_handler import PathManager
+from starlette.websockets import WebSocket, WebSocketDisconnect, WebSocketState
+from vosk import KaldiRecognizer
+
+path_manager = PathManager()
+sys.path.append(str(path_manager.get_base_directory()))
+
+from src.config.settings import SETTINGS
+from src.metrics.base import ASR_MEDIA_SECONDS, ASR_WALL_SECONDS, LIVE_SESSIONS, LIVE_THROTTLED_SECONDS
+from src.transcription.strategy import VoskStrategy
+
+
+class LiveTranscriber:
+    """
+    Transcribes the audio of one live session as it arrives.
+
+    Attributes:
+        model_id (str): An identifier of the model.
+        sample_rate (int): The sample rate of the audio.
+        results (List[str]): The texts of the finished utterances so far.
+
+    Methods:
+        accept: Feeds a chunk of PCM to the recognizer and returns the resulting updates.
+        finish: Flushes the recognizer and returns the last updates.
+    """
+
+    def __init__(self, model: Any, model_id: str, sample_rate: int):
+        """
+        Initializes the transcriber.
+
+        Args:
+            model (Any): The loaded Vosk model, shared with the other sessions.
+            model_id (str): An identifier of the model.
+            sample_rate (int): The sample rate of the audio.
+        """
+        self.model_id = model_id
+        self.sample_rate = sample_rate
+        self.results: List[str] = []
+        self._recognizer = KaldiRecognizer(model, sample_rate)
+        self._partial = ""
+
+    def accept(self, data: bytes) -> List[Dict[str, Any]]:
+        """
+        Feeds a chunk of PCM to the recognizer and returns the resulting updates.
+
+        Args:
+            data (bytes): 16-bit mono PCM at the sample rate of the session.
+
+        Returns:
+            List[Dict[str, Any]]: A "result" event when an utterance ended, a "partial" event when
+                                  the hypothesis of the current utterance changed, or nothing.
+        """
+        start = time.perf_counter()
+        events = []
+        if self._recognizer.AcceptWaveform(data):
+            text = json.loads(self._recognizer.Result()).get("text", "")
+            self._partial = ""
+            if text:
+                self.results.append(text)
+                events.append({"event": "result", "text": text})
+        else:
+            partial = json.loads(self._recognizer.PartialResult()).get("partial", "")
+            if partial != self._partial:
+                self._partial = partial
+                events.append({"event": "partial", "text": partial})
+
+        ASR_MEDIA_SECONDS.labels(model=self.model_id).inc(len(data) / (2 * self.sample_rate))
+        ASR_WALL_SECONDS.labels(model=self.model_id).inc(time.perf_counter() - start)
+        return events
+
+    def finish(self) -> List[Dict[str, Any]]:
+        """
+        Flushes the recognizer and returns the last updates.
+
+        Returns:
+            List[Dict[str, Any]]: The "result" event of the last utterance, if any, and a "done"
+                                  event with the whole transcription.
+        """
+        events = []
+        text = json.loads(self._recognizer.FinalResult()).get("text", "")
+        if text:
+            self.results.append(text)
+            events.append({"event": "result", "text": text})
+        events.append({"event": "done", "text": " ".join(self.results)})
+        return events
+
+
+class LiveSessionManager:
+    """
+    Serves live transcription sessions over WebSockets.
+
+    Clients send 16-bit mono PCM as binary messages and a text message "EOF" once they are done;
+    the server answers with "partial", "result", and finally "done" (or "error") events as JSON.
+
+    Every session shares the cached Vosk model of its language and has its own recognizer. The
+    recognizers run on a shared thread pool, so the event loop only moves bytes. Memory per session
+    is bounded: at most `queue_chunks` messages of at most `max_chunk_bytes` wait for the recognizer.
+    When the recognizer falls behind, or the client sends faster than `max_speed` times real time
+    (after a burst of `burst_seconds` of audio), the server stops reading from the socket, which
+    pushes back on the client through TCP flow control.
+
+    Attributes:
+        max_sessions (int): The most sessions served at once; more are refused (0 means unlimited).
+        queue_chunks (int): The most messages of a session that wait for the recognizer.
+        max_chunk_bytes (int): The largest accepted message.
+        max_speed (float): How much faster than real time a client may send audio (0 means unlimited).
+        burst_seconds (float): The audio a client may send ahead of the pace.
+        active_sessions (int): The number of sessions being served.
+
+    Methods:
+        from_settings: Creates a session manager configured from the process settings.
+        serve: Serves a live transcription session.
+        shutdown: Stops the recognizer threads.
+    """
+
+    sample_rates = (8000, 16000)
+
+    def __init__(
+        self,
+        max_sessions: int = 64,
+        workers: int = 4,
+        queue_chunks: int = 8,
+        max_chunk_bytes: int = 64 * 1024,
+        max_speed: float = 1.5,
+        burst_seconds: float = 5.0,
+    ):
+        """
+        Initializes the session manager.
+
+        Args:
+            max_sessions (int): The most sessions served at once (0 means unlimited).
+            workers (int): The number of recognizer threads shared by the sessions.
+            queue_chunks (int): The most messages of a session that wait for the recognizer.
+            max_chunk_bytes (int): The largest accepted message.
+            max_speed (float): How much faster than real time a client may send audio (0 means unlimited).
+            burst_seconds (float): The audio a client may send ahead of the pace.
+        """
+        self.max_sessions = max_sessions
+        self.queue_chunks = queue_chunks
+        self.max_chunk_bytes = max_chunk_bytes
+        self.max_speed = max_speed
+        self.burst_seconds = burst_seconds
+        self.active_sessions = 0
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="live-asr")
+
+    @classmethod
+    def from_settings(cls) -> "LiveSessionManager":
+        """
+        Creates a session manager configured from the process settings.
+
+        Returns:
+            LiveSessionManager: The session manager.
+        """
+        return cls(
+            max_sessions=SETTINGS.live_max_sessions,
+            workers=SETTINGS.live_workers,
+            queue_chunks=SETTINGS.live_queue_chunks,
+            max_chunk_bytes=SETTINGS.live_max_chunk_bytes,
+            max_speed=SETTINGS.live_max_speed,
+            burst_seconds=SETTINGS.live_burst_seconds,
+        )
+
+    async def _reject(self, websocket: WebSocket, code: int, detail: str) -> None:
+        """
+        Sends an "error" event and closes the connection.
+
+        Args:
+            websocket (WebSocket): The connection of the session.
+            code (int): The WebSocket close code.
+            detail (str): The reason.
+        """
+        if websocket.application_state != WebSocketState.CONNECTED:
+            return
+        try:
+            await websocket.send_json({"event": "error", "detail": detail})
+            await websocket.close(code=code, reason=detail[:120])
+        except (WebSocketDisconnect, RuntimeError):
+            # The client is already gone.
+            pass
+
+    async def _recognize(self, websocket: WebSocket, transcriber: LiveTranscriber, queue: "asyncio.Queue[Optional[bytes]]") -> None:
+        """
+        Feeds the queued audio of a session to its recognizer and sends the updates back.
+
+        Args:
+            websocket (WebSocket): The connection of the session.
+            transcriber (LiveTranscriber): The transcriber of the session.
+            queue (asyncio.Queue[Optional[bytes]]): The received audio, ended by None.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            data = await queue.get()
+            if data is None:
+                break
+            for event in await loop.run_in_executor(self._executor, transcriber.accept, data):
+                await websocket.send_json(event)
+
+        for event in await loop.run_in_executor(self._executor, transcriber.finish):
+            await websocket.send_json(event)
+
+    @staticmethod
+    async def _enqueue(queue: "asyncio.Queue[Optional[bytes]]", item: Optional[bytes], recognizer: "asyncio.Task[None]") -> None:
+        """
+        Queues audio for the recognizer, waiting while the queue is full.
+
+        Args:
+            queue (asyncio.Queue[Optional[bytes]]): The audio waiting for the recognizer.
+            item (Optional[bytes]): The audio, or None to end the session.
+            recognizer (asyncio.Task[None]): The recognizer task, which may stop early.
+
+        Raises:
+            Exception: The error of the recognizer, if it stopped while the queue was full.
+        """
+        put = asyncio.ensure_future(queue.put(item))
+        await asyncio.wait({put, recognizer}, return_when=asyncio.FIRST_COMPLETED)
+        if not put.done():
+            put.cancel()
+            await recognizer
+
+    async def _pace(self, started_at: float, received_seconds: float) -> None:
+        """
+        Waits until the audio received so far is within the allowed pace.
+
+        Args:
+            started_at (float): When the session started (`time.monotonic`).
+            received_seconds (float): The duration of the audio received so far.
+        """
+        if not self.max_speed:
+            return
+        ready_at = started_at + (received_seconds - self.burst_seconds) / self.max_speed
+        delay = ready_at - time.monotonic()
+        if delay > 0:
+            LIVE_THROTTLED_SECONDS.inc(delay)
+            await asyncio.sleep(delay)
+
+    async def serve(self, websocket: WebSocket, language: str, sample_rate: int = 16000) -> None:
+        """
+        Serves a live transcription session.
+
+        Args:
+            websocket (WebSocket): The connection of the session (not yet accepted).
+            language (str): The language of the audio.
+            sample_rate (int): The sample rate of the audio (8000 or 16000).
+        """
+        await websocket.accept()
+
+        if self.max_sessions and self.active_sessions >= self.max_sessions:
+            await self._reject(websocket, 1013, "Too many live sessions. Try again later.")
+            return
+        if sample_rate not in self.sample_rates:
+            await self._reject(websocket, 1003, f"The sample rate must be one of {self.sample_rates}.")
+            return
+
+        self.active_sessions += 1
+        LIVE_SESSIONS.inc()
+        recognizer = None
+        try:
+            loop = asyncio.get_running_loop()
+            try:
+                model = await loop.run_in_executor(None, VoskStrategy.load_model, language)
+                transcriber = LiveTranscriber(model, VoskStrategy.model_id(language), sample_rate)
+            except Exception as e:
+                await self._reject(websocket, 1011, str(e))
+                return
+
+            queue: "asyncio.Queue[Optional[bytes]]" = asyncio.Queue(maxsize=self.queue_chunks)
+            recognizer = asyncio.create_task(self._recognize(websocket, transcriber, queue))
+            started_at = time.monotonic()
+            received_seconds = 0.0
+
+            while not recognizer.done():
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    return
+
+                data = message.get("bytes")
+                if data is None:
+                    if (message.get("text") or "").strip().upper() == "EOF":
+                        break
+                    continue
+                if len(data) > self.max_chunk_bytes:
+                    await self._reject(websocket, 1009, f"Audio messages must not exceed {self.max_chunk_bytes} bytes.")
+                    return
+
+                received_seconds += len(data) / (2 * sample_rate)
+                await self._pace(started_at, received_seconds)
+                await self._enqueue(queue, data, recognizer)
+
+            if not recognizer.done():
+                await self._enqueue(queue, None, recognizer)
+            await recognizer
+            await websocket.close()
+
+        except WebSocketDisconnect:
+            pass
+
+        except Exception as e:
+            await self._reject(websocket, 1011, str(e))
+
+        finally:
+            if recognizer is not None and not recognizer.done():
+                recognizer.cancel()
+            self.active_sessions -= 1
+            LIVE_SESSIONS.dec()
+
+    def shutdown(self) -> None:
+        """Stops the recognizer threads."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,56 @@
+import sys
+from dataclasses import dataclass
+from typing import Optional
+
+from path_handler import PathManager
+
+path_manager = PathManager()
+sys.path.append(str(path_manager.get_base_directory()))
+
+
+@dataclass(frozen=True)
+class ModelInfo:
+    """
+    What the pipeline knows about an LLM ahead of a request.
+
+    Attributes:
+        name (str): The name of the model at its provider.
+        context_tokens (int): The context window: the most tokens of the prompt and the answer together.
+        max_output_tokens (int): The most tokens the model answers with.
+        input_cost (Optional[float]): The rough cost of a million prompt tokens, in US dollars (None if unknown).
+        output_cost (Optional[float]): The rough cost of a million answer tokens, in US dollars (None if unknown).
+        tokens_per_second (Optional[float]): The expected answer throughput, until one is observed (None if unknown).
+    """
+    name: str
+    context_tokens: int
+    max_output_tokens: int
+    input_cost: Optional[float] = None
+    output_cost: Optional[float] = None
+    tokens_per_second: Optional[float] = None
+
+    def input_budget(self, reserved_tokens: int = 0) -> int:
+        """
+        Returns the most tokens of input that leave room for a full answer.
+
+        Args:
+            reserved_tokens (int): Tokens of the prompt spent outside the input (e.g., the system prompt).
+
+        Returns:
+            int: The input budget (at least 0).
+        """
+        return max(0, self.context_tokens - self.max_output_tokens - reserved_tokens)
+
+    def cost(self, input_tokens: int, output_tokens: int) -> Optional[float]:
+        """
+        Estimates the cost of a request.
+
+        Args:
+            input_tokens (int): The tokens of the prompt.
+            output_tokens (int): The tokens of the answer.
+
+        Returns:
+            Optional[float]: The rough cost in US dollars, or None if the prices are unknown.
+        """
+        if self.input_cost is None or self.output_cost is None:
+            return None
+        return (input_tokens * self.input_cost + output_tokens * self.output_cost) / 1_000_000
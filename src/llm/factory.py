@@ -1,4 +1,7 @@
 import sys
+import threading
+from dataclasses import replace
+from typing import Any, Dict, List
 
 from path_handler import PathManager
 
@@ -6,17 +9,60 @@ path_manager = PathManager()
 sys.path.append(str(path_manager.get_base_directory()))
 
 from src.config.config import Client
+from src.llm.base import ModelInfo
 
 class LLMFactory:
     """
     Factory class for creating LLM (Large Language Model) configurations.
 
-    This class provides a method to retrieve a list of supported models for a given LLM client.
+    This class provides the supported models of each LLM client, along with what is known about
+    them (context window, output limit, rough cost and throughput), so requests can be planned
+    to fit a model before they are sent.
+
+    Attributes:
+        _models (Dict[str, List[ModelInfo]]): The supported models of each client.
+        _unknown (ModelInfo): Conservative limits assumed for models missing from the registry.
+        _throughput (Dict[str, float]): The observed answer throughput of each model, in tokens per second.
+        _lock (threading.Lock): Guards the observed throughput.
 
     Methods:
         create: Returns a list of models supported by the specified client.
+        info: Returns what is known about a model.
+        record: Records the observed throughput of a request.
+        stats: Returns what is known about every supported model.
     """
     
+    _models = {
+        "Together": [
+            ModelInfo(
+                name="meta-llama/Llama-3.3-70B-Instruct-Turbo",
+                context_tokens=131072,
+                max_output_tokens=8192,
+                input_cost=0.88,
+                output_cost=0.88,
+                tokens_per_second=80.0,
+            ),
+        ],
+        "OpenRouter": [
+            ModelInfo(
+                name="google/gemini-2.0-pro-exp-02-05:free",
+                context_tokens=2000000,
+                max_output_tokens=8192,
+                input_cost=0.0,
+                output_cost=0.0,
+                tokens_per_second=40.0,
+            ),
+        ],
+    }
+    
+    _unknown = ModelInfo(name="", context_tokens=32768, max_output_tokens=4096)
+    
+    # The weight of the latest request in the observed throughput.
+    _smoothing = 0.2
+    
+    _throughput: Dict[str, float] = {}
+    _lock = threading.Lock()
+    
     @classmethod
     def create(cls, client: Client):
         """
@@ -31,13 +77,62 @@ class LLMFactory:
         Raises:
             ValueError: If the specified client is not supported.
         """
-        if client.value == "Together":
-            return [
-                "meta-llama/Llama-3.3-70B-Instruct-Turbo"
-            ]
-        elif client.value == "OpenRouter":
-            return [
-                "google/gemini-2.0-pro-exp-02-05:free"
-            ]
-        else:
-            raise ValueError(f"There is no client named {client.value}")
\ No newline at end of file
+        if client.value not in cls._models:
+            raise ValueError(f"There is no client named {client.value}")
+        
+        return [model.name for model in cls._models[client.value]]
+    
+    @classmethod
+    def info(cls, model: str) -> ModelInfo:
+        """
+        Returns what is known about a model.
+
+        Models missing from the registry (e.g., ones named in a request) get conservative limits.
+        Once requests to the model have been timed, the observed throughput replaces the expected one.
+
+        Args:
+            model (str): The name of the model.
+
+        Returns:
+            ModelInfo: The metadata of the model.
+        """
+        info = next(
+            (known for models in cls._models.values() for known in models if known.name == model),
+            replace(cls._unknown, name=model),
+        )
+        
+        with cls._lock:
+            observed = cls._throughput.get(model)
+        return info if observed is None else replace(info, tokens_per_second=observed)
+    
+    @classmethod
+    def record(cls, model: str, output_tokens: int, seconds: float) -> None:
+        """
+        Records the observed throughput of a request, as a moving average per model.
+
+        Args:
+            model (str): The name of the model.
+            output_tokens (int): The tokens of the answer.
+            seconds (float): The duration of the request.
+        """
+        if output_tokens <= 0 or seconds <= 0:
+            return
+        
+        throughput = output_tokens / seconds
+        with cls._lock:
+            previous = cls._throughput.get(model)
+            cls._throughput[model] = throughput if previous is None else previous + cls._smoothing * (throughput - previous)
+    
+    @classmethod
+    def stats(cls) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Returns what is known about every supported model.
+
+        Returns:
+            Dict[str, List[Dict[str, Any]]]: For each client, the metadata of its models, with the
+                                             observed throughput where requests have been timed.
+        """
+        return {
+            client: [vars(cls.info(model.name)) for model in models]
+            for client, models in cls._models.items()
+        }
@@ -0,0 +1,40 @@
+import re
+import sys
+import math
+
+from path_handler import PathManager
+
+path_manager = PathManager()
+sys.path.append(str(path_manager.get_base_directory()))
+
+# The average number of characters (including whitespace) per token of English text, and of
+# anything else that is not Persian.
+CHARS_PER_TOKEN = 4.0
+
+# The average number of characters per token of Persian text. Tokenizers trained mostly on
+# English split Arabic-script words into many more pieces, so the estimate errs on the high side.
+PERSIAN_CHARS_PER_TOKEN = 2.5
+
+# Arabic-script letters, including the Persian ones and the zero-width non-joiner.
+_PERSIAN = re.compile(r"[\u0600-\u06FF\u0750-\u077F\u08A0-\u08FF\uFB50-\uFDFF\uFE70-\uFEFF\u200C]+")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimates the number of tokens of a text without a tokenizer.
+
+    Characters are counted by script, with a single regular expression substitution, so a long
+    transcription is estimated in milliseconds.
+
+    Args:
+        text (str): The text, in English, Persian or a mix of both.
+
+    Returns:
+        int: The estimated number of tokens (0 for an empty text).
+    """
+    if not text:
+        return 0
+    
+    latin = len(_PERSIAN.sub("", text))
+    persian = len(text) - latin
+    return math.ceil(latin / CHARS_PER_TOKEN + persian / PERSIAN_CHARS_PER_TOKEN)
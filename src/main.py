@@ -1,34 +1,43 @@
 import os
 import sys
-import tempfile
-from typing import Optional
+import json
+import hashlib
+import threading
+from dataclasses import asdict
+from typing import Any, Dict, Iterator, Optional, Tuple
 
 from path_handler import PathManager
-from fastapi import FastAPI, File, UploadFile, Form, HTTPException
+from fastapi import FastAPI, Form, HTTPException, Request, Response, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse, FileResponse
+from fastapi.responses import HTMLResponse, FileResponse, JSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
+from fastapi.concurrency import run_in_threadpool
+from prometheus_client import CONTENT_TYPE_LATEST
 
 path_manager = PathManager()
 sys.path.append(str(path_manager.get_base_directory()))
 
-from src.config.config import (
-    SummerizerConfig,
-    PipelineConfig,
-    Prompt,
-    Client,
-    AudioFormat,
-    Language,
-    Provider,
-    PipelineType,
-)
-from src.pipeline.factory import SummarizingPipelineFactory
+from src.config.config import Client, Language, PipelineType, Provider
 from src.clients.factory import ClientFactory
-from src.prompts.factory import PromptFactory
+from src.llm.factory import LLMFactory
+from src.config.settings import SETTINGS
+from src.metrics.base import HTTP_REQUESTS, JobCollector, export_metrics
+from src.live.base import LiveSessionManager
+from src.jobs.base import WORKSPACES, TRACE_STORE, JobManager, JobStatus, SummarizationRequest, build_range_request, load_trace, lookup_summary, lookup_transcript, run_summarization, stream_summarization
+from src.transcription.strategy import VoskStrategy
+from src.transcription.factory import SpeechToTextFactory
+from src.transcription.parallel import TranscriptionPool
+from src.uploads.base import UploadLimitMiddleware, UploadSpooler, UploadTooLargeError
+from src.workspace.base import QuotaExceededError
+from src.convertion.base import AUDIO_STORE
+from src.transcription.base import TRANSCRIPT_STORE, load_transcript_segments
+from src.transcription.segments import slice_segments
+from src.summarization.base import TextTooLongError
 
 app = FastAPI()
 origins = ["https://localhost:8000", "http://127.0.0.1:8000"]
 
+app.add_middleware(UploadLimitMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -39,6 +48,115 @@ app.add_middleware(
 # app.mount("/src/ui", StaticFiles(directory="src/ui"), name="ui") # ! Debugger
 app.mount("/ui", StaticFiles(directory="ui"), name="ui")
 
+preload_errors = {}
+job_manager = JobManager.from_settings()
+upload_spooler = UploadSpooler()
+live_sessions = LiveSessionManager.from_settings()
+
+job_collector = JobCollector([job_status.value for job_status in JobStatus], lambda status: job_manager.count(JobStatus(status)))
+
+
+@app.middleware("http")
+async def count_requests(request: Request, call_next):
+    """
+    Counts the handled requests by method, route and status code.
+
+    The route template (e.g., "/jobs/{job_id}") is used rather than the path, to keep the number of series bounded.
+    """
+    response = await call_next(request)
+    route = request.scope.get("route")
+    HTTP_REQUESTS.labels(
+        method=request.method,
+        route=route.path if route is not None else "unmatched",
+        status=response.status_code,
+    ).inc()
+    return response
+
+
+def start_transcription_pools() -> None:
+    """
+    Loads the Vosk models of the configured languages and forks their transcription worker
+    processes (with `ASR_PARALLEL`), which share the loaded models.
+
+    Runs at startup before any other thread or executor starts: a thread holding a lock while the
+    workers are forked would leave that lock held forever in the workers.
+
+    Failures are recorded per language and reported by the readiness endpoint.
+    """
+    for language in SETTINGS.preload_languages:
+        try:
+            VoskStrategy.load_model(language)
+            SpeechToTextFactory.start_pool(Provider.VOSK, Language(language))
+        except Exception as e:
+            preload_errors[language] = str(e)
+
+
+def preload_models() -> None:
+    """
+    Loads the Vosk models of the configured languages into the process-wide model cache.
+
+    Failures are recorded per language and reported by the readiness endpoint.
+    """
+    for language in SETTINGS.preload_languages:
+        try:
+            VoskStrategy.load_model(language)
+            preload_errors.pop(language, None)
+        except Exception as e:
+            preload_errors[language] = str(e)
+
+
+@app.on_event("startup")
+def startup() -> None:
+    """
+    Starts preloading the Vosk models and warming up the LLM connections in the background,
+    so the server can accept connections right away, and starts the sweeper that deletes
+    left-behind workspaces and temporary files.
+
+    With `ASR_PARALLEL`, the transcription workers are forked first, while the server still runs
+    no other thread, so the models of their languages are loaded before the server accepts connections.
+    """
+    if SETTINGS.asr_parallel:
+        start_transcription_pools()
+
+    threading.Thread(target=preload_models, name="vosk-preload", daemon=True).start()
+    threading.Thread(target=ClientFactory.warmup, args=(list(Client),), name="llm-warmup", daemon=True).start()
+    WORKSPACES.start_sweeper(
+        SETTINGS.workspace_sweep_interval_seconds,
+        [AUDIO_STORE.directory, TRANSCRIPT_STORE.directory, TRACE_STORE.directory],
+    )
+
+
+@app.on_event("shutdown")
+def shutdown() -> None:
+    """
+    Stops the job workers, the transcription workers, the live recognizers and the workspace sweeper.
+    """
+    job_manager.shutdown()
+    TranscriptionPool.shutdown_all()
+    live_sessions.shutdown()
+    WORKSPACES.stop_sweeper()
+
+
+@app.get("/ready")
+async def ready():
+    """
+    Reports whether the Vosk models of the configured languages are loaded.
+
+    Returns:
+        JSONResponse: The readiness of each configured language, with status 200 when all of them
+                      are loaded and 503 otherwise.
+    """
+    languages = {
+        language: VoskStrategy.is_loaded(language)
+        for language in SETTINGS.preload_languages
+    }
+    is_ready = all(languages.values())
+    
+    return JSONResponse(
+        status_code=200 if is_ready else 503,
+        content={"ready": is_ready, "languages": languages, "errors": preload_errors},
+    )
+
 
 @app.get("/", response_class=HTMLResponse)
 async def read_root():
@@ -51,6 +169,50 @@ async def read_root():
     # return FileResponse("src/ui/base.html") # ! Debugger
     return FileResponse("ui/base.html")
 
+@app.get("/metrics")
+async def metrics():
+    """
+    Exports the metrics in the Prometheus text format.
+
+    Returns:
+        Response: The current values of all metrics.
+    """
+    return Response(content=export_metrics(job_collector), media_type=CONTENT_TYPE_LATEST)
+
+
+@app.get("/clients/stats")
+async def client_stats():
+    """
+    Reports the connection pool usage of the LLM clients.
+
+    Returns:
+        dict: For each provider, the number of open, idle and active connections, and the configured limits.
+    """
+    return ClientFactory.stats()
+
+
+@app.get("/asr/stats")
+async def asr_stats():
+    """
+    Reports the memory of the transcription worker processes.
+
+    Returns:
+        dict: For each model, the number of workers and their resident, proportional and private memory.
+    """
+    return await run_in_threadpool(TranscriptionPool.stats)
+
+
+@app.get("/llm/models")
+async def llm_models():
+    """
+    Reports what is known about the supported LLMs.
+
+    Returns:
+        dict: For each provider, the context window, output limit, rough cost and throughput of its models.
+    """
+    return LLMFactory.stats()
+
+
 def detect_pipeline_type(file_extension: Optional[str]) -> PipelineType:
     """
     Detects the pipeline type based on the file's extension.
@@ -73,90 +235,403 @@ def detect_pipeline_type(file_extension: Optional[str]) -> PipelineType:
     return PipelineType.TEXT
 
 
+# The form fields of the summarization endpoints that must be present.
+REQUIRED_FORM_FIELDS = ("language", "audio_format", "prompt", "client", "model")
+
+
+def parse_form_bool(value: Optional[str]) -> Optional[bool]:
+    """
+    Parses an optional boolean form field.
+
+    Args:
+        value (Optional[str]): The value of the field (e.g., "true", "0"), if it was sent.
+
+    Returns:
+        Optional[bool]: The value, or None if the field was not sent or is empty.
+
+    Raises:
+        HTTPException: If the value is not a boolean.
+    """
+    if value is None or value == "":
+        return None
+    if value.lower() in {"true", "1", "yes", "on"}:
+        return True
+    if value.lower() in {"false", "0", "no", "off"}:
+        return False
+    raise HTTPException(status_code=422, detail=f"{value} is not a boolean")
+
+
+async def build_request(http_request: Request) -> Tuple[SummarizationRequest, Optional[str]]:
+    """
+    Builds a summarization request from the submitted form, streaming the uploaded file (if any) to a temporary file.
+
+    The form is parsed straight from the request body, so the file is written to disk once, as it arrives.
+    Its fields are:
+        file: The uploaded file (video, audio, or text).
+        text: The input text (if no file is uploaded).
+        language: The language of the input.
+        audio_format: The audio format for conversion.
+        prompt: The summarization prompt type.
+        client: The LLM client to use.
+        model: The model to use for summarization.
+        vad: Whether non-speech audio is dropped before recognition (optional; the `VAD` setting by default).
+
+    Args:
+        http_request (Request): The request, whose body is the form.
+
+    Returns:
+        Tuple[SummarizationRequest, Optional[str]]: The request and the path of the temporary file to delete
+                                                    once the request is served (None for text input).
+
+    Raises:
+        HTTPException: If no file or text is provided, if a field is missing or malformed, or if the
+                       file exceeds the upload size limit.
+    """
+    try:
+        form = await upload_spooler.spool_form(http_request)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    temp_file_path = form.upload.path if form.upload else None
+
+    try:
+        missing = [name for name in REQUIRED_FORM_FIELDS if not form.fields.get(name)]
+        if missing:
+            raise HTTPException(status_code=422, detail=f"Missing form fields: {', '.join(missing)}")
+
+        text = form.fields.get("text")
+        if not form.upload and not text:
+            raise HTTPException(status_code=400, detail="No file or text provided")
+
+        vad = parse_form_bool(form.fields.get("vad"))
+    except HTTPException:
+        if temp_file_path:
+            os.remove(temp_file_path)
+        raise
+
+    if form.upload:
+        file_extension = form.filename.split(".")[-1] if form.filename else "tmp"
+        content_hash = form.upload.sha256
+        pipeline_type = detect_pipeline_type(file_extension)
+        input_data = temp_file_path
+    else:
+        input_data = text
+        content_hash = hashlib.sha256(text.encode("UTF-8")).hexdigest()
+        pipeline_type = PipelineType.TEXT
+
+    request = SummarizationRequest(
+        input_data=input_data,
+        pipeline_type=pipeline_type.value,
+        language=form.fields["language"],
+        audio_format=form.fields["audio_format"],
+        prompt=form.fields["prompt"],
+        client=form.fields["client"],
+        model=form.fields["model"],
+        content_hash=content_hash,
+        vad=vad,
+    )
+
+    return request, temp_file_path
+
+
 @app.post("/summarize")
-async def summarize(
-    file: Optional[UploadFile] = File(None),
-    text: Optional[str] = Form(None),
+async def summarize(http_request: Request):
+    """
+    Handles the summarization request.
+
+    Summaries are cached by input content and options; a cached summary is returned without running
+    the pipeline, which is reported in the `X-Cache` header (HIT or MISS). Otherwise the pipeline runs
+    in a worker thread, so the event loop keeps serving other requests meanwhile.
+
+    Args:
+        http_request (Request): The request, whose body is the form described in `build_request`.
+
+    Returns:
+        dict: A dictionary containing the summarized text, and the transcript id of audio and video
+              inputs (see `/transcripts/{transcript_id}/summarize`).
+
+    Raises:
+        HTTPException: If no file or text is provided, if the workspaces are out of disk quota (507),
+                       if the text is too long for the model even part by part (413), or if an
+                       error occurs during processing.
+    """
+    temp_file_path = None
+
+    try:
+        request, temp_file_path = await build_request(http_request)
+        summary = await run_in_threadpool(lookup_summary, request)
+        cache_status = "HIT"
+        
+        if summary is None:
+            summary = await run_in_threadpool(run_summarization, request, skip_lookup=True)
+            cache_status = "MISS"
+
+        transcript_id = await run_in_threadpool(lookup_transcript, request)
+
+        return JSONResponse(
+            content={"summary": summary, "transcript_id": transcript_id},
+            headers={"X-Cache": cache_status, "X-Cache-Key": request.cache_key() or ""},
+        )
+
+    except HTTPException:
+        raise
+
+    except QuotaExceededError as e:
+        raise HTTPException(status_code=507, detail=str(e))
+
+    except TextTooLongError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    finally:
+        if temp_file_path and os.path.exists(temp_file_path):
+            os.remove(temp_file_path)
+
+
+def format_sse(events: Iterator[Dict[str, Any]], cleanup_path: Optional[str] = None) -> Iterator[str]:
+    """
+    Formats pipeline events as Server-Sent Events.
+
+    Args:
+        events (Iterator[Dict[str, Any]]): The events of a pipeline run.
+        cleanup_path (Optional[str]): A temporary file to delete once the stream is over.
+
+    Yields:
+        str: One Server-Sent Event per pipeline event.
+    """
+    try:
+        for event in events:
+            yield f"event: {event['event']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+    finally:
+        if cleanup_path and os.path.exists(cleanup_path):
+            os.remove(cleanup_path)
+
+
+@app.post("/summarize/stream")
+async def summarize_stream(http_request: Request):
+    """
+    Handles the summarization request, streaming its progress as Server-Sent Events.
+
+    The stream carries a "stage" event when the pipeline enters a step (converting, transcribing,
+    summarizing), "progress" events with the percentage of audio transcribed, a "vad" event with the
+    audio dropped as non-speech (when voice activity detection is on), a "transcript" event with the
+    id of the stored transcription, a "token" event for every piece of the summary as the LLM
+    produces it, and finally a "done" or an "error" event.
+
+    Args:
+        http_request (Request): The request, whose body is the form described in `build_request`.
+
+    Returns:
+        StreamingResponse: The event stream.
+
+    Raises:
+        HTTPException: If no file or text is provided.
+    """
+    request, temp_file_path = await build_request(http_request)
+
+    return StreamingResponse(
+        format_sse(stream_summarization(request), cleanup_path=temp_file_path),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/transcripts/{transcript_id}/segments")
+async def get_transcript_segments(transcript_id: str, start_ms: int = 0, end_ms: Optional[int] = None):
+    """
+    Returns the timed segments of a stored transcription, optionally within a time range.
+
+    Args:
+        transcript_id (str): The id of the transcription (reported by the summarization endpoints).
+        start_ms (int): The start of the range, in milliseconds.
+        end_ms (Optional[int]): The end of the range, in milliseconds (None for the end of the audio).
+
+    Returns:
+        dict: The segments, each with its start and end in milliseconds, its text, and its words
+              as `[word, start_ms, end_ms]`.
+
+    Raises:
+        HTTPException: If there are no timings for the transcription, or if the range is invalid.
+    """
+    segments = await run_in_threadpool(load_transcript_segments, transcript_id)
+    if segments is None:
+        raise HTTPException(status_code=404, detail=f"There is no timed transcription with id {transcript_id}")
+
+    try:
+        segments = slice_segments(segments, start_ms, end_ms)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {"transcript_id": transcript_id, "segments": [asdict(segment) for segment in segments]}
+
+
+@app.post("/transcripts/{transcript_id}/summarize")
+async def summarize_transcript_range(
+    transcript_id: str,
+    start_ms: int = Form(0),
+    end_ms: Optional[int] = Form(None),
     language: str = Form(...),
-    audio_format: str = Form(...),
     prompt: str = Form(...),
     client: str = Form(...),
     model: str = Form(...),
 ):
     """
-    Handles the summarization request.
+    Summarizes a time range of a stored transcription (e.g., minutes 10 to 25 of a recording).
+
+    The range is cut from the stored word timings, so no audio is converted or transcribed again.
+    Summaries of a range are cached like those of text input, which is reported in the `X-Cache` header.
 
     Args:
-        file (Optional[UploadFile]): The uploaded file (video, audio, or text).
-        text (Optional[str]): The input text (if no file is uploaded).
-        language (str): The language of the input.
-        audio_format (str): The audio format for conversion.
+        transcript_id (str): The id of the transcription (reported by the summarization endpoints).
+        start_ms (int): The start of the range, in milliseconds.
+        end_ms (Optional[int]): The end of the range, in milliseconds (None for the end of the audio).
+        language (str): The language of the transcription.
         prompt (str): The summarization prompt type.
         client (str): The LLM client to use.
         model (str): The model to use for summarization.
 
     Returns:
-        dict: A dictionary containing the summarized text.
+        dict: A dictionary containing the summary of the range.
 
     Raises:
-        HTTPException: If no file or text is provided, or if an error occurs during processing.
+        HTTPException: If there are no timings for the transcription, if the range is invalid or
+                       has no speech, if the range is too long for the model even part by part
+                       (413), or if an error occurs during processing.
     """
     try:
-        if not file and not text:
-            raise HTTPException(status_code=400, detail="No file or text provided")
+        request = await run_in_threadpool(build_range_request, transcript_id, start_ms, end_ms, language, prompt, client, model)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if request is None:
+        raise HTTPException(status_code=404, detail=f"There is no timed transcription with id {transcript_id}")
 
-        input_data = None
-        pipeline_type = None
-        temp_file_path = None
-
-        if file:
-            file_extension = file.filename.split(".")[-1] if file.filename else "tmp"
-            with tempfile.NamedTemporaryFile(delete=False, suffix=f".{file_extension}") as temp_file:
-                temp_file_path = temp_file.name
-                file_content = await file.read()
-                temp_file.write(file_content)
-
-            pipeline_type = detect_pipeline_type(file_extension)
-            input_data = temp_file_path
-        else:
-            input_data = text
-            pipeline_type = PipelineType.TEXT
-
-        language = Language(language)
-        audio_format = AudioFormat(audio_format)
-        prompt = PromptFactory.create(Prompt(prompt))
-        client = ClientFactory.create(Client(client))
-
-        summerizer_config = SummerizerConfig(
-            prompt=prompt,
-            client=client,
-            model=model,
-        )
+    try:
+        summary = await run_in_threadpool(lookup_summary, request)
+        cache_status = "HIT"
 
-        pipeline_config = PipelineConfig(
-            summerizer_config=summerizer_config,
-            audio_format=audio_format,
-            provider=Provider.VOSK,
-            language=language,
-            pipeline_type=pipeline_type,
-        )
+        if summary is None:
+            summary = await run_in_threadpool(run_summarization, request, skip_lookup=True)
+            cache_status = "MISS"
 
-        pipeline = SummarizingPipelineFactory.create(pipeline_config)
-        summary = pipeline.summarize(input_data)
-        
-        if temp_file_path and os.path.exists(temp_file_path):
-            os.remove(temp_file_path)
+        return JSONResponse(
+            content={"summary": summary},
+            headers={"X-Cache": cache_status, "X-Cache-Key": request.cache_key() or ""},
+        )
 
-        return {"summary": summary}
+    except TextTooLongError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
 
     except Exception as e:
-        if temp_file_path and os.path.exists(temp_file_path):
-            os.remove(temp_file_path)
-        
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.websocket("/transcribe/live")
+async def transcribe_live(websocket: WebSocket, language: str = "English", sample_rate: int = 16000):
+    """
+    Transcribes live audio sent over a WebSocket.
+
+    The client sends 16-bit mono PCM at `sample_rate` as binary messages, and the text message "EOF"
+    when it is done. The server answers with JSON events: "partial" (the current hypothesis, as it
+    changes), "result" (a finished utterance), and finally "done" (the whole transcription) or "error".
+    Clients that send faster than real time are slowed down by not reading their messages.
+
+    Args:
+        websocket (WebSocket): The connection.
+        language (str): The language of the audio.
+        sample_rate (int): The sample rate of the audio (8000 or 16000).
+    """
+    await live_sessions.serve(websocket, language, sample_rate)
+
+
+@app.post("/jobs", status_code=202)
+async def create_job(http_request: Request):
+    """
+    Submits a summarization job and returns right away.
+
+    Args:
+        http_request (Request): The request, whose body is the form described in `build_request`.
+
+    Returns:
+        dict: The identifier and state of the submitted job.
+
+    Raises:
+        HTTPException: If no file or text is provided.
+    """
+    request, temp_file_path = await build_request(http_request)
+    job = job_manager.submit(request, cleanup_path=temp_file_path)
+
+    return {"job_id": job.id, "status": job.status.value}
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """
+    Returns the state of a job, and its summary once it has succeeded.
+
+    Args:
+        job_id (str): The identifier of the job.
+
+    Returns:
+        dict: The job.
+
+    Raises:
+        HTTPException: If the job does not exist.
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"There is no job with id {job_id}")
+
+    return job.to_dict()
+
+
+@app.get("/jobs/{job_id}/trace")
+async def get_job_trace(job_id: str):
+    """
+    Returns the trace of a job: one span per pipeline step with its wall time, CPU time and
+    input/output sizes, in the Trace Event Format (loadable in Perfetto or chrome://tracing).
+
+    Args:
+        job_id (str): The identifier of the job.
+
+    Returns:
+        dict: The trace.
+
+    Raises:
+        HTTPException: If there is no trace for the job.
+    """
+    trace = await run_in_threadpool(load_trace, job_id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail=f"There is no trace for job {job_id}")
+
+    return trace
+
+
+@app.delete("/jobs/{job_id}")
+async def delete_job(job_id: str):
+    """
+    Cancels a job and deletes it.
+
+    Args:
+        job_id (str): The identifier of the job.
+
+    Returns:
+        dict: The job, as it was when it was deleted.
+
+    Raises:
+        HTTPException: If the job does not exist.
+    """
+    job = job_manager.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"There is no job with id {job_id}")
+
+    return job.to_dict()
+
+
 if __name__ == "__main__":
     import uvicorn
 
-    uvicorn.run(app, host="127.0.0.1", port=8000)
\ No newline at end of file
+    uvicorn.run(app, host="127.0.0.1", port=8000)
@@ -0,0 +1,343 @@
+import os
+import sys
+import json
+import tempfile
+import threading
+import subprocess
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from path_handler import PathManager
+
+path_manager = PathManager()
+sys.path.append(str(path_manager.get_base_directory()))
+
+
+@dataclass(frozen=True)
+class AudioStream:
+    """
+    Metadata of an audio stream.
+
+    Attributes:
+        index (int): The index of the stream in the container.
+        codec (str): The codec of the stream (e.g., "aac", "pcm_s16le").
+        sample_rate (int): The sample rate in Hz.
+        channels (int): The number of channels.
+        sample_format (Optional[str]): The sample format (e.g., "s16", "fltp").
+        bits_per_sample (int): The bits per sample (0 for compressed codecs).
+        duration (Optional[float]): The duration of the stream in seconds, if known.
+    """
+    index: int
+    codec: str
+    sample_rate: int
+    channels: int
+    sample_format: Optional[str]
+    bits_per_sample: int
+    duration: Optional[float]
+
+
+@dataclass(frozen=True)
+class MediaInfo:
+    """
+    Container and stream metadata of a media file.
+
+    Attributes:
+        path (str): Path to the media file.
+        format_name (str): The container format(s) detected by FFmpeg (e.g., "mov,mp4,m4a,3gp,3g2,mj2").
+        duration (Optional[float]): The duration of the file in seconds, if known.
+        size (int): The size of the file in bytes.
+        audio_streams (Tuple[AudioStream, ...]): The audio streams of the file.
+        video_codecs (Tuple[str, ...]): The codecs of the video streams of the file (cover art excluded).
+    """
+    path: str
+    format_name: str
+    duration: Optional[float]
+    size: int
+    audio_streams: Tuple[AudioStream, ...]
+    video_codecs: Tuple[str, ...]
+
+    @property
+    def audio(self) -> Optional[AudioStream]:
+        """The first audio stream, which FFmpeg converts by default, or None."""
+        return self.audio_streams[0] if self.audio_streams else None
+
+    @property
+    def has_video(self) -> bool:
+        """Whether the file has a video stream."""
+        return bool(self.video_codecs)
+
+
+def _float(value: Any) -> Optional[float]:
+    """
+    Parses a number reported by ffprobe.
+
+    Args:
+        value (Any): The reported value (a string, or None if missing).
+
+    Returns:
+        Optional[float]: The parsed number, or None if it is missing or not a number ("N/A").
+    """
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class MediaProbe:
+    """
+    Reads the metadata of media files with ffprobe.
+
+    ffprobe only reads the container headers, so probing takes milliseconds even for long files.
+    Results are cached per file (path, size and modification time), so the steps of a run, and
+    later runs on the same file, do not probe it again.
+
+    Attributes:
+        _cache (OrderedDict): The metadata probed so far, least recently used first.
+        _max_entries (int): The most files kept in the cache.
+        _lock (threading.Lock): Guards the cache.
+
+    Methods:
+        probe: Returns the metadata of a media file.
+    """
+
+    _cache: "OrderedDict[Tuple[str, int, int], MediaInfo]" = OrderedDict()
+    _max_entries = 256
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _run(file_path: str) -> Dict[str, Any]:
+        """
+        Runs ffprobe on a file.
+
+        Args:
+            file_path (str): Path to the media file.
+
+        Returns:
+            Dict[str, Any]: The format and streams reported by ffprobe.
+
+        Raises:
+            ValueError: If ffprobe cannot read the file.
+        """
+        ffprobe_command = [
+            "ffprobe",
+            "-v", "error",
+            "-print_format", "json",
+            "-show_format",
+            "-show_streams",
+            file_path
+        ]
+
+        process = subprocess.run(ffprobe_command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        if process.returncode != 0:
+            raise ValueError(f"The file is not a valid media file: {process.stderr.decode().strip()}")
+
+        return json.loads(process.stdout.decode() or "{}")
+
+    @classmethod
+    def _parse(cls, file_path: str, size: int, report: Dict[str, Any]) -> MediaInfo:
+        """
+        Builds the metadata of a file from the ffprobe report.
+
+        Args:
+            file_path (str): Path to the media file.
+            size (int): The size of the file in bytes.
+            report (Dict[str, Any]): The format and streams reported by ffprobe.
+
+        Returns:
+            MediaInfo: The metadata of the file.
+        """
+        audio_streams = []
+        video_codecs = []
+        for stream in report.get("streams", []):
+            if stream.get("codec_type") == "audio":
+                audio_streams.append(AudioStream(
+                    index=int(stream.get("index", 0)),
+                    codec=stream.get("codec_name", ""),
+                    sample_rate=int(_float(stream.get("sample_rate")) or 0),
+                    channels=int(stream.get("channels", 0)),
+                    sample_format=stream.get("sample_fmt"),
+                    bits_per_sample=int(stream.get("bits_per_sample", 0)),
+                    duration=_float(stream.get("duration")),
+                ))
+            elif stream.get("codec_type") == "video" and not stream.get("disposition", {}).get("attached_pic"):
+                video_codecs.append(stream.get("codec_name", ""))
+
+        media_format = report.get("format", {})
+        return MediaInfo(
+            path=file_path,
+            format_name=media_format.get("format_name", ""),
+            duration=_float(media_format.get("duration")),
+            size=size,
+            audio_streams=tuple(audio_streams),
+            video_codecs=tuple(video_codecs),
+        )
+
+    @classmethod
+    def probe(cls, file_path: str) -> MediaInfo:
+        """
+        Returns the metadata of a media file, probing it on first use.
+
+        Args:
+            file_path (str): Path to the media file.
+
+        Returns:
+            MediaInfo: The metadata of the file.
+
+        Raises:
+            FileNotFoundError: If the file does not exist.
+            ValueError: If the file is not a valid media file.
+        """
+        if not os.path.exists(file_path):
+            raise FileNotFoundError("The file does not exist!")
+
+        stat = os.stat(file_path)
+        key = (os.path.realpath(file_path), stat.st_size, stat.st_mtime_ns)
+
+        with cls._lock:
+            if key in cls._cache:
+                cls._cache.move_to_end(key)
+                return cls._cache[key]
+
+        info = cls._parse(file_path, stat.st_size, cls._run(file_path))
+
+        with cls._lock:
+            cls._cache[key] = info
+            while len(cls._cache) > cls._max_entries:
+                cls._cache.popitem(last=False)
+
+        return info
+
+
+class PcmStream:
+    """
+    Audio decoded by FFmpeg to 16 kHz mono 16-bit PCM, read from its stdout pipe as it is produced.
+
+    The stream reads like a `wave.Wave_read`, so consumers of WAV files can consume it too. FFmpeg
+    starts on the first read, so a stream that is never read costs nothing, and only the pipe
+    buffer is held in memory, whatever the duration of the input.
+
+    Attributes:
+        file_path (str): Path to the media file.
+        key (str): An identifier of the decoded audio (e.g., to key its transcription).
+        info (MediaInfo): The metadata of the media file.
+
+    Methods:
+        getnchannels: Returns the number of channels (1).
+        getsampwidth: Returns the sample width in bytes (2).
+        getframerate: Returns the sample rate (16000).
+        getnframes: Returns the expected number of frames, estimated from the probed duration.
+        readframes: Reads the next frames, blocking until FFmpeg has decoded them.
+        close: Stops FFmpeg and reports its errors.
+    """
+
+    sample_rate = 16000
+    sample_width = 2
+    channels = 1
+
+    def __init__(self, file_path: str, key: str, info: MediaInfo):
+        """
+        Initializes the stream (FFmpeg is only started on the first read).
+
+        Args:
+            file_path (str): Path to the media file.
+            key (str): An identifier of the decoded audio.
+            info (MediaInfo): The metadata of the media file, which must have an audio stream.
+        """
+        self.file_path = file_path
+        self.key = key
+        self.info = info
+        self._process: Optional[subprocess.Popen] = None
+        self._stderr = None
+        self._eof = False
+
+    def _start(self) -> None:
+        """Starts FFmpeg, unless it is already running."""
+        if self._process is not None or self._eof:
+            return
+
+        ffmpeg_command = [
+            "ffmpeg",
+            "-v", "error",
+            "-nostdin",
+            "-i", self.file_path,
+            "-map", f"0:{self.info.audio.index}",
+            "-vn",
+            "-ac", str(self.channels),
+            "-ar", str(self.sample_rate),
+            "-acodec", "pcm_s16le",
+            "-f", "s16le",
+            "pipe:1"
+        ]
+
+        # Errors go to a file rather than a second pipe, which could fill up and block FFmpeg.
+        self._stderr = tempfile.TemporaryFile()
+        self._process = subprocess.Popen(ffmpeg_command, stdout=subprocess.PIPE, stderr=self._stderr)
+
+    def getnchannels(self) -> int:
+        return self.channels
+
+    def getsampwidth(self) -> int:
+        return self.sample_width
+
+    def getframerate(self) -> int:
+        return self.sample_rate
+
+    def getnframes(self) -> int:
+        """
+        Returns the expected number of frames, estimated from the probed duration.
+
+        Returns:
+            int: The expected number of frames (0 if the duration is unknown).
+        """
+        duration = self.info.duration or (self.info.audio.duration if self.info.audio else None) or 0
+        return int(duration * self.sample_rate)
+
+    def readframes(self, n: int) -> bytes:
+        """
+        Reads the next frames, blocking until FFmpeg has decoded them.
+
+        Args:
+            n (int): The number of frames to read.
+
+        Returns:
+            bytes: Up to `n` frames of PCM; fewer only at the end of the stream, and none after it.
+        """
+        if self._eof:
+            return b""
+        self._start()
+
+        size = n * self.sample_width * self.channels
+        data = self._process.stdout.read(size)
+        if len(data) < size:
+            self._eof = True
+        return data
+
+    def close(self) -> None:
+        """
+        Stops FFmpeg and reports its errors.
+
+        Raises:
+            Exception: If FFmpeg failed while decoding the whole stream.
+        """
+        if self._process is None:
+            return
+
+        process, self._process = self._process, None
+        if not self._eof:
+            process.kill()
+        process.stdout.close()
+        returncode = process.wait()
+
+        self._stderr.seek(0)
+        stderr = self._stderr.read().decode(errors="replace")
+        self._stderr.close()
+
+        if self._eof and returncode != 0:
+            raise Exception(f"FFmpeg error: {stderr}")
+
+    def __enter__(self) -> "PcmStream":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
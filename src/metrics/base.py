@@ -0,0 +1,157 @@
+import os
+from multiprocessing.util import Finalize
+
+from typing import Callable, Iterable
+
+from prometheus_client import REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.registry import Collector
+
+# Where every process writes its metric values when metrics are collected across processes
+# (e.g., with JOB_EXECUTOR=process). It must be set, and empty, before any process imports this module.
+MULTIPROCESS_DIRECTORY = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+
+# Buckets for pipeline steps, which range from milliseconds (cache hits) to an hour (long recordings).
+STEP_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+
+# Buckets for LLM requests, which range from sub-second to several minutes.
+LLM_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300)
+
+HTTP_REQUESTS = Counter(
+    "summarizer_http_requests_total",
+    "HTTP requests handled, by method, route and status code.",
+    ["method", "route", "status"],
+)
+
+PIPELINE_RUNS_IN_FLIGHT = Gauge(
+    "summarizer_pipeline_runs_in_flight",
+    "Pipeline runs currently being processed.",
+    multiprocess_mode="livesum",
+)
+
+STEP_DURATION = Histogram(
+    "summarizer_step_duration_seconds",
+    "Wall time of each pipeline step.",
+    ["step"],
+    buckets=STEP_BUCKETS,
+)
+
+STEP_ERRORS = Counter(
+    "summarizer_step_errors_total",
+    "Pipeline steps that raised an error.",
+    ["step"],
+)
+
+ASR_MEDIA_SECONDS = Counter(
+    "summarizer_asr_media_seconds_total",
+    "Seconds of audio transcribed. Divide its rate by the rate of summarizer_asr_wall_seconds_total for the real-time factor.",
+    ["model"],
+)
+
+ASR_WALL_SECONDS = Counter(
+    "summarizer_asr_wall_seconds_total",
+    "Wall seconds spent transcribing.",
+    ["model"],
+)
+
+ASR_SKIPPED_SECONDS = Counter(
+    "summarizer_asr_skipped_seconds_total",
+    "Seconds of audio dropped as non-speech by voice activity detection before recognition.",
+    ["model"],
+)
+
+LIVE_SESSIONS = Gauge(
+    "summarizer_live_sessions",
+    "Live transcription sessions currently open.",
+    multiprocess_mode="livesum",
+)
+
+LIVE_THROTTLED_SECONDS = Counter(
+    "summarizer_live_throttled_seconds_total",
+    "Seconds live sessions were held back for sending audio faster than allowed.",
+)
+
+LLM_TOKENS = Counter(
+    "summarizer_llm_tokens_total",
+    "LLM tokens, by provider, model and direction (input or output).",
+    ["provider", "model", "direction"],
+)
+
+LLM_REQUEST_DURATION = Histogram(
+    "summarizer_llm_request_duration_seconds",
+    "Wall time of LLM requests, by provider and model.",
+    ["provider", "model"],
+    buckets=LLM_BUCKETS,
+)
+
+CACHE_REQUESTS = Counter(
+    "summarizer_cache_requests_total",
+    "Cache lookups, by cache and result (hit or miss).",
+    ["cache", "result"],
+)
+
+
+def init_worker_metrics() -> None:
+    """
+    Prepares a worker process to record metrics in multiprocess mode.
+
+    Used as the initializer of worker pools: the live gauges of the worker are dropped when it
+    exits, so gauges such as the in-flight runs do not count work of processes that are gone.
+    """
+    if MULTIPROCESS_DIRECTORY:
+        Finalize(None, multiprocess.mark_process_dead, args=(os.getpid(), MULTIPROCESS_DIRECTORY), exitpriority=0)
+
+
+class JobCollector(Collector):
+    """
+    Reports the background jobs tracked by the server, by status.
+
+    The counts are read from the job manager at scrape time rather than kept in a gauge: gauges
+    computed through `set_function` are not exported in multiprocess mode.
+
+    Attributes:
+        statuses (Iterable[str]): The job statuses to report.
+        count (Callable[[str], int]): Returns the number of jobs with a status.
+
+    Methods:
+        collect: Yields the job counts.
+    """
+
+    def __init__(self, statuses: Iterable[str], count: Callable[[str], int]):
+        self.statuses = list(statuses)
+        self.count = count
+
+    def collect(self):
+        """
+        Yields the job counts.
+
+        Yields:
+            GaugeMetricFamily: The `summarizer_jobs` gauge, one sample per status.
+        """
+        jobs = GaugeMetricFamily("summarizer_jobs", "Background jobs currently tracked, by status.", labels=["status"])
+        for status in self.statuses:
+            jobs.add_metric([status], self.count(status))
+        yield jobs
+
+
+def export_metrics(*collectors: Collector) -> bytes:
+    """
+    Returns the current values of all metrics in the Prometheus text format.
+
+    With `PROMETHEUS_MULTIPROC_DIR` set, the values recorded by every process (the server, the job
+    worker processes) are merged, so the work done in job worker processes is exported as well.
+
+    Args:
+        *collectors (Collector): Collectors of the server process added to this scrape only (e.g., a `JobCollector`).
+
+    Returns:
+        bytes: The metrics.
+    """
+    registry = CollectorRegistry()
+    if MULTIPROCESS_DIRECTORY:
+        multiprocess.MultiProcessCollector(registry, path=MULTIPROCESS_DIRECTORY)
+    else:
+        registry.register(REGISTRY)
+    for collector in collectors:
+        registry.register(collector)
+    return generate_latest(registry)
@@ -1,41 +1,126 @@
-from typing import List, Type, Any
+import sys
+import queue
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Type
+
+from path_handler import PathManager
+
+path_manager = PathManager()
+sys.path.append(str(path_manager.get_base_directory()))
+
+from src.metrics.base import PIPELINE_RUNS_IN_FLIGHT
+from src.pipeline.context import PipelineContext
+from src.pipeline.hooks import MetricsHook, PipelineHook
+
+# The version of the processing steps. Bump it whenever a change alters the summaries, so cached results are not reused.
+PIPELINE_VERSION = "1"
+
 
 class SummarizingPipeline:
     """
     A pipeline for summarizing input data through a series of processing steps.
 
     This class encapsulates a sequence of steps that process input data and produce a summarized output.
-    Each step in the pipeline is expected to have a `run` method that takes input and returns processed output.
+    Each step in the pipeline is expected to have a `run` method that takes input and returns processed output,
+    and a `stage` attribute naming what it does (e.g., "converting").
 
     Attributes:
         steps (List[Type[Any]]): A list of processing steps to execute in sequence.
+        hooks (List[PipelineHook]): Hooks that observe every run of the pipeline.
 
     Methods:
         summarize: Executes the pipeline steps on the input data and returns the summarized result.
+        stream: Executes the pipeline in the background and yields its events as they happen.
     """
-    
-    def __init__(self, steps: List[Type[Any]]) -> None:
+
+    def __init__(self, steps: List[Type[Any]], hooks: Optional[List[PipelineHook]] = None) -> None:
         """
         Initializes the SummarizingPipeline with a list of processing steps.
 
         Args:
             steps (List[Type[Any]]): A list of processing steps to execute in sequence.
+            hooks (Optional[List[PipelineHook]]): Hooks that observe every run of the pipeline
+                                                  (defaults to a `MetricsHook`).
         """
         self.steps = steps
-    
-    def summarize(self, input: Type[Any]) -> str:
+        self.hooks = hooks if hooks is not None else [MetricsHook()]
+
+    def summarize(self, input: Type[Any], context: Optional[PipelineContext] = None) -> str:
         """
         Executes the pipeline steps on the input data and returns the summarized result.
 
         Args:
             input (Type[Any]): The input data to process.
+            context (Optional[PipelineContext]): The state of this run. A "stage" event is emitted
+                                                 to its listener before each step, and its hooks are
+                                                 called along with those of the pipeline.
 
         Returns:
             str: The summarized output after processing through all pipeline steps.
         """
+        context = context or PipelineContext()
+        hooks = [*self.hooks, *context.hooks]
         result = input
-        
-        for step in self.steps:
-            result = step.run(result)
-        
-        return result
\ No newline at end of file
+
+        with PIPELINE_RUNS_IN_FLIGHT.track_inprogress():
+            for hook in hooks:
+                hook.on_run_start(context)
+            
+            try:
+                for step in self.steps:
+                    context.emit("stage", stage=step.stage)
+                    for hook in hooks:
+                        hook.before_step(step, result, context)
+                    
+                    try:
+                        output = step.run(result, context)
+                    except Exception as e:
+                        for hook in hooks:
+                            hook.on_error(step, result, e, context)
+                        raise
+                    
+                    for hook in hooks:
+                        hook.after_step(step, result, output, context)
+                    result = output
+            finally:
+                for hook in hooks:
+                    hook.on_run_end(context)
+
+        return result
+
+    def stream(self, input: Type[Any], context: Optional[PipelineContext] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Executes the pipeline in the background and yields its events as they happen.
+
+        The events are the "stage", "progress" and "token" events emitted by the steps, followed by
+        either a "done" event carrying the full summary or an "error" event. The "error" event carries
+        the message of the error and the HTTP status it maps to (the `status_code` of the error, or 500).
+
+        Args:
+            input (Type[Any]): The input data to process.
+            context (Optional[PipelineContext]): The state of this run. Its listener is replaced by
+                                                 the one feeding this iterator.
+
+        Yields:
+            Dict[str, Any]: The events of the run, each with an "event" key naming its type.
+        """
+        events: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue()
+        context = context or PipelineContext()
+        context.listener = events.put
+
+        def worker() -> None:
+            try:
+                summary = self.summarize(input, context)
+                events.put({"event": "done", "summary": summary})
+            except Exception as e:
+                events.put({"event": "error", "detail": str(e), "status": getattr(e, "status_code", 500)})
+            finally:
+                events.put(None)
+
+        threading.Thread(target=worker, name="pipeline-stream", daemon=True).start()
+
+        while True:
+            event = events.get()
+            if event is None:
+                break
+            yield event
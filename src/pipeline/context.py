@@ -0,0 +1,82 @@
+import sys
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from path_handler import PathManager
+
+path_manager = PathManager()
+sys.path.append(str(path_manager.get_base_directory()))
+
+from src.media.base import MediaInfo
+from src.workspace.base import Workspace
+
+
+@dataclass
+class PipelineContext:
+    """
+    Per-run state shared by the steps of a pipeline run.
+
+    A pipeline instance can serve several runs at once, so anything that belongs to a single run
+    (such as the listener that receives its progress events) lives here rather than on the steps.
+
+    Attributes:
+        listener (Optional[Callable[[Dict[str, Any]], None]]): A function that receives the events
+                                                               of the run (stages, progress, tokens).
+        content_hash (Optional[str]): The SHA-256 digest of the pipeline input, if already known.
+                                      Steps that cache by content use it instead of hashing the input again.
+        job_id (Optional[str]): The identifier of the job the run belongs to, if any.
+        use_cache (bool): Whether steps may reuse stored artifacts (converted audio, transcriptions).
+                          When False, every step does its work again (e.g., for benchmarks).
+        media_info (Optional[MediaInfo]): The metadata of the media input, once a step has probed it,
+                                          so later steps do not read it again.
+        workspace (Optional[Workspace]): The scratch directory of the job the run belongs to, if any.
+                                         Steps write their intermediate files there.
+        hooks (List[Any]): Pipeline hooks (see `src.pipeline.hooks`) that observe this run only,
+                           in addition to the hooks of the pipeline.
+        transcript_id (Optional[str]): The key of the stored transcription of the input, once a step
+                                       has transcribed it (or found it stored), so time ranges of
+                                       it can be summarized later.
+
+    Methods:
+        emit: Sends an event to the listener, if any.
+        set_transcript: Records the key of the stored transcription of the input.
+        is_streaming: Checks whether anyone listens to the events of the run.
+    """
+    listener: Optional[Callable[[Dict[str, Any]], None]] = None
+    content_hash: Optional[str] = None
+    job_id: Optional[str] = None
+    use_cache: bool = True
+    media_info: Optional[MediaInfo] = None
+    workspace: Optional[Workspace] = None
+    hooks: List[Any] = field(default_factory=list)
+    transcript_id: Optional[str] = None
+
+    def emit(self, event: str, **data: Any) -> None:
+        """
+        Sends an event to the listener, if any.
+
+        Args:
+            event (str): The type of the event (e.g., "stage", "progress", "token").
+            **data: The payload of the event.
+        """
+        if self.listener is not None:
+            self.listener({"event": event, **data})
+
+    def set_transcript(self, transcript_id: str) -> None:
+        """
+        Records the key of the stored transcription of the input and emits it as a "transcript" event.
+
+        Args:
+            transcript_id (str): The key of the transcription in the transcription store.
+        """
+        self.transcript_id = transcript_id
+        self.emit("transcript", transcript_id=transcript_id)
+
+    def is_streaming(self) -> bool:
+        """
+        Checks whether anyone listens to the events of the run.
+
+        Returns:
+            bool: True if the run has a listener.
+        """
+        return self.listener is not None
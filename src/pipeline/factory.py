@@ -1,6 +1,8 @@
 import sys
+import threading
 from enum import Enum
 from abc import ABC, abstractmethod
+from collections import OrderedDict
 
 from path_handler import PathManager
 
@@ -8,6 +10,8 @@ path_manager = PathManager()
 sys.path.append(str(path_manager.get_base_directory()))
 
 from src.config.config import PipelineConfig
+from src.config.settings import SETTINGS
+from src.convertion.base import PcmStreamDecoder
 from src.convertion.factory import AudioConvertorFactory, VideoToAudioFactory
 from src.transcription.factory import SpeechToTextFactory
 from src.summarization.factory import SummarizerFactory
@@ -19,31 +23,76 @@ class SummarizingPipelineFactory:
     Factory class for creating SummarizingPipeline instances.
 
     This class constructs a pipeline based on the provided configuration, including steps for audio/video conversion, transcription, and summarization.
+    Pipelines keep no per-run state, so built pipelines are cached per configuration (least recently used first out) and shared between requests.
+
+    Attributes:
+        _cache (OrderedDict[PipelineConfig, SummarizingPipeline]): The built pipelines, keyed by their configuration.
+        _lock (threading.Lock): Guards the cache.
 
     Methods:
-        create: Creates a SummarizingPipeline instance based on the provided configuration.
+        create: Returns a SummarizingPipeline instance for the provided configuration.
+        _build: Builds a new SummarizingPipeline instance based on the provided configuration.
     """
     
+    _cache: "OrderedDict[PipelineConfig, SummarizingPipeline]" = OrderedDict()
+    _lock = threading.Lock()
+    
     @classmethod
     def create(cls, pipeline_config: PipelineConfig) -> SummarizingPipeline:
         """
-        Creates a SummarizingPipeline instance based on the provided configuration.
+        Returns a SummarizingPipeline instance for the provided configuration, building it only if it is not cached.
 
         Args:
             pipeline_config (PipelineConfig): The configuration for the pipeline, including pipeline type, audio format, provider, language, and summarizer configuration.
 
+        Returns:
+            SummarizingPipeline: A pipeline configured to process input data according to the specified configuration.
+        """
+        with cls._lock:
+            pipeline = cls._cache.get(pipeline_config)
+            if pipeline is not None:
+                cls._cache.move_to_end(pipeline_config)
+                return pipeline
+        
+        pipeline = cls._build(pipeline_config)
+        
+        with cls._lock:
+            pipeline = cls._cache.setdefault(pipeline_config, pipeline)
+            cls._cache.move_to_end(pipeline_config)
+            while len(cls._cache) > SETTINGS.pipeline_cache_size:
+                cls._cache.popitem(last=False)
+        
+        return pipeline
+    
+    @classmethod
+    def _build(cls, pipeline_config: PipelineConfig) -> SummarizingPipeline:
+        """
+        Builds a new SummarizingPipeline instance based on the provided configuration.
+
+        Args:
+            pipeline_config (PipelineConfig): The configuration for the pipeline.
+
         Returns:
             SummarizingPipeline: A pipeline configured to process input data according to the specified configuration.
         """
         steps = []
         
-        if pipeline_config.pipeline_type.value == "Video":
+        if pipeline_config.streaming and pipeline_config.pipeline_type.value in ("Video", "Audio"):
+            steps.append(
+                PcmStreamDecoder()
+            )
+            
+            steps.append(
+                SpeechToTextFactory.create(pipeline_config.provider, pipeline_config.language, pipeline_config.vad)
+            )
+        
+        elif pipeline_config.pipeline_type.value == "Video":
             steps.append(
                 VideoToAudioFactory.create(pipeline_config.audio_format)
             )
             
             steps.append(
-                SpeechToTextFactory.create(pipeline_config.provider, pipeline_config.language)
+                SpeechToTextFactory.create(pipeline_config.provider, pipeline_config.language, pipeline_config.vad)
             )
         
         elif pipeline_config.pipeline_type.value == "Audio":
@@ -52,7 +101,7 @@ class SummarizingPipelineFactory:
             )
         
             steps.append(
-                SpeechToTextFactory.create(pipeline_config.provider, pipeline_config.language)
+                SpeechToTextFactory.create(pipeline_config.provider, pipeline_config.language, pipeline_config.vad)
             )
         
         
@@ -0,0 +1,263 @@
+import os
+import sys
+import json
+import time
+import pstats
+import random
+import cProfile
+import threading
+from typing import Any, Dict, List, Optional
+
+from path_handler import PathManager
+
+path_manager = PathManager()
+sys.path.append(str(path_manager.get_base_directory()))
+
+from src.metrics.base import STEP_DURATION, STEP_ERRORS
+from src.pipeline.context import PipelineContext
+
+
+def _size(value: Any) -> Optional[int]:
+    """
+    Returns the size of a step input or output.
+
+    Args:
+        value (Any): The value passed between steps (a file path or a text).
+
+    Returns:
+        Optional[int]: The size of the file for an existing path, the UTF-8 length of any other
+                       text, or None for other values.
+    """
+    if isinstance(value, str):
+        if os.path.isfile(value):
+            return os.path.getsize(value)
+        return len(value.encode("UTF-8"))
+    return None
+
+
+class PipelineHook:
+    """
+    Base class for pipeline hooks.
+
+    Hooks observe a pipeline run: they are called when the run starts and ends, and before,
+    after and on the failure of each step. All methods do nothing by default, so subclasses only
+    override what they need. Hooks must not change the values passed between steps.
+
+    Methods:
+        on_run_start: Called before the first step of a run.
+        before_step: Called before a step runs.
+        after_step: Called after a step succeeded.
+        on_error: Called when a step raised an error.
+        on_run_end: Called after the run, whether it succeeded or not.
+    """
+
+    def on_run_start(self, context: PipelineContext) -> None:
+        """
+        Called before the first step of a run.
+
+        Args:
+            context (PipelineContext): The state of the run.
+        """
+
+    def before_step(self, step: Any, input: Any, context: PipelineContext) -> None:
+        """
+        Called before a step runs.
+
+        Args:
+            step (Any): The step about to run.
+            input (Any): The input of the step.
+            context (PipelineContext): The state of the run.
+        """
+
+    def after_step(self, step: Any, input: Any, output: Any, context: PipelineContext) -> None:
+        """
+        Called after a step succeeded.
+
+        Args:
+            step (Any): The step that ran.
+            input (Any): The input of the step.
+            output (Any): The output of the step.
+            context (PipelineContext): The state of the run.
+        """
+
+    def on_error(self, step: Any, input: Any, error: BaseException, context: PipelineContext) -> None:
+        """
+        Called when a step raised an error.
+
+        Args:
+            step (Any): The step that failed.
+            input (Any): The input of the step.
+            error (BaseException): The error raised by the step.
+            context (PipelineContext): The state of the run.
+        """
+
+    def on_run_end(self, context: PipelineContext) -> None:
+        """
+        Called after the run, whether it succeeded or not.
+
+        Args:
+            context (PipelineContext): The state of the run.
+        """
+
+
+class MetricsHook(PipelineHook):
+    """
+    Records the duration and failures of each step in the Prometheus metrics.
+
+    A single instance is shared by all runs; the start time of the current step is kept per thread.
+    """
+
+    def __init__(self):
+        """Initializes the hook."""
+        self._local = threading.local()
+
+    def before_step(self, step: Any, input: Any, context: PipelineContext) -> None:
+        self._local.start = time.perf_counter()
+
+    def after_step(self, step: Any, input: Any, output: Any, context: PipelineContext) -> None:
+        STEP_DURATION.labels(step=type(step).__name__).observe(time.perf_counter() - self._local.start)
+
+    def on_error(self, step: Any, input: Any, error: BaseException, context: PipelineContext) -> None:
+        STEP_DURATION.labels(step=type(step).__name__).observe(time.perf_counter() - self._local.start)
+        STEP_ERRORS.labels(step=type(step).__name__).inc()
+
+
+class SpanRecorder(PipelineHook):
+    """
+    Records a span per step: wall time, CPU time, and the sizes of the input and output.
+
+    The CPU time is that of the thread running the pipeline; work done by child processes
+    (such as FFmpeg) shows up as wall time only. A recorder belongs to a single run.
+
+    Attributes:
+        spans (List[Dict[str, Any]]): The recorded spans, in execution order.
+
+    Methods:
+        to_trace: Returns the spans in the Trace Event Format.
+        export: Writes the spans as a JSON trace file.
+    """
+
+    def __init__(self):
+        """Initializes an empty recorder."""
+        self.spans: List[Dict[str, Any]] = []
+        self._start_wall = 0.0
+        self._start_cpu = 0.0
+
+    def before_step(self, step: Any, input: Any, context: PipelineContext) -> None:
+        self._start_wall = time.time()
+        self._start_cpu = time.thread_time()
+
+    def _record(self, step: Any, input: Any, output: Any, error: Optional[BaseException]) -> None:
+        """
+        Records the span of a finished step.
+
+        Args:
+            step (Any): The step that ran.
+            input (Any): The input of the step.
+            output (Any): The output of the step (None if it failed).
+            error (Optional[BaseException]): The error raised by the step, if any.
+        """
+        self.spans.append({
+            "step": type(step).__name__,
+            "stage": getattr(step, "stage", None),
+            "start": self._start_wall,
+            "wall_seconds": time.time() - self._start_wall,
+            "cpu_seconds": time.thread_time() - self._start_cpu,
+            "input_bytes": _size(input),
+            "output_bytes": _size(output),
+            "error": str(error) if error is not None else None,
+        })
+
+    def after_step(self, step: Any, input: Any, output: Any, context: PipelineContext) -> None:
+        self._record(step, input, output, None)
+
+    def on_error(self, step: Any, input: Any, error: BaseException, context: PipelineContext) -> None:
+        self._record(step, input, None, error)
+
+    def to_trace(self) -> Dict[str, Any]:
+        """
+        Returns the spans in the Trace Event Format, which trace viewers (Perfetto, chrome://tracing) load.
+
+        Returns:
+            Dict[str, Any]: One complete ("X") event per span, with the CPU time and sizes as arguments.
+        """
+        pid = os.getpid()
+        events = [
+            {
+                "name": span["step"],
+                "cat": "pipeline",
+                "ph": "X",
+                "ts": int(span["start"] * 1e6),
+                "dur": int(span["wall_seconds"] * 1e6),
+                "pid": pid,
+                "tid": 0,
+                "args": {
+                    "stage": span["stage"],
+                    "cpu_seconds": span["cpu_seconds"],
+                    "input_bytes": span["input_bytes"],
+                    "output_bytes": span["output_bytes"],
+                    "error": span["error"],
+                },
+            }
+            for span in self.spans
+        ]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export(self, path: str) -> str:
+        """
+        Writes the spans as a JSON trace file.
+
+        Args:
+            path (str): Path to the trace file.
+
+        Returns:
+            str: The path of the trace file.
+        """
+        with open(path, mode="w", encoding="UTF-8") as f:
+            json.dump(self.to_trace(), f)
+        return path
+
+
+class ProfilerHook(PipelineHook):
+    """
+    Profiles a whole run with cProfile and writes the profile to a file when the run ends.
+
+    Only the thread running the pipeline is profiled. The profile can be read with `pstats`
+    or visualized with tools such as snakeviz. A profiler belongs to a single run.
+
+    Attributes:
+        path (str): Path to the profile file.
+
+    Methods:
+        sampled: Decides whether a run should be profiled.
+    """
+
+    def __init__(self, path: str):
+        """
+        Initializes the profiler.
+
+        Args:
+            path (str): Path to the profile file.
+        """
+        self.path = path
+        self._profile = cProfile.Profile()
+
+    @staticmethod
+    def sampled(sample_rate: float) -> bool:
+        """
+        Decides whether a run should be profiled.
+
+        Args:
+            sample_rate (float): The fraction of runs to profile (0 disables profiling, 1 profiles every run).
+
+        Returns:
+            bool: True if the run should be profiled.
+        """
+        return sample_rate > 0 and random.random() < sample_rate
+
+    def on_run_start(self, context: PipelineContext) -> None:
+        self._profile.enable()
+
+    def on_run_end(self, context: PipelineContext) -> None:
+        self._profile.disable()
+        pstats.Stats(self._profile).dump_stats(self.path)
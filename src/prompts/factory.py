@@ -6,7 +6,7 @@ path_manager = PathManager()
 sys.path.append(str(path_manager.get_base_directory()))
 
 from src.config.config import Prompt
-from src.prompts.base import THEMATIC, PRIORITY
+from src.prompts.base import THEMATIC, PRIORITY, CHUNK
 
 class PromptFactory:
     """
@@ -17,6 +17,7 @@ class PromptFactory:
 
     Methods:
         create: Returns the prompt template for the specified summarization type.
+        chunk: Returns the prompt that condenses one part of a text summarized part by part.
     """
     
     @classmethod
@@ -38,4 +39,16 @@ class PromptFactory:
         elif prompt.value == "Priority":
             return PRIORITY
         else:
-            raise ValueError(f"There is no prompt named {prompt.value}")
\ No newline at end of file
+            raise ValueError(f"There is no prompt named {prompt.value}")
+    
+    @classmethod
+    def chunk(cls) -> str:
+        """
+        Returns the prompt that condenses one part of a text summarized part by part.
+
+        The notes it produces for every part are then summarized together with the selected prompt.
+
+        Returns:
+            str: The prompt template for the parts of a text.
+        """
+        return CHUNK
@@ -0,0 +1,413 @@
+import re
+import sys
+import json
+import time
+import uuid
+import random
+import asyncio
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from path_handler import PathManager
+
+path_manager = PathManager()
+sys.path.append(str(path_manager.get_base_directory()))
+
+from src.cache.base import ArtifactStore, make_cache_key
+
+# Splits a text into word-like tokens, keeping the whitespace that follows each one.
+TOKEN_PATTERN = re.compile(r"\S+\s*")
+
+
+@dataclass(frozen=True)
+class StubConfig:
+    """
+    Configuration of the stub LLM server.
+
+    Attributes:
+        mode (str): Where answers come from: "generate" (synthesized from the request), "record"
+                    (replayed from the cassettes, or fetched from the upstream provider and recorded)
+                    or "replay" (only from the cassettes; unknown requests fail).
+        latency_seconds (float): The delay before the first token.
+        jitter_seconds (float): The largest random delay added to the latency.
+        tokens_per_second (float): The pace of the answer tokens (0 sends them at once).
+        completion_tokens (int): The length of synthesized answers, in tokens.
+        rate_limit_rate (float): The fraction of requests answered with 429 Too Many Requests.
+        server_error_rate (float): The fraction of requests answered with a 500, 502 or 503 error.
+        timeout_rate (float): The fraction of requests that hang before failing with 504.
+        hang_seconds (float): How long hanging requests hang.
+        cassette_directory (str): The directory of the recorded answers.
+        upstream_url (Optional[str]): The base URL of the provider recorded in "record" mode.
+        seed (Optional[int]): The seed of the error injection and jitter, for reproducible runs.
+    """
+    mode: str = "generate"
+    latency_seconds: float = 0.5
+    jitter_seconds: float = 0.0
+    tokens_per_second: float = 50.0
+    completion_tokens: int = 256
+    rate_limit_rate: float = 0.0
+    server_error_rate: float = 0.0
+    timeout_rate: float = 0.0
+    hang_seconds: float = 30.0
+    cassette_directory: str = str(path_manager.get_base_directory() / "cassettes")
+    upstream_url: Optional[str] = None
+    seed: Optional[int] = None
+
+
+def request_key(body: Dict[str, Any]) -> str:
+    """
+    Returns the cassette key of a chat completion request.
+
+    Requests are deterministic at `temperature=0`, so the answer only depends on the model, the
+    messages and the sampling parameters. Whether the answer is streamed does not change it.
+
+    Args:
+        body (Dict[str, Any]): The JSON body of the request.
+
+    Returns:
+        str: The cassette key of the request.
+    """
+    return make_cache_key(
+        model=body.get("model"),
+        messages=body.get("messages"),
+        temperature=body.get("temperature"),
+        top_p=body.get("top_p"),
+        max_tokens=body.get("max_tokens"),
+    )
+
+
+def count_tokens(text: str) -> int:
+    """
+    Approximates the number of tokens in a text (about four tokens for three words).
+
+    Args:
+        text (str): The text.
+
+    Returns:
+        int: The approximate token count.
+    """
+    return (4 * len(TOKEN_PATTERN.findall(text)) + 2) // 3
+
+
+def error_response(status_code: int, message: str, error_type: str, headers: Optional[Dict[str, str]] = None) -> JSONResponse:
+    """
+    Builds an error response in the format of the OpenAI API.
+
+    Args:
+        status_code (int): The HTTP status code.
+        message (str): The error message.
+        error_type (str): The error type.
+        headers (Optional[Dict[str, str]]): Additional response headers.
+
+    Returns:
+        JSONResponse: The error response.
+    """
+    return JSONResponse(
+        status_code=status_code,
+        content={"error": {"message": message, "type": error_type, "code": status_code}},
+        headers=headers,
+    )
+
+
+class StubServer:
+    """
+    A local stand-in for the chat completions API of OpenAI-compatible providers.
+
+    It answers with a configurable latency and token pace, streams like the real API, injects
+    rate limits, server errors and timeouts, and records and replays answers from cassettes.
+
+    Attributes:
+        config (StubConfig): The configuration of the server.
+        cassettes (ArtifactStore): The recorded answers, one JSON file per request key.
+        stats (Dict[str, int]): Counters of the handled requests, by outcome.
+
+    Methods:
+        inject_error: Returns an injected error response for some requests.
+        generate: Synthesizes an answer from the request.
+        answer: Returns the answer to a request and its token usage.
+        completion: Builds a chat completion response.
+        stream: Streams a chat completion as Server-Sent Events.
+        app: Builds the FastAPI application.
+    """
+
+    def __init__(self, config: StubConfig):
+        """
+        Initializes the server.
+
+        Args:
+            config (StubConfig): The configuration of the server.
+        """
+        self.config = config
+        self.cassettes = ArtifactStore(config.cassette_directory, max_bytes=0, name="cassettes")
+        self.stats: Dict[str, int] = {}
+        self._random = random.Random(config.seed)
+        self._upstream: Optional[httpx.AsyncClient] = None
+
+    def _count(self, outcome: str) -> None:
+        """
+        Increments the counter of an outcome.
+
+        Args:
+            outcome (str): The outcome of a request (e.g., "completed", "rate_limited").
+        """
+        self.stats[outcome] = self.stats.get(outcome, 0) + 1
+
+    async def inject_error(self) -> Optional[JSONResponse]:
+        """
+        Returns an injected error response for some requests, at the configured rates.
+
+        Returns:
+            Optional[JSONResponse]: The error response, or None if the request should be answered.
+        """
+        draw = self._random.random()
+        if draw < self.config.rate_limit_rate:
+            self._count("rate_limited")
+            return error_response(429, "Rate limit exceeded (injected).", "rate_limit_error", {"Retry-After": "1"})
+
+        draw -= self.config.rate_limit_rate
+        if draw < self.config.server_error_rate:
+            self._count("server_error")
+            status_code = self._random.choice((500, 502, 503))
+            return error_response(status_code, "Server error (injected).", "server_error")
+
+        draw -= self.config.server_error_rate
+        if draw < self.config.timeout_rate:
+            self._count("timed_out")
+            await asyncio.sleep(self.config.hang_seconds)
+            return error_response(504, "Gateway timeout (injected).", "timeout")
+
+        return None
+
+    def generate(self, body: Dict[str, Any]) -> str:
+        """
+        Synthesizes an answer from the request.
+
+        The answer is a deterministic list of bullet points built from the words of the last message,
+        so the same request always gets the same answer.
+
+        Args:
+            body (Dict[str, Any]): The JSON body of the request.
+
+        Returns:
+            str: The answer.
+        """
+        messages = body.get("messages") or [{"content": ""}]
+        words = str(messages[-1].get("content", "")).split() or ["summary"]
+        length = min(self.config.completion_tokens, body.get("max_tokens") or self.config.completion_tokens)
+
+        # About three words per four tokens, minus the heading.
+        count = max(3 * length // 4 - 2, 1)
+        lines = ["# Summary", ""]
+        for start in range(0, count, 12):
+            bullet = [words[i % len(words)] for i in range(start, min(start + 12, count))]
+            lines.append("- " + " ".join(bullet))
+        return "\n".join(lines)
+
+    async def _record(self, body: Dict[str, Any], authorization: Optional[str]) -> Dict[str, Any]:
+        """
+        Fetches an answer from the upstream provider.
+
+        The answer is always requested without streaming; it is streamed to the caller afterwards.
+
+        Args:
+            body (Dict[str, Any]): The JSON body of the request.
+            authorization (Optional[str]): The Authorization header of the request, forwarded upstream.
+
+        Returns:
+            Dict[str, Any]: The answer and its usage, or the upstream error.
+        """
+        if self._upstream is None:
+            self._upstream = httpx.AsyncClient(timeout=httpx.Timeout(600.0, connect=10.0))
+
+        upstream_body = {key: value for key, value in body.items() if key not in ("stream", "stream_options")}
+        response = await self._upstream.post(
+            f"{self.config.upstream_url.rstrip('/')}/chat/completions",
+            json=upstream_body,
+            headers={"Authorization": authorization} if authorization else {},
+        )
+        if response.status_code != 200:
+            return {"status_code": response.status_code, "error": response.json()}
+
+        completion = response.json()
+        return {
+            "content": completion["choices"][0]["message"]["content"],
+            "usage": completion.get("usage"),
+        }
+
+    async def answer(self, body: Dict[str, Any], authorization: Optional[str]) -> Dict[str, Any]:
+        """
+        Returns the answer to a request and its token usage, according to the mode.
+
+        Args:
+            body (Dict[str, Any]): The JSON body of the request.
+            authorization (Optional[str]): The Authorization header of the request.
+
+        Returns:
+            Dict[str, Any]: The answer and its usage, or an error with its status code.
+        """
+        if self.config.mode == "generate":
+            content = self.generate(body)
+            return {"content": content, "usage": None}
+
+        key = request_key(body)
+        cassette = self.cassettes.read_text(key, ".json")
+        if cassette is not None:
+            self._count("replayed")
+            return json.loads(cassette)
+
+        if self.config.mode == "replay" or not self.config.upstream_url:
+            self._count("missed")
+            return {"status_code": 404, "error": {"error": {
+                "message": f"No recorded answer for request {key}.", "type": "cassette_miss", "code": 404,
+            }}}
+
+        recorded = await self._record(body, authorization)
+        if "error" not in recorded:
+            self._count("recorded")
+            self.cassettes.put_text(key, ".json", json.dumps(recorded, ensure_ascii=False))
+        return recorded
+
+    @staticmethod
+    def _usage(body: Dict[str, Any], content: str, usage: Optional[Dict[str, int]]) -> Dict[str, int]:
+        """
+        Returns the token usage of an answer, approximating it when it was not recorded.
+
+        Args:
+            body (Dict[str, Any]): The JSON body of the request.
+            content (str): The answer.
+            usage (Optional[Dict[str, int]]): The recorded usage, if any.
+
+        Returns:
+            Dict[str, int]: The prompt, completion and total token counts.
+        """
+        if usage:
+            return usage
+        prompt_tokens = sum(count_tokens(str(message.get("content", ""))) for message in body.get("messages", []))
+        completion_tokens = count_tokens(content)
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+
+    async def _wait_first_token(self) -> None:
+        """Waits for the configured latency and jitter."""
+        delay = self.config.latency_seconds
+        if self.config.jitter_seconds:
+            delay += self._random.uniform(0, self.config.jitter_seconds)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def completion(self, body: Dict[str, Any], content: str, usage: Optional[Dict[str, int]]) -> Dict[str, Any]:
+        """
+        Builds a chat completion response, after the time the answer would take to generate.
+
+        Args:
+            body (Dict[str, Any]): The JSON body of the request.
+            content (str): The answer.
+            usage (Optional[Dict[str, int]]): The recorded usage, if any.
+
+        Returns:
+            Dict[str, Any]: The chat completion.
+        """
+        await self._wait_first_token()
+        if self.config.tokens_per_second > 0:
+            await asyncio.sleep(len(TOKEN_PATTERN.findall(content)) / self.config.tokens_per_second)
+
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": self._usage(body, content, usage),
+        }
+
+    async def stream(self, body: Dict[str, Any], content: str, usage: Optional[Dict[str, int]]) -> AsyncIterator[str]:
+        """
+        Streams a chat completion as Server-Sent Events, one token at the configured pace.
+
+        Args:
+            body (Dict[str, Any]): The JSON body of the request.
+            content (str): The answer.
+            usage (Optional[Dict[str, int]]): The recorded usage, if any.
+
+        Yields:
+            str: The chunks of the completion, then the usage if requested, then "[DONE]".
+        """
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        created = int(time.time())
+        include_usage = bool((body.get("stream_options") or {}).get("include_usage"))
+
+        def chunk(choices: List[Dict[str, Any]], **extra: Any) -> str:
+            payload = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": body.get("model"),
+                "choices": choices,
+                **extra,
+            }
+            return f"data: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+        await self._wait_first_token()
+        yield chunk([{"index": 0, "delta": {"role": "assistant", "content": ""}, "finish_reason": None}])
+
+        interval = 1 / self.config.tokens_per_second if self.config.tokens_per_second > 0 else 0
+        for token in TOKEN_PATTERN.findall(content):
+            if interval:
+                await asyncio.sleep(interval)
+            yield chunk([{"index": 0, "delta": {"content": token}, "finish_reason": None}])
+
+        yield chunk([{"index": 0, "delta": {}, "finish_reason": "stop"}])
+        if include_usage:
+            yield chunk([], usage=self._usage(body, content, usage))
+        yield "data: [DONE]\n\n"
+
+    def app(self) -> FastAPI:
+        """
+        Builds the FastAPI application.
+
+        Returns:
+            FastAPI: An application serving `POST /v1/chat/completions` and `GET /stats`.
+        """
+        app = FastAPI()
+
+        @app.post("/v1/chat/completions")
+        async def chat_completions(request: Request):
+            body = await request.json()
+            self._count("requests")
+
+            error = await self.inject_error()
+            if error is not None:
+                return error
+
+            answer = await self.answer(body, request.headers.get("Authorization"))
+            if "error" in answer:
+                return JSONResponse(status_code=answer["status_code"], content=answer["error"])
+
+            self._count("completed")
+            if body.get("stream"):
+                return StreamingResponse(
+                    self.stream(body, answer["content"], answer.get("usage")),
+                    media_type="text/event-stream",
+                )
+            return await self.completion(body, answer["content"], answer.get("usage"))
+
+        @app.get("/stats")
+        async def stats():
+            return self.stats
+
+        @app.on_event("shutdown")
+        async def shutdown():
+            if self._upstream is not None:
+                await self._upstream.aclose()
+
+        return app
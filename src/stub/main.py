@@ -0,0 +1,59 @@
+import sys
+import argparse
+
+from path_handler import PathManager
+
+path_manager = PathManager()
+sys.path.append(str(path_manager.get_base_directory()))
+
+from src.stub.base import StubConfig, StubServer
+
+
+def parse_args() -> argparse.Namespace:
+    """
+    Parses the command line.
+
+    Returns:
+        argparse.Namespace: The parsed arguments.
+    """
+    defaults = StubConfig()
+    parser = argparse.ArgumentParser(description="Serves a local stand-in for the chat completions API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--mode", choices=("generate", "record", "replay"), default=defaults.mode,
+                        help="Synthesize answers, record them from --upstream-url, or replay recorded ones.")
+    parser.add_argument("--latency", type=float, default=defaults.latency_seconds, help="Delay before the first token, in seconds.")
+    parser.add_argument("--jitter", type=float, default=defaults.jitter_seconds, help="Largest random delay added to the latency, in seconds.")
+    parser.add_argument("--tokens-per-second", type=float, default=defaults.tokens_per_second, help="Pace of the answer tokens (0 sends them at once).")
+    parser.add_argument("--completion-tokens", type=int, default=defaults.completion_tokens, help="Length of synthesized answers, in tokens.")
+    parser.add_argument("--rate-limit-rate", type=float, default=defaults.rate_limit_rate, help="Fraction of requests answered with 429.")
+    parser.add_argument("--server-error-rate", type=float, default=defaults.server_error_rate, help="Fraction of requests answered with 5xx.")
+    parser.add_argument("--timeout-rate", type=float, default=defaults.timeout_rate, help="Fraction of requests that hang, then fail with 504.")
+    parser.add_argument("--hang", type=float, default=defaults.hang_seconds, help="How long hanging requests hang, in seconds.")
+    parser.add_argument("--cassettes", default=defaults.cassette_directory, help="Directory of the recorded answers.")
+    parser.add_argument("--upstream-url", help="Base URL of the provider to record (e.g., https://openrouter.ai/api/v1).")
+    parser.add_argument("--seed", type=int, help="Seed of the error injection and jitter.")
+
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    args = parse_args()
+    config = StubConfig(
+        mode=args.mode,
+        latency_seconds=args.latency,
+        jitter_seconds=args.jitter,
+        tokens_per_second=args.tokens_per_second,
+        completion_tokens=args.completion_tokens,
+        rate_limit_rate=args.rate_limit_rate,
+        server_error_rate=args.server_error_rate,
+        timeout_rate=args.timeout_rate,
+        hang_seconds=args.hang,
+        cassette_directory=args.cassettes,
+        upstream_url=args.upstream_url,
+        seed=args.seed,
+    )
+
+    uvicorn.run(StubServer(config).app(), host=args.host, port=args.port)
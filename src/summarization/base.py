@@ -1,5 +1,8 @@
 import os
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional
 
 from path_handler import PathManager
 
@@ -7,6 +10,37 @@ path_manager = PathManager()
 sys.path.append(str(path_manager.get_base_directory()))
 
 from src.config.config import SummerizerConfig
+from src.config.settings import SETTINGS
+from src.clients.factory import ClientFactory
+from src.prompts.factory import PromptFactory
+from src.metrics.base import LLM_REQUEST_DURATION, LLM_TOKENS
+from src.pipeline.context import PipelineContext
+from src.llm.factory import LLMFactory
+from src.llm.tokens import estimate_tokens
+from src.summarization.chunking import compress_text, split_text
+
+# The most times the notes of the parts are condensed again before the final summary.
+MAX_REDUCE_DEPTH = 4
+
+# The share of the input budget of a model that estimated token counts may fill, as the estimate
+# can be off by this much for the tokenizer of the model.
+BUDGET_SAFETY = 0.9
+
+# The ways a text is summarized, decided before any request is sent.
+SINGLE = "single"
+COMPRESS = "compress"
+CHUNK = "chunk"
+
+
+class TextTooLongError(ValueError):
+    """
+    Raised when a text cannot be summarized within the context window of the model.
+
+    Attributes:
+        status_code (int): The HTTP status the API answers with (413, Content Too Large).
+    """
+
+    status_code = 413
 
 
 class Summarizer:
@@ -17,51 +51,293 @@ class Summarizer:
     an LLM client to generate summaries based on the provided text.
 
     Attributes:
+        stage (str): The name of the pipeline stage this step performs.
         prompt (str): The summarization prompt to use.
         client: The LLM client for generating summaries.
+        provider (str): The name of the LLM provider (e.g., "OpenRouter").
         model (str): The specific model to use for summarization.
+        model_info (ModelInfo): The context window and output limit of the model, among others.
+        map_reduce (bool): Whether texts longer than `chunk_tokens` are summarized part by part.
+        chunk_tokens (int): The most tokens of a part.
+        overlap_tokens (int): The tokens a part repeats from the previous one.
+        concurrency (int): The number of parts summarized at once.
 
     Methods:
+        _messages: Builds the chat messages for the input text.
+        _record_usage: Records the latency and token usage of an LLM request.
+        _budget: Returns the most tokens of input that fit in one request with a prompt.
+        plan: Decides how a text is summarized, before any request is sent.
+        _complete: Requests a completion from the LLM client in one response.
+        _stream: Streams the summary from the LLM client, emitting each token as it arrives.
+        _summarize_chunks: Takes notes of the parts of a text concurrently.
+        _map_reduce: Summarizes a long text part by part, then summarizes the notes of the parts.
         run: Summarizes the input text using the configured LLM client and prompt.
     """
     
-    def __init__(self, config: SummerizerConfig):
+    stage = "summarizing"
+    
+    def __init__(
+        self,
+        config: SummerizerConfig,
+        map_reduce: Optional[bool] = None,
+        chunk_tokens: Optional[int] = None,
+        overlap_tokens: Optional[int] = None,
+        concurrency: Optional[int] = None
+    ):
         """
         Initializes the Summarizer with the provided configuration.
 
         Args:
             config (SummerizerConfig): The configuration for the summarizer, including the prompt, client, and model.
+            map_reduce (Optional[bool]): Whether long texts are summarized part by part (None for the setting).
+            chunk_tokens (Optional[int]): The most tokens of a part (None for the setting).
+            overlap_tokens (Optional[int]): The tokens a part repeats from the previous one (None for the setting).
+            concurrency (Optional[int]): The number of parts summarized at once (None for the setting).
         """
-        self.prompt = config.prompt
-        self.client = config.client
+        self.prompt = PromptFactory.create(config.prompt)
+        self.client = ClientFactory.create(config.client)
+        self.provider = config.client.value
         self.model = config.model
+        self.model_info = LLMFactory.info(config.model)
+        self.map_reduce = SETTINGS.summary_map_reduce if map_reduce is None else map_reduce
+        self.chunk_tokens = chunk_tokens or SETTINGS.summary_chunk_tokens
+        self.overlap_tokens = SETTINGS.summary_chunk_overlap_tokens if overlap_tokens is None else overlap_tokens
+        self.concurrency = max(1, concurrency or SETTINGS.summary_concurrency)
+    
+    def _messages(self, text: str, prompt: Optional[str] = None) -> List[Dict[str, str]]:
+        """
+        Builds the chat messages for the input text.
+
+        Args:
+            text (str): The input text to summarize.
+            prompt (Optional[str]): The system prompt (None for the selected summarization prompt).
+
+        Returns:
+            List[Dict[str, str]]: The system prompt followed by the input text.
+        """
+        return [
+            {
+                "role": "system", "content": prompt or self.prompt
+            },
+            {
+                "role": "user", "content": text
+            }
+        ]
+    
+    def _record_usage(self, start: float, usage) -> None:
+        """
+        Records the latency and token usage of an LLM request.
+
+        Args:
+            start (float): The `time.perf_counter()` value when the request was sent.
+            usage: The usage reported by the provider, if any.
+        """
+        LLM_REQUEST_DURATION.labels(provider=self.provider, model=self.model).observe(time.perf_counter() - start)
+        if usage is None:
+            return
+        if usage.prompt_tokens:
+            LLM_TOKENS.labels(provider=self.provider, model=self.model, direction="input").inc(usage.prompt_tokens)
+        if usage.completion_tokens:
+            LLM_TOKENS.labels(provider=self.provider, model=self.model, direction="output").inc(usage.completion_tokens)
+            LLMFactory.record(self.model, usage.completion_tokens, time.perf_counter() - start)
+    
+    def _budget(self, prompt: str) -> int:
+        """
+        Returns the most tokens of input that fit in one request with a prompt.
+
+        The budget leaves room for the prompt and a full answer, and a margin for the error of
+        the token estimate.
+
+        Args:
+            prompt (str): The system prompt of the request.
+
+        Returns:
+            int: The input budget, in estimated tokens.
+        """
+        return int(self.model_info.input_budget(estimate_tokens(prompt)) * BUDGET_SAFETY)
+    
+    def plan(self, text: str) -> str:
+        """
+        Decides how a text is summarized, before any request is sent.
+
+        A text that fits the context of the model is summarized in one request (or part by part
+        if `map_reduce` is on and it is longer than a part, which is faster). A text that does not
+        fit is compressed if that is enough, and summarized part by part otherwise, rather than
+        being sent and rejected by the provider.
+
+        Args:
+            text (str): The input text to summarize.
+
+        Returns:
+            str: `SINGLE`, `COMPRESS` or `CHUNK`.
+
+        Raises:
+            TextTooLongError: If the text does not fit and the model cannot even take a part of it
+                              with the note-taking prompt and the overlap.
+        """
+        tokens = estimate_tokens(text)
+        if tokens <= self._budget(self.prompt):
+            return CHUNK if self.map_reduce and tokens > self.chunk_tokens else SINGLE
+        if estimate_tokens(compress_text(text)) <= self._budget(self.prompt):
+            return COMPRESS
+        if self._budget(PromptFactory.chunk()) <= 2 * min(self.overlap_tokens, self.chunk_tokens // 4):
+            raise TextTooLongError(f"The text is too long to summarize with {self.model}, whose context cannot hold a part of it.")
+        return CHUNK
+    
+    def _complete(self, messages: List[Dict[str, str]]) -> str:
+        """
+        Requests a completion from the LLM client in one response.
+
+        Args:
+            messages (List[Dict[str, str]]): The chat messages.
+
+        Returns:
+            str: The content of the completion.
+        """
+        start = time.perf_counter()
+        response = self.client.chat.completions.create(
+            messages=messages,
+            model=self.model,
+            temperature=0
+        )
+        self._record_usage(start, response.usage)
+        
+        return response.choices[0].message.content
+    
+    def _stream(self, text: str, context: PipelineContext) -> str:
+        """
+        Streams the summary from the LLM client, emitting each token as it arrives.
+
+        Args:
+            text (str): The input text to summarize.
+            context (PipelineContext): The state of the pipeline run. A "token" event is emitted
+                                       to its listener for every piece of the summary.
+
+        Returns:
+            str: The full summary.
+        """
+        start = time.perf_counter()
+        response = self.client.chat.completions.create(
+            messages=self._messages(text),
+            model=self.model,
+            temperature=0,
+            stream=True,
+            stream_options={"include_usage": True}
+        )
+        
+        summary = []
+        usage = None
+        for chunk in response:
+            if getattr(chunk, "usage", None) is not None:
+                usage = chunk.usage
+            if not chunk.choices:
+                continue
+            token = chunk.choices[0].delta.content
+            if token:
+                summary.append(token)
+                context.emit("token", text=token)
+        
+        self._record_usage(start, usage)
+        return "".join(summary)
+    
+    def _summarize_chunks(self, chunks: List[str], context: Optional[PipelineContext]) -> List[str]:
+        """
+        Takes notes of the parts of a text concurrently.
+
+        At most `concurrency` requests are in flight at once. Events are emitted from the calling
+        thread only, as the parts complete.
+
+        Args:
+            chunks (List[str]): The parts of the text, in order.
+            context (Optional[PipelineContext]): The state of the pipeline run, if any. A "progress"
+                                                 event is emitted whenever a part is done.
+
+        Returns:
+            List[str]: The notes of the parts, in the order of the parts.
+        """
+        notes: List[Optional[str]] = [None] * len(chunks)
+        prompt = PromptFactory.chunk()
+        with ThreadPoolExecutor(max_workers=min(self.concurrency, len(chunks)), thread_name_prefix="summarize") as executor:
+            futures = {
+                executor.submit(self._complete, self._messages(chunk, prompt)): index
+                for index, chunk in enumerate(chunks)
+            }
+            for done, future in enumerate(as_completed(futures), start=1):
+                notes[futures[future]] = future.result()
+                if context is not None:
+                    context.emit("progress", stage=self.stage, percent=int(done * 100 / len(chunks)))
+        
+        return notes
     
-    def run(self, text: str) -> str:
+    def _map_reduce(self, text: str, context: Optional[PipelineContext]) -> str:
+        """
+        Summarizes a long text part by part, then summarizes the notes of the parts.
+
+        The text is split into parts of at most `chunk_tokens` (or less, for the context of the model)
+        that overlap by `overlap_tokens`, and notes are taken of every part concurrently. While the
+        joined notes are still longer than a part, they are split and condensed again. The final
+        summary of the notes uses the selected prompt, and is streamed if the run is.
+
+        Args:
+            text (str): The input text to summarize.
+            context (Optional[PipelineContext]): The state of the pipeline run, if any.
+
+        Returns:
+            str: The summary.
+
+        Raises:
+            TextTooLongError: If the notes cannot be condensed to fit the context of the model.
+        """
+        chunk_tokens = min(self.chunk_tokens, self._budget(PromptFactory.chunk()))
+        overlap_tokens = min(self.overlap_tokens, chunk_tokens // 4)
+        for _ in range(MAX_REDUCE_DEPTH):
+            chunks = split_text(text, chunk_tokens, overlap_tokens)
+            if len(chunks) == 1:
+                break
+            
+            notes = self._summarize_chunks(chunks, context)
+            reduced = "\n\n".join(f"Part {index}:\n{note}" for index, note in enumerate(notes, start=1))
+            if estimate_tokens(reduced) >= estimate_tokens(text):
+                # The notes did not shrink the text, so condensing them again would not end.
+                text = reduced
+                break
+            text = reduced
+        
+        if estimate_tokens(text) > self._budget(self.prompt):
+            raise TextTooLongError(f"The text is too long to summarize with {self.model}, even part by part.")
+        
+        if context is not None and context.is_streaming():
+            return self._stream(text, context)
+        return self._complete(self._messages(text))
+    
+    def run(self, text: str, context: Optional[PipelineContext] = None) -> str:
         """
         Summarizes the input text using the configured LLM client and prompt.
 
         Args:
             text (str): The input text to summarize. If the text is a file path, the file is read and its content is used as the input text.
+            context (Optional[PipelineContext]): The state of the pipeline run, if any. When the run is
+                                                 streamed, the summary is requested as a stream and emitted token by token.
+                                                 Texts are compressed or summarized part by part first when
+                                                 `plan` decides so.
 
         Returns:
             str: The summarized content generated by the LLM client.
+
+        Raises:
+            TextTooLongError: If the text is too long for the model, even part by part.
         """
         if os.path.exists(text):
             with open(text, mode="r", encoding="UTF-8") as f:
                 text = f.read()
         
-        response = self.client.chat.completions.create(
-            messages= [
-                {
-                    "role": "system", "content": self.prompt
-                },
-                {
-                    "role": "user", "content": text
-                }
-            ],
-            model=self.model,
-            temperature=0
-        )
+        plan = self.plan(text)
+        if plan == CHUNK:
+            return self._map_reduce(text, context)
+        if plan == COMPRESS:
+            text = compress_text(text)
         
-        return response.choices[0].message.content
-    
\ No newline at end of file
+        if context is not None and context.is_streaming():
+            return self._stream(text, context)
+        
+        return self._complete(self._messages(text))
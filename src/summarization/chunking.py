@@ -0,0 +1,141 @@
+import re
+import sys
+from typing import Callable, List
+
+from path_handler import PathManager
+
+path_manager = PathManager()
+sys.path.append(str(path_manager.get_base_directory()))
+
+from src.llm.tokens import estimate_tokens
+
+# Sentence ends (including the Persian question mark) and line breaks.
+_SENTENCE_END = re.compile(r"(?<=[.!?؟])\s+|\n+")
+
+
+def _units(text: str, max_tokens: int, run_tokens: int, count_tokens: Callable[[str], int]) -> List[str]:
+    """
+    Splits a text into sentences, and sentences longer than `max_tokens` into runs of words.
+
+    Transcriptions have no punctuation, so they are split into runs of words only.
+
+    Args:
+        text (str): The text.
+        max_tokens (int): The most tokens of a sentence kept whole.
+        run_tokens (int): The most tokens of a run of words cut from a longer sentence.
+        count_tokens (Callable[[str], int]): Counts the tokens of a text.
+
+    Returns:
+        List[str]: The pieces of the text, in order.
+    """
+    units = []
+    for sentence in _SENTENCE_END.split(text):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        if count_tokens(sentence) <= max_tokens:
+            units.append(sentence)
+            continue
+
+        run: List[str] = []
+        run_size = 0
+        for word in sentence.split():
+            word_tokens = count_tokens(word) + 1
+            if run and run_size + word_tokens > run_tokens:
+                units.append(" ".join(run))
+                run, run_size = [], 0
+            run.append(word)
+            run_size += word_tokens
+        if run:
+            units.append(" ".join(run))
+
+    return units
+
+
+def split_text(
+    text: str,
+    max_tokens: int,
+    overlap_tokens: int = 0,
+    count_tokens: Callable[[str], int] = estimate_tokens
+) -> List[str]:
+    """
+    Splits a text into chunks of at most `max_tokens`, cut between sentences where possible.
+
+    Each chunk starts with the last sentences (or words) of the previous one, up to `overlap_tokens`,
+    so that what spans a cut is seen whole by at least one chunk.
+
+    Args:
+        text (str): The text.
+        max_tokens (int): The most tokens of a chunk.
+        overlap_tokens (int): The most tokens a chunk repeats from the previous one.
+        count_tokens (Callable[[str], int]): Counts the tokens of a text.
+
+    Returns:
+        List[str]: The chunks, in order (a single chunk if the text fits).
+
+    Raises:
+        ValueError: If the overlap is not smaller than the chunks.
+    """
+    if overlap_tokens >= max_tokens:
+        raise ValueError("The overlap of the chunks must be smaller than the chunks.")
+    if count_tokens(text) <= max_tokens:
+        return [text]
+
+    # Pieces are kept small enough that the overlap and a piece always fit in a chunk, and long
+    # sentences are cut into runs no longer than the overlap, so that the overlap can hold some.
+    units = _units(text, max_tokens - overlap_tokens, min(overlap_tokens or max_tokens, max_tokens - overlap_tokens), count_tokens)
+    chunks = []
+    current: List[str] = []
+    current_tokens = 0
+    for unit in units:
+        unit_tokens = count_tokens(unit) + 1
+        if current and current_tokens + unit_tokens > max_tokens:
+            chunks.append(" ".join(current))
+
+            overlap: List[str] = []
+            overlap_size = 0
+            for previous in reversed(current):
+                previous_tokens = count_tokens(previous) + 1
+                if overlap_size + previous_tokens > overlap_tokens:
+                    break
+                overlap.insert(0, previous)
+                overlap_size += previous_tokens
+            current, current_tokens = overlap, overlap_size
+
+        current.append(unit)
+        current_tokens += unit_tokens
+
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+# Hesitations that speech recognition writes out, which carry nothing for a summary.
+_FILLERS = re.compile(r",?[ \t]*\b(?:u+m+|u+h+|e+r+m+|h+m+)\b,?", re.IGNORECASE)
+
+# A word said three or more times in a row ("I I I think"), as happens in speech. Words said
+# twice are left alone, since that can be grammatical ("I had had", "that that").
+_REPEATED_WORD = re.compile(r"\b(\w+)(?:\s+\1\b){2,}", re.IGNORECASE)
+
+_SPACES = re.compile(r"[ \t]+")
+
+_BLANK_LINES = re.compile(r"\n\s*\n+")
+
+
+def compress_text(text: str) -> str:
+    """
+    Shortens a text without changing its content, so that it fits in fewer tokens.
+
+    Drops spoken hesitations and words stuttered three or more times in a row, and collapses runs
+    of whitespace.
+
+    Args:
+        text (str): The text.
+
+    Returns:
+        str: The shortened text.
+    """
+    text = _FILLERS.sub("", text)
+    text = _REPEATED_WORD.sub(r"\1", text)
+    text = _SPACES.sub(" ", text)
+    return _BLANK_LINES.sub("\n\n", text).strip()
@@ -2,11 +2,13 @@ import os
 import sys
 import wave
 import json
+import time
+import hashlib
 import warnings
 from enum import Enum
 from abc import ABC, abstractmethod
 
-from typing import Type, Any
+from typing import Type, Any, List, Optional, Union
 from vosk import KaldiRecognizer
 
 
@@ -17,9 +19,40 @@ sys.path.append(str(path_manager.get_base_directory()))
 
 from src.utils import Utility
 from src.config.config import Provider
+from src.config.settings import SETTINGS
+from src.cache.base import ArtifactStore, make_cache_key
+from src.media.base import PcmStream
+from src.metrics.base import ASR_MEDIA_SECONDS, ASR_SKIPPED_SECONDS, ASR_WALL_SECONDS
+from src.pipeline.context import PipelineContext
+from src.transcription.parallel import TranscriptionPool, find_split_points, read_chunks, split_stream
 from src.transcription.registry import SpeechToTextRegistry
+from src.transcription.segments import Segment, dump_segments, load_segments, segment_from_result
+from src.transcription.vad import VoiceActivityDetector
 from src.transcription.strategy import SpeechToTextStrategy, VoskStrategy
 
+TRANSCRIPT_STORE = ArtifactStore(
+    str(path_manager.get_base_directory() / "transcriptions"),
+    max_bytes=SETTINGS.transcript_cache_max_bytes,
+    name="transcriptions"
+)
+
+
+def load_transcript_segments(transcript_id: str) -> Optional[List[Segment]]:
+    """
+    Returns the timed segments of a stored transcription.
+
+    Args:
+        transcript_id (str): The key of the transcription in the transcription store.
+
+    Returns:
+        Optional[List[Segment]]: The segments, or None if the store has no timings for the key.
+    """
+    document = TRANSCRIPT_STORE.read_text(transcript_id, ".segments.json")
+    if document is None:
+        return None
+
+    return load_segments(document)
+
 
 class SpeechToText(ABC):
     """
@@ -29,14 +62,25 @@ class SpeechToText(ABC):
     implement the `_get_strategy` and `run` methods.
 
     Attributes:
-        model: The speech recognition model to use for transcription.
+        stage (str): The name of the pipeline stage this step performs.
+        model: The speech recognition model to use for transcription. For a transcriber built for a
+               language, it is looked up in the model cache of the strategy on every access, so
+               transcribers kept by cached pipelines do not keep evicted models in memory.
+        model_id (str): An identifier of the model, used to key cached transcriptions.
+        model_path (Optional[str]): Path the model was loaded from, so worker processes can load it too.
+        language (Optional[str]): The language whose model is looked up, if no model was given.
 
     Methods:
         _get_strategy: Returns the strategy class for loading the speech recognition model.
         _validate_audio: Validates the input audio file.
+        _artifact_key: Returns the key of the transcription of an audio in the transcription store.
+        _load_transcription: Returns a stored transcription, if both its text and timings are stored.
+        _save_transcription: Stores a transcription with its timings.
         run: Transcribes the audio file into text (to be implemented by subclasses).
     """
     
+    stage = "transcribing"
+    
     @classmethod
     @abstractmethod
     def _get_strategy(cls) -> SpeechToTextStrategy:
@@ -51,14 +95,40 @@ class SpeechToText(ABC):
         """
         raise NotImplementedError("_get_strategy() is not implemented!")
     
-    def __init__(self, model: Type[Any]):
+    def __init__(
+        self,
+        model: Optional[Type[Any]],
+        model_id: Optional[str] = None,
+        model_path: Optional[str] = None,
+        language: Optional[str] = None
+    ):
         """
         Initializes the SpeechToText class with the provided model.
 
         Args:
-            model: The speech recognition model to use for transcription.
+            model: The speech recognition model to use for transcription, or None to look up the
+                   model of `language` through the strategy whenever it is needed.
+            model_id (Optional[str]): An identifier of the model (defaults to the class name).
+            model_path (Optional[str]): Path the model was loaded from, if known.
+            language (Optional[str]): The language of the model, required if no model is given.
+
+        Raises:
+            ValueError: If neither a model nor a language is given.
         """
-        self.model = model
+        if model is None and language is None:
+            raise ValueError("A model or the language of one is required!")
+        
+        self._model = model
+        self.model_id = model_id or type(self).__name__
+        self.model_path = model_path
+        self.language = language
+    
+    @property
+    def model(self) -> Any:
+        """The speech recognition model, resolved through the model cache unless one was given."""
+        if self._model is not None:
+            return self._model
+        return self._get_strategy().load_model(self.language)
     
     def _validate_audio(self, file_path: str) -> wave.Wave_read:
         """
@@ -92,11 +162,83 @@ class SpeechToText(ABC):
 
         return wave_file
     
+    def _artifact_key(self, wave_file: wave.Wave_read) -> str:
+        """
+        Returns the key of the transcription of an audio in the transcription store.
+
+        The key is derived from the decoded PCM samples (not the file name or container), the
+        audio parameters and the model, so the same audio is transcribed only once per model.
+        The audio file is rewound afterwards.
+
+        Args:
+            wave_file (wave.Wave_read): The validated audio file object.
+
+        Returns:
+            str: The artifact key.
+        """
+        digest = hashlib.sha256()
+        while True:
+            data = wave_file.readframes(65536)
+            if len(data) == 0:
+                break
+            digest.update(data)
+        wave_file.rewind()
+        
+        return make_cache_key(
+            pcm=digest.hexdigest(),
+            channels=wave_file.getnchannels(),
+            sample_width=wave_file.getsampwidth(),
+            frame_rate=wave_file.getframerate(),
+            model=self.model_id,
+        )
+    
+    def _load_transcription(self, file_name: str, context: PipelineContext) -> Optional[str]:
+        """
+        Returns a stored transcription, if both its text and timings are stored.
+
+        Transcriptions stored without timings are treated as missing, so they are transcribed again
+        once and time ranges can then be cut from them.
+
+        Args:
+            file_name (str): The key of the transcription in the transcription store.
+            context (PipelineContext): The state of the pipeline run.
+
+        Returns:
+            Optional[str]: The transcribed text, or None if it must be transcribed.
+        """
+        if not context.use_cache:
+            return None
+
+        transcription = TRANSCRIPT_STORE.read_text(file_name, ".txt")
+        if transcription is None or TRANSCRIPT_STORE.get(file_name, ".segments.json") is None:
+            return None
+
+        context.set_transcript(file_name)
+        return transcription
+    
+    def _save_transcription(self, file_name: str, transcription: str, segments: List[Segment], context: PipelineContext) -> None:
+        """
+        Stores a transcription with its timings, next to each other in the transcription store.
+
+        Args:
+            file_name (str): The key of the transcription in the transcription store.
+            transcription (str): The transcribed text.
+            segments (List[Segment]): The timed segments of the transcription.
+            context (PipelineContext): The state of the pipeline run.
+        """
+        TRANSCRIPT_STORE.put_text(file_name, ".segments.json", dump_segments(segments))
+        TRANSCRIPT_STORE.put_text(file_name, ".txt", transcription)
+        context.set_transcript(file_name)
+    
     @abstractmethod
-    def run(self):
+    def run(self, file_path: str, context: Optional[PipelineContext] = None) -> str:
         """
         Transcribes the audio file into text.
 
+        Args:
+            file_path (str): Path to the input audio file.
+            context (Optional[PipelineContext]): The state of the pipeline run, if any.
+
         Raises:
             NotImplementedError: If the method is not implemented by a subclass.
         """
@@ -109,14 +251,60 @@ class VoskTranscriber(SpeechToText):
     A speech-to-text transcriber using the Vosk library.
 
     This class implements the `SpeechToText` interface for transcribing audio files using
-    the Vosk speech recognition model.
+    the Vosk speech recognition model. Long audio can be split at silences into chunks that are
+    transcribed in parallel by a pool of worker processes sharing the loaded model. With voice activity detection,
+    non-speech audio (silence, background noise) is dropped before it reaches the recognizer.
+    Word timings are stored along with the text (see `src.transcription.segments`), in the time of
+    the original audio, so any time range of it can be summarized later without transcribing again.
+
+    Attributes:
+        vad (bool): Whether non-speech audio is dropped before recognition.
+        workers (int): The number of worker processes of the parallel mode (1 transcribes sequentially).
+        chunk_seconds (int): The target duration of the chunks of the parallel mode.
 
     Methods:
         _get_strategy: Returns the Vosk strategy class.
         _transcribe: Transcribes the audio file into text using the Vosk model.
+        _transcribe_parallel: Transcribes chunks of the audio in parallel.
+        _is_parallel: Checks whether audio is worth transcribing in parallel.
+        _report_vad: Reports how much audio was dropped as non-speech.
+        _run_stream: Transcribes a PCM stream as it is decoded.
         run: Executes the transcription process.
     """
     
+    def __init__(
+        self,
+        model: Type[Any],
+        model_id: Optional[str] = None,
+        model_path: Optional[str] = None,
+        workers: Optional[int] = None,
+        chunk_seconds: Optional[int] = None,
+        vad: bool = False,
+        language: Optional[str] = None
+    ):
+        """
+        Initializes the Vosk transcriber.
+
+        Args:
+            model: The loaded Vosk model, or None to look up the model of `language` in the model
+                   cache at run time.
+            model_id (Optional[str]): An identifier of the model (defaults to the class name).
+            model_path (Optional[str]): Path the model was loaded from; the parallel mode needs it
+                                        where worker processes cannot be forked.
+            workers (Optional[int]): The number of worker processes of the parallel mode. Defaults to
+                                     `ASR_WORKERS` if `ASR_PARALLEL` is set, else 1 (the factory
+                                     applies `ASR_LANGUAGE_WORKERS`).
+            chunk_seconds (Optional[int]): The target duration of the chunks. Defaults to `ASR_CHUNK_SECONDS`.
+            vad (bool): Whether non-speech audio is dropped before recognition.
+            language (Optional[str]): The language of the model, required if no model is given.
+        """
+        super().__init__(model, model_id, model_path, language)
+        self.vad = vad
+        if workers is None:
+            workers = SETTINGS.asr_workers if SETTINGS.asr_parallel else 1
+        self.workers = max(workers, 1)
+        self.chunk_seconds = chunk_seconds or SETTINGS.asr_chunk_seconds
+    
     @classmethod
     def _get_strategy(cls):
         """
@@ -127,51 +315,219 @@ class VoskTranscriber(SpeechToText):
         """
         return VoskStrategy
     
-    def _transcribe(self, wave_file: wave.Wave_read, file_name: str) -> str:
+    def _transcribe(self, wave_file: Union[wave.Wave_read, PcmStream], file_name: str, context: PipelineContext) -> str:
         """
         Transcribes the audio file into text using the Vosk model.
 
         Args:
-            wave_file (wave.Wave_read): The validated audio file object.
-            file_name (str): The name of the output transcription file.
+            wave_file (Union[wave.Wave_read, PcmStream]): The validated audio file object, or a PCM
+                                                          stream read while it is being decoded.
+            file_name (str): The name of the output transcription file (the artifact key of the audio).
+            context (PipelineContext): The state of the pipeline run. A "progress" event is emitted
+                                       to its listener each time another percent of the audio is done.
 
         Returns:
             str: The transcribed text.
         """
+        start = time.perf_counter()
         rec = KaldiRecognizer(self.model, wave_file.getframerate())
+        rec.SetWords(True)
+        detector = VoiceActivityDetector(wave_file.getframerate()) if self.vad else None
+        to_source_seconds = detector.source_seconds if detector is not None else None
         transcription = []
+        segments = []
+        total_frames = wave_file.getnframes()
+        read_frames = 0
+        reported_percent = -1
         
         while True:
             data = wave_file.readframes(4000)
             if len(data) == 0:
                 break
-            if rec.AcceptWaveform(data):
+            
+            read_frames += len(data) // (wave_file.getsampwidth() * wave_file.getnchannels())
+            percent = min(int(100 * read_frames / total_frames), 100) if total_frames else 100
+            if percent > reported_percent:
+                reported_percent = percent
+                context.emit("progress", stage=self.stage, percent=percent)
+            
+            if detector is not None:
+                data = detector.filter(data)
+            
+            if data and rec.AcceptWaveform(data):
                 res = json.loads(rec.Result())
                 transcription.append(res.get("text", ""))
+                segments.append(segment_from_result(res, to_source_seconds=to_source_seconds))
+        
+        if detector is not None:
+            tail = detector.flush()
+            if tail:
+                rec.AcceptWaveform(tail)
+            self._report_vad(detector.total_frames - detector.speech_frames, read_frames, wave_file.getframerate(), context)
         
         final_res = json.loads(rec.FinalResult())
         transcription.append(final_res.get("text", ""))
+        segments.append(segment_from_result(final_res, to_source_seconds=to_source_seconds))
+        
+        ASR_MEDIA_SECONDS.labels(model=self.model_id).inc(read_frames / wave_file.getframerate())
+        ASR_WALL_SECONDS.labels(model=self.model_id).inc(time.perf_counter() - start)
         
         wave_file.close()
         transcription = " ".join(transcription)
-        output_path = str(path_manager.get_base_directory() / f"transcriptions/{file_name}.txt")
+        self._save_transcription(file_name, transcription, [segment for segment in segments if segment], context)
         
-        with open(output_path, mode="w", encoding="UTF-8") as f:
-            f.write(transcription)
+        return transcription
+    
+    def _transcribe_parallel(self, wave_file: Union[wave.Wave_read, PcmStream], file_name: str, context: PipelineContext) -> str:
+        """
+        Transcribes chunks of the audio in parallel using the Vosk model.
+
+        The audio is cut at the quietest point near every `chunk_seconds`, so words are not split
+        between chunks. The chunks are read (or decoded) here while the worker processes of the
+        shared `TranscriptionPool` of the model transcribe the previous ones, and the texts and
+        timed segments are joined in the order of the chunks.
+
+        Args:
+            wave_file (Union[wave.Wave_read, PcmStream]): The validated audio file object, or a PCM
+                                                          stream read while it is being decoded.
+            file_name (str): The name of the output transcription file (the artifact key of the audio).
+            context (PipelineContext): The state of the pipeline run. A "progress" event is emitted
+                                       to its listener each time another percent of the audio is done.
+
+        Returns:
+            str: The transcribed text.
+        """
+        start = time.perf_counter()
+        frame_rate = wave_file.getframerate()
+        frame_bytes = wave_file.getsampwidth() * wave_file.getnchannels()
+        total_frames = wave_file.getnframes()
+        if isinstance(wave_file, PcmStream):
+            chunks = split_stream(wave_file, self.chunk_seconds)
+        else:
+            chunks = read_chunks(wave_file, find_split_points(wave_file, self.chunk_seconds))
+        
+        transcription = []
+        segments = []
+        read_frames = 0
+        skipped_frames = 0
+        reported_percent = -1
+        pool = TranscriptionPool.get(self.model_id, self.model, self.model_path, self.workers)
+        for text, frames, skipped, chunk_segments in pool.transcribe(chunks, frame_rate, frame_bytes, self.vad):
+            transcription.append(text)
+            segments.extend(chunk_segments)
+            read_frames += frames
+            skipped_frames += skipped
+            percent = min(int(100 * read_frames / total_frames), 100) if total_frames else 100
+            if percent > reported_percent:
+                reported_percent = percent
+                context.emit("progress", stage=self.stage, percent=percent)
+        
+        wave_file.close()
+        if self.vad:
+            self._report_vad(skipped_frames, read_frames, frame_rate, context)
+        
+        ASR_MEDIA_SECONDS.labels(model=self.model_id).inc(read_frames / frame_rate)
+        ASR_WALL_SECONDS.labels(model=self.model_id).inc(time.perf_counter() - start)
+        
+        transcription = " ".join(transcription)
+        self._save_transcription(file_name, transcription, segments, context)
         
         return transcription
     
-    def run(self, file_path: str) -> str:
+    def _report_vad(self, skipped_frames: int, total_frames: int, frame_rate: int, context: PipelineContext) -> None:
+        """
+        Reports how much audio was dropped as non-speech, as a metric and as a "vad" event.
+
+        Args:
+            skipped_frames (int): The frames dropped as non-speech.
+            total_frames (int): The frames read.
+            frame_rate (int): The sample rate of the audio.
+            context (PipelineContext): The state of the pipeline run.
+        """
+        ASR_SKIPPED_SECONDS.labels(model=self.model_id).inc(skipped_frames / frame_rate)
+        context.emit(
+            "vad",
+            stage=self.stage,
+            total_seconds=round(total_frames / frame_rate, 3),
+            skipped_seconds=round(skipped_frames / frame_rate, 3),
+            skipped_ratio=round(skipped_frames / total_frames, 4) if total_frames else 0.0,
+        )
+    
+    def _is_parallel(self, wave_file: Union[wave.Wave_read, PcmStream]) -> bool:
+        """
+        Checks whether audio is worth transcribing in parallel.
+
+        Args:
+            wave_file (Union[wave.Wave_read, PcmStream]): The validated audio file object, or a PCM stream.
+
+        Returns:
+            bool: True if there is more than one worker and the audio is 16-bit and at least two chunks long.
+        """
+        return (
+            self.workers > 1
+            and wave_file.getsampwidth() == 2
+            and wave_file.getnframes() >= 2 * self.chunk_seconds * wave_file.getframerate()
+        )
+    
+    def _run_stream(self, stream: PcmStream, context: PipelineContext) -> str:
+        """
+        Transcribes a PCM stream as it is decoded.
+
+        The transcription is stored by the key of the stream (the content of the decoded input),
+        so a stored transcription is returned without starting the decoder.
+
+        Args:
+            stream (PcmStream): The decoded audio.
+            context (PipelineContext): The state of the pipeline run.
+
+        Returns:
+            str: The transcribed text.
+        """
+        file_name = make_cache_key(content=stream.key, model=self.model_id, **({"vad": True} if self.vad else {}))
+        
+        cached = self._load_transcription(file_name, context)
+        if cached is not None:
+            return cached
+        
+        try:
+            if self._is_parallel(stream):
+                return self._transcribe_parallel(stream, file_name, context)
+            return self._transcribe(stream, file_name, context)
+        finally:
+            stream.close()
+    
+    def run(self, file_path: Union[str, PcmStream], context: Optional[PipelineContext] = None) -> str:
         """
         Executes the transcription process.
 
+        Transcriptions are stored by the content of the audio, so audio that was already
+        transcribed with the same model is not transcribed again. The key of the transcription is
+        recorded in the context (see `PipelineContext.transcript_id`). With more than one worker,
+        audio longer than two chunks (WAV files and streams alike) is transcribed in parallel.
+
         Args:
-            file_path (str): Path to the input audio file.
+            file_path (Union[str, PcmStream]): Path to the input audio file, or a PCM stream
+                                               (see `PcmStreamDecoder`).
+            context (Optional[PipelineContext]): The state of the pipeline run, if any.
 
         Returns:
             str: The transcribed text.
         """
-        file_name = Utility.get_file_name(file_path)
+        context = context or PipelineContext()
+        if isinstance(file_path, PcmStream):
+            return self._run_stream(file_path, context)
+        
         wave_file = self._validate_audio(file_path)
+        file_name = self._artifact_key(wave_file)
+        if self.vad:
+            file_name = make_cache_key(transcription=file_name, vad=True)
+        
+        cached = self._load_transcription(file_name, context)
+        if cached is not None:
+            wave_file.close()
+            return cached
+        
+        if self._is_parallel(wave_file):
+            return self._transcribe_parallel(wave_file, file_name, context)
         
-        return self._transcribe(wave_file, file_name)
\ No newline at end of file
+        return self._transcribe(wave_file, file_name, context)
\ No newline at end of file
@@ -6,7 +6,9 @@ path_manager = PathManager()
 sys.path.append(str(path_manager.get_base_directory()))
 
 from src.config.config import Language, Provider
+from src.config.settings import SETTINGS
 from src.transcription.base import SpeechToText
+from src.transcription.parallel import TranscriptionPool
 from src.transcription.registry import SpeechToTextRegistry
 
 class SpeechToTextFactory:
@@ -14,20 +16,70 @@ class SpeechToTextFactory:
     Factory class for creating SpeechToText instances.
 
     This class provides a method to create a SpeechToText instance based on the specified
-    provider and language.
+    provider and language. With `ASR_PARALLEL`, long audio is transcribed by a pool of worker
+    processes per language (`ASR_WORKERS`, or the `ASR_LANGUAGE_WORKERS` entry of the language).
 
     Methods:
+        workers: Returns the number of worker processes for a language.
+        start_pool: Starts the worker processes of a language ahead of the first request.
         create: Creates a SpeechToText instance with the specified provider and language.
     """
     
     @classmethod
-    def create(cls, provider: Provider, language: Language) -> SpeechToText:
+    def workers(cls, language: Language) -> int:
+        """
+        Returns the number of worker processes for a language.
+
+        Args:
+            language (Language): The language of the input audio.
+
+        Returns:
+            int: The size of the pool of the language, or 1 if parallel transcription is off.
+        """
+        return max(SETTINGS.asr_workers_for(language.value), 1) if SETTINGS.asr_parallel else 1
+    
+    @classmethod
+    def start_pool(cls, provider: Provider, language: Language) -> None:
+        """
+        Starts the worker processes of a language ahead of the first request.
+
+        The workers are forked from the server process once the model is loaded, so they share it.
+        Forking is only safe before the server starts any other thread, so this must run first at
+        startup; pools created later spawn their workers, which load their own copy of the model.
+
+        Args:
+            provider (Provider): The speech-to-text provider (e.g., Vosk).
+            language (Language): The language of the pool.
+
+        Raises:
+            Exception: If the provider or language is not supported.
+        """
+        workers = cls.workers(language)
+        if workers < 2:
+            return
+        
+        strategy = SpeechToTextRegistry.get_registered(provider.value)._get_strategy()
+        TranscriptionPool.get(
+            strategy.model_id(language.value),
+            strategy.load_model(language.value),
+            strategy.model_path(language.value),
+            workers,
+        )
+    
+    
+    @classmethod
+    def create(cls, provider: Provider, language: Language, vad: bool = False) -> SpeechToText:
         """
         Creates a SpeechToText instance with the specified provider and language.
 
+        The model is loaded (if it is not cached yet) to fail early, but the transcriber looks it
+        up in the model cache at run time rather than keeping it, so pipelines cached with it do
+        not keep evicted models in memory.
+
         Args:
             provider (Provider): The speech-to-text provider (e.g., Vosk).
             language (Language): The language of the input audio.
+            vad (bool): Whether non-speech audio is dropped before recognition.
 
         Returns:
             SpeechToText: An instance of the SpeechToText class configured with the
@@ -39,8 +91,10 @@ class SpeechToTextFactory:
         try:
             stt_cls = SpeechToTextRegistry.get_registered(provider.value)
             strategy = stt_cls._get_strategy()
-            model = strategy.load_model(language.value)
+            strategy.load_model(language.value)
+            model_id = strategy.model_id(language.value)
+            model_path = strategy.model_path(language.value)
         except Exception as e:
             raise e from None
         
-        return stt_cls(model)
\ No newline at end of file
+        return stt_cls(None, model_id, model_path, workers=cls.workers(language), vad=vad, language=language.value)
\ No newline at end of file
@@ -0,0 +1,528 @@
+import gc
+import os
+import sys
+import json
+import wave
+import warnings
+import threading
+import multiprocessing
+from collections import deque
+from multiprocessing import resource_tracker, shared_memory
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool, _ExecutorManagerThread
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+from path_handler import PathManager
+
+path_manager = PathManager()
+sys.path.append(str(path_manager.get_base_directory()))
+
+from src.transcription.segments import Segment, segment_from_result
+from src.transcription.vad import VoiceActivityDetector
+
+# The models of the worker processes, by model id. A pool puts its model here right before it forks
+# its workers, so they inherit it (see `TranscriptionPool`); spawned workers load it in `_init_worker`.
+_shared_models: Dict[str, Any] = {}
+
+
+def _init_worker(model_id: str, model_path: Optional[str]) -> None:
+    """
+    Makes the model available in a worker process.
+
+    Forked workers inherit the model of their pool and have nothing to do. Spawned workers (where
+    fork is unavailable) load their own copy from disk.
+
+    Args:
+        model_id (str): An identifier of the model.
+        model_path (Optional[str]): Path to the Vosk model directory.
+    """
+    if model_id in _shared_models:
+        return
+
+    from vosk import Model as VoskModel, SetLogLevel
+
+    SetLogLevel(-1)
+    _shared_models[model_id] = VoskModel(model_path)
+
+
+def _fork_safe() -> bool:
+    """
+    Checks whether worker processes can be forked safely from the current process.
+
+    A forked child only gets the thread that forked it. A lock that another thread holds at that
+    moment (of logging, sqlite, the model cache, the allocator of a native library) stays locked
+    forever in the child, and the first worker that needs it hangs. Forking is therefore only safe
+    while no other threads run, apart from the bookkeeping threads of process pools, whose locks
+    the workers never touch.
+
+    Returns:
+        bool: True if fork is available and no other thread is running.
+    """
+    if "fork" not in multiprocessing.get_all_start_methods():
+        return False
+
+    current = threading.current_thread()
+    return all(
+        thread is current or isinstance(thread, _ExecutorManagerThread) or thread.name == "QueueFeederThread"
+        for thread in threading.enumerate()
+    )
+
+
+def _ready() -> int:
+    """
+    Does nothing in a worker process; submitted once to start the workers of a pool.
+
+    Returns:
+        int: The process id of the worker.
+    """
+    return os.getpid()
+
+
+def _transcribe_shared(
+    model_id: str,
+    shm_name: str,
+    size: int,
+    frame_rate: int,
+    frame_bytes: int,
+    start_frame: int,
+    vad: bool = False
+) -> Tuple[str, int, int, List[Segment]]:
+    """
+    Transcribes a chunk of PCM held in shared memory, in a worker process.
+
+    The audio is read from the shared memory block in small pieces, so it is neither pickled nor
+    copied whole into the worker.
+
+    Args:
+        model_id (str): An identifier of the model of the pool.
+        shm_name (str): The name of the shared memory block holding the chunk.
+        size (int): The number of bytes of the chunk (the block may be larger).
+        frame_rate (int): The sample rate of the audio.
+        frame_bytes (int): The number of bytes per frame (sample width times channels).
+        start_frame (int): The position of the chunk in the audio, in frames.
+        vad (bool): Whether non-speech audio is dropped before recognition.
+
+    Returns:
+        Tuple[str, int, int, List[Segment]]: The transcribed text, the number of frames read, the
+                                             number of frames dropped as non-speech, and the timed
+                                             segments (in the time of the whole audio).
+    """
+    from vosk import KaldiRecognizer
+
+    rec = KaldiRecognizer(_shared_models[model_id], frame_rate)
+    rec.SetWords(True)
+    detector = VoiceActivityDetector(frame_rate) if vad else None
+    block_bytes = 4000 * frame_bytes
+    results = []
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        for offset in range(0, size, block_bytes):
+            data = bytes(shm.buf[offset:min(offset + block_bytes, size)])
+            if detector is not None:
+                data = detector.filter(data)
+            if data and rec.AcceptWaveform(data):
+                results.append(json.loads(rec.Result()))
+    finally:
+        shm.close()
+
+    if detector is not None:
+        tail = detector.flush()
+        if tail:
+            rec.AcceptWaveform(tail)
+    results.append(json.loads(rec.FinalResult()))
+
+    offset_ms = start_frame * 1000 // frame_rate
+    to_source_seconds = detector.source_seconds if detector is not None else None
+    segments = [segment_from_result(result, offset_ms, to_source_seconds) for result in results]
+    segments = [segment for segment in segments if segment]
+    skipped_frames = detector.total_frames - detector.speech_frames if detector is not None else 0
+    return " ".join(segment.text for segment in segments), size // frame_bytes, skipped_frames, segments
+
+
+def _quietest_frame(samples: np.ndarray, window_frames: int) -> Optional[int]:
+    """
+    Finds the middle of the quietest window of some audio.
+
+    Args:
+        samples (np.ndarray): The samples, one per frame (channels averaged).
+        window_frames (int): The duration of the windows whose energy is compared, in frames.
+
+    Returns:
+        Optional[int]: The frame in the middle of the quietest window, or None if the audio is
+                       shorter than a window.
+    """
+    windows = len(samples) // window_frames
+    if windows == 0:
+        return None
+
+    energy = np.square(samples[:windows * window_frames].reshape(windows, window_frames)).mean(axis=1)
+    return int(np.argmin(energy)) * window_frames + window_frames // 2
+
+
+def find_split_points(
+    wave_file: wave.Wave_read,
+    chunk_seconds: float,
+    search_seconds: float = 5.0,
+    window_seconds: float = 0.03
+) -> List[Tuple[int, int]]:
+    """
+    Splits a WAV file into chunks of about `chunk_seconds`, cutting at the quietest point near
+    each target boundary so that words are not cut in half.
+
+    Only the audio around each boundary is read (`search_seconds` on either side), in short
+    windows whose energy is compared; the chunk is cut in the middle of the quietest window.
+    The last chunk absorbs a remainder shorter than half a chunk. The file is rewound afterwards.
+
+    Args:
+        wave_file (wave.Wave_read): A 16-bit WAV file.
+        chunk_seconds (float): The target duration of the chunks.
+        search_seconds (float): How far from the target boundary the cut may move.
+        window_seconds (float): The duration of the windows whose energy is compared.
+
+    Returns:
+        List[Tuple[int, int]]: The first frame and the frame after the last frame of each chunk.
+    """
+    frame_rate = wave_file.getframerate()
+    channels = wave_file.getnchannels()
+    total_frames = wave_file.getnframes()
+    chunk_frames = max(int(chunk_seconds * frame_rate), 1)
+    search_frames = int(search_seconds * frame_rate)
+    window_frames = max(int(window_seconds * frame_rate), 1)
+
+    cuts = [0]
+    target = chunk_frames
+    while target < total_frames - chunk_frames // 2:
+        low = max(target - search_frames, cuts[-1] + window_frames)
+        high = min(target + search_frames, total_frames)
+        wave_file.setpos(low)
+        samples = np.frombuffer(wave_file.readframes(high - low), dtype=np.int16).astype(np.float32)
+        samples = samples.reshape(-1, channels).mean(axis=1)
+
+        quietest = _quietest_frame(samples, window_frames)
+        cut = target if quietest is None else low + quietest
+
+        cuts.append(cut)
+        target = cut + chunk_frames
+
+    wave_file.rewind()
+    cuts.append(total_frames)
+    return list(zip(cuts[:-1], cuts[1:]))
+
+
+def read_chunks(wave_file: wave.Wave_read, chunks: List[Tuple[int, int]]) -> Iterator[Tuple[int, bytes]]:
+    """
+    Reads the chunks of a WAV file one at a time.
+
+    Args:
+        wave_file (wave.Wave_read): The WAV file.
+        chunks (List[Tuple[int, int]]): The frame ranges of the chunks (see `find_split_points`).
+
+    Yields:
+        Tuple[int, bytes]: The first frame and the PCM of each chunk.
+    """
+    for start, end in chunks:
+        wave_file.setpos(start)
+        yield start, wave_file.readframes(end - start)
+
+
+def split_stream(
+    stream: Any,
+    chunk_seconds: float,
+    search_seconds: float = 5.0,
+    window_seconds: float = 0.03
+) -> Iterator[Tuple[int, bytes]]:
+    """
+    Splits 16-bit mono PCM read from a stream into chunks of about `chunk_seconds`, cutting at the
+    quietest point near each target boundary, as `find_split_points` does for files.
+
+    The stream is read as the chunks are consumed, so at most a chunk and the search distance are
+    held in memory.
+
+    Args:
+        stream (Any): A 16-bit mono PCM stream that reads like a `wave.Wave_read` (e.g., a `PcmStream`).
+        chunk_seconds (float): The target duration of the chunks.
+        search_seconds (float): How far from the target boundary the cut may move.
+        window_seconds (float): The duration of the windows whose energy is compared.
+
+    Yields:
+        Tuple[int, bytes]: The first frame and the PCM of each chunk.
+    """
+    frame_rate = stream.getframerate()
+    chunk_frames = max(int(chunk_seconds * frame_rate), 1)
+    search_frames = int(search_seconds * frame_rate)
+    window_frames = max(int(window_seconds * frame_rate), 1)
+
+    buffer = bytearray()
+    start = 0
+    ended = False
+    while not ended:
+        data = stream.readframes(65536)
+        ended = len(data) == 0
+        buffer += data
+
+        frames = len(buffer) // 2
+        while frames >= chunk_frames + search_frames or (ended and frames > 0):
+            if ended and frames < chunk_frames + chunk_frames // 2:
+                cut = frames
+            else:
+                low = max(chunk_frames - search_frames, window_frames)
+                high = min(chunk_frames + search_frames, frames)
+                samples = np.frombuffer(bytes(buffer[2 * low:2 * high]), dtype=np.int16).astype(np.float32)
+                quietest = _quietest_frame(samples, window_frames)
+                cut = chunk_frames if quietest is None else low + quietest
+
+            yield start, bytes(buffer[:2 * cut])
+            del buffer[:2 * cut]
+            start += cut
+            frames -= cut
+
+
+class TranscriptionPool:
+    """
+    A pool of worker processes that transcribe chunks of audio with a Vosk model shared between them.
+
+    The model is loaded once, in the server process, and the workers are forked from it afterwards,
+    so they share its memory pages copy-on-write instead of loading a copy each: the memory of a
+    pool grows with the recognizers of its workers, not with the model. The garbage collector is
+    frozen while forking, so that collections in the workers do not touch (and copy) the pages of
+    the objects they inherited.
+
+    Forking is only safe while the process runs no other threads (see `_fork_safe`), so pools must
+    be created at startup, before the server starts its threads and executors
+    (`SpeechToTextFactory.start_pool`). A pool created later (or where fork is unavailable) spawns
+    its workers instead, and each of them loads the model from its path.
+
+    Chunks are handed to the workers through shared memory, so the PCM is copied once into a
+    shared block rather than pickled and sent through a pipe. Only a few chunks per worker are in
+    flight at a time, so the audio can be read (or decoded) while the workers transcribe.
+
+    Pools are kept per model and worker count for the life of the process.
+
+    Attributes:
+        model_id (str): An identifier of the model.
+        model_path (Optional[str]): Path to the Vosk model directory (needed where fork is unavailable).
+        workers (int): The number of worker processes.
+
+    Methods:
+        get: Returns the pool of a model, creating it on first use.
+        transcribe: Transcribes chunks of PCM in parallel.
+        stats: Returns the memory used by the workers of each pool.
+        shutdown: Stops the worker processes.
+        shutdown_all: Stops the worker processes of every pool.
+    """
+
+    _pools: Dict[Tuple[str, int], "TranscriptionPool"] = {}
+    _lock = threading.Lock()
+
+    def __init__(self, model_id: str, model: Any, model_path: Optional[str], workers: int):
+        """
+        Initializes the pool and starts its workers.
+
+        Args:
+            model_id (str): An identifier of the model.
+            model (Any): The loaded Vosk model, shared with forked workers.
+            model_path (Optional[str]): Path to the Vosk model directory.
+            workers (int): The number of worker processes.
+
+        Raises:
+            ValueError: If the workers cannot be forked and the model path is unknown.
+        """
+        self.model_id = model_id
+        self.model_path = model_path
+        self.workers = workers
+
+        fork = _fork_safe()
+        if not fork and model_path is None:
+            raise ValueError("Spawned transcription workers need the path of the model.")
+        if not fork:
+            warnings.warn(
+                f"The workers of {model_id} are spawned and load their own copy of the model, since the "
+                "process runs other threads; start the pool at startup to share the model.",
+                ResourceWarning,
+            )
+
+        if fork:
+            _shared_models[model_id] = model
+            # The workers must inherit the tracker of the shared memory blocks; otherwise each starts
+            # its own, which unlinks the blocks it saw when the worker exits.
+            resource_tracker.ensure_running()
+        gc.freeze()
+        try:
+            self._executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("fork" if fork else "spawn"),
+                initializer=_init_worker,
+                initargs=(model_id, model_path),
+            )
+            # With fork, the first task starts every worker at once, while the model is in place.
+            self._executor.submit(_ready).result()
+        finally:
+            gc.unfreeze()
+            # The workers have their reference; the server process drops its own, so the model
+            # cache can still evict it.
+            _shared_models.pop(model_id, None)
+
+    @classmethod
+    def get(cls, model_id: str, model: Any, model_path: Optional[str], workers: int) -> "TranscriptionPool":
+        """
+        Returns the pool of a model, creating it on first use.
+
+        Args:
+            model_id (str): An identifier of the model.
+            model (Any): The loaded Vosk model.
+            model_path (Optional[str]): Path to the Vosk model directory.
+            workers (int): The number of worker processes.
+
+        Returns:
+            TranscriptionPool: The pool.
+        """
+        with cls._lock:
+            key = (model_id, workers)
+            if key not in cls._pools:
+                cls._pools[key] = cls(model_id, model, model_path, workers)
+            return cls._pools[key]
+
+    def _submit(self, start_frame: int, data: bytes, frame_rate: int, frame_bytes: int, vad: bool) -> Tuple[Future, shared_memory.SharedMemory]:
+        """
+        Copies a chunk into shared memory and submits it to the workers.
+
+        Args:
+            start_frame (int): The position of the chunk in the audio, in frames.
+            data (bytes): The PCM of the chunk.
+            frame_rate (int): The sample rate of the audio.
+            frame_bytes (int): The number of bytes per frame.
+            vad (bool): Whether non-speech audio is dropped before recognition.
+
+        Returns:
+            Tuple[Future, shared_memory.SharedMemory]: The future of the chunk and its shared memory block.
+        """
+        shm = shared_memory.SharedMemory(create=True, size=max(len(data), 1))
+        shm.buf[:len(data)] = data
+        future = self._executor.submit(_transcribe_shared, self.model_id, shm.name, len(data), frame_rate, frame_bytes, start_frame, vad)
+        return future, shm
+
+    @staticmethod
+    def _release(shm: shared_memory.SharedMemory) -> None:
+        """
+        Frees the shared memory block of a chunk.
+
+        Args:
+            shm (shared_memory.SharedMemory): The block.
+        """
+        shm.close()
+        shm.unlink()
+
+    def transcribe(
+        self,
+        chunks: Iterable[Tuple[int, bytes]],
+        frame_rate: int,
+        frame_bytes: int = 2,
+        vad: bool = False
+    ) -> Iterator[Tuple[str, int, int, List[Segment]]]:
+        """
+        Transcribes chunks of PCM in parallel.
+
+        Args:
+            chunks (Iterable[Tuple[int, bytes]]): The first frame and the PCM of each chunk (see
+                                                  `read_chunks` and `split_stream`), read lazily.
+            frame_rate (int): The sample rate of the audio.
+            frame_bytes (int): The number of bytes per frame (sample width times channels).
+            vad (bool): Whether non-speech audio is dropped before recognition.
+
+        Yields:
+            Tuple[str, int, int, List[Segment]]: The text, the number of frames, the number of frames
+                                                 dropped as non-speech and the timed segments of each
+                                                 chunk, in the order of the chunks.
+
+        Raises:
+            BrokenProcessPool: If a worker died. The pool is dropped, so the next call starts fresh workers.
+        """
+        pending: Deque[Tuple[Future, shared_memory.SharedMemory]] = deque()
+        try:
+            for start_frame, data in chunks:
+                pending.append(self._submit(start_frame, data, frame_rate, frame_bytes, vad))
+                if len(pending) > self.workers:
+                    future, shm = pending.popleft()
+                    try:
+                        yield future.result()
+                    finally:
+                        self._release(shm)
+
+            while pending:
+                future, shm = pending.popleft()
+                try:
+                    yield future.result()
+                finally:
+                    self._release(shm)
+        except BrokenProcessPool:
+            self.shutdown()
+            raise
+        finally:
+            for future, shm in pending:
+                future.cancel()
+                self._release(shm)
+
+    def _worker_memory(self) -> List[Dict[str, Any]]:
+        """
+        Returns the memory used by each worker (Linux only).
+
+        Returns:
+            List[Dict[str, Any]]: The process id, resident, proportional and private bytes of each worker.
+        """
+        memory = []
+        for pid in list(getattr(self._executor, "_processes", None) or {}):
+            usage = {"pid": pid}
+            try:
+                with open(f"/proc/{pid}/smaps_rollup", mode="r") as f:
+                    for line in f:
+                        name, _, value = line.partition(":")
+                        if name in ("Rss", "Pss", "Private_Clean", "Private_Dirty"):
+                            usage[name.lower()] = int(value.split()[0]) * 1024
+            except (OSError, ValueError):
+                continue
+            usage["private"] = usage.pop("private_clean", 0) + usage.pop("private_dirty", 0)
+            memory.append(usage)
+        return memory
+
+    @classmethod
+    def stats(cls) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns the memory used by the workers of each pool.
+
+        Pages shared with the server process and the other workers (the model) count once in the
+        proportional size (`pss`), split between the processes that share them; `private` is
+        what each worker adds.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: For each model, the number of workers and their memory.
+        """
+        with cls._lock:
+            pools = list(cls._pools.values())
+
+        stats = {}
+        for pool in pools:
+            memory = pool._worker_memory()
+            stats[pool.model_id] = {
+                "workers": pool.workers,
+                "processes": memory,
+                "pss_bytes": sum(usage.get("pss", 0) for usage in memory),
+                "private_bytes": sum(usage["private"] for usage in memory),
+            }
+        return stats
+
+    def shutdown(self) -> None:
+        """Stops the worker processes and forgets the pool."""
+        with self._lock:
+            if self._pools.get((self.model_id, self.workers)) is self:
+                del self._pools[(self.model_id, self.workers)]
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    @classmethod
+    def shutdown_all(cls) -> None:
+        """Stops the worker processes of every pool."""
+        with cls._lock:
+            pools = list(cls._pools.values())
+        for pool in pools:
+            pool.shutdown()
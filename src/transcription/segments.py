@@ -0,0 +1,162 @@
+import sys
+import json
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from path_handler import PathManager
+
+path_manager = PathManager()
+sys.path.append(str(path_manager.get_base_directory()))
+
+# The version of the stored segment format.
+SEGMENTS_VERSION = 1
+
+
+@dataclass(frozen=True)
+class Segment:
+    """
+    An utterance of a transcription, with its timing.
+
+    Attributes:
+        start_ms (int): The start of the utterance in the audio, in milliseconds.
+        end_ms (int): The end of the utterance in the audio, in milliseconds.
+        text (str): The text of the utterance.
+        words (Tuple[Tuple[str, int, int], ...]): The words of the utterance, each with its start
+                                                  and end in milliseconds.
+    """
+    start_ms: int
+    end_ms: int
+    text: str
+    words: Tuple[Tuple[str, int, int], ...] = ()
+
+
+def segment_from_result(
+    result: Dict[str, Any],
+    offset_ms: int = 0,
+    to_source_seconds: Optional[Callable[[float], float]] = None
+) -> Optional[Segment]:
+    """
+    Builds a segment from a Vosk result produced with `SetWords(True)`.
+
+    Args:
+        result (Dict[str, Any]): The parsed result of `Result()` or `FinalResult()`.
+        offset_ms (int): The position in the audio where the recognizer started (e.g., of a chunk).
+        to_source_seconds (Optional[Callable[[float], float]]): Maps a time of the audio fed to the
+                                                                recognizer to the time in the source
+                                                                audio, when parts of it were dropped.
+
+    Returns:
+        Optional[Segment]: The segment, or None if nothing was recognized.
+    """
+    text = result.get("text", "")
+    if not text:
+        return None
+
+    def to_ms(seconds: float) -> int:
+        if to_source_seconds is not None:
+            seconds = to_source_seconds(seconds)
+        return offset_ms + int(round(seconds * 1000))
+
+    words = tuple(
+        (word.get("word", ""), to_ms(word.get("start", 0.0)), to_ms(word.get("end", 0.0)))
+        for word in result.get("result", [])
+    )
+    if not words:
+        return Segment(offset_ms, offset_ms, text)
+
+    return Segment(words[0][1], words[-1][2], text, words)
+
+
+def dump_segments(segments: List[Segment]) -> str:
+    """
+    Serializes segments compactly as JSON.
+
+    Args:
+        segments (List[Segment]): The segments of a transcription, in order.
+
+    Returns:
+        str: The JSON document.
+    """
+    return json.dumps(
+        {
+            "version": SEGMENTS_VERSION,
+            "segments": [[segment.start_ms, segment.end_ms, segment.text, [list(word) for word in segment.words]] for segment in segments],
+        },
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+
+
+def load_segments(document: str) -> List[Segment]:
+    """
+    Parses segments serialized by `dump_segments`.
+
+    Args:
+        document (str): The JSON document.
+
+    Returns:
+        List[Segment]: The segments, in order.
+
+    Raises:
+        ValueError: If the document is not a segment store of a supported version.
+    """
+    data = json.loads(document)
+    if data.get("version") != SEGMENTS_VERSION:
+        raise ValueError(f"Unsupported segment store version: {data.get('version')}")
+
+    return [
+        Segment(start_ms, end_ms, text, tuple((word, word_start, word_end) for word, word_start, word_end in words))
+        for start_ms, end_ms, text, words in data["segments"]
+    ]
+
+
+def slice_segments(segments: List[Segment], start_ms: int, end_ms: Optional[int] = None) -> List[Segment]:
+    """
+    Returns the part of a transcription within a time range.
+
+    Segments are cut at word level: a word belongs to the range when its middle does. Segments
+    without word timings are kept whole if they overlap the range.
+
+    Args:
+        segments (List[Segment]): The segments of a transcription, in order.
+        start_ms (int): The start of the range, in milliseconds.
+        end_ms (Optional[int]): The end of the range, in milliseconds (None for the end of the audio).
+
+    Returns:
+        List[Segment]: The segments within the range, in order.
+
+    Raises:
+        ValueError: If the range is empty or negative.
+    """
+    if start_ms < 0 or (end_ms is not None and end_ms <= start_ms):
+        raise ValueError("The time range must start at 0 or later and end after it starts.")
+
+    end_ms = end_ms if end_ms is not None else float("inf")
+    sliced = []
+    for segment in segments:
+        if segment.end_ms < start_ms or segment.start_ms >= end_ms:
+            continue
+        if not segment.words:
+            sliced.append(segment)
+            continue
+
+        words = tuple(word for word in segment.words if start_ms <= (word[1] + word[2]) / 2 < end_ms)
+        if len(words) == len(segment.words):
+            sliced.append(segment)
+        elif words:
+            sliced.append(Segment(words[0][1], words[-1][2], " ".join(word[0] for word in words), words))
+
+    return sliced
+
+
+def segments_text(segments: List[Segment]) -> str:
+    """
+    Joins the text of segments, as the plain transcription does.
+
+    Args:
+        segments (List[Segment]): The segments, in order.
+
+    Returns:
+        str: The text.
+    """
+    return " ".join(segment.text for segment in segments)
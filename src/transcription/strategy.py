@@ -1,9 +1,133 @@
+import os
+import sys
+import warnings
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Tuple
+
 from vosk import Model as VoskModel
 from path_handler import PathManager
 from abc import ABC, abstractmethod
 
 path_manager = PathManager()
 base_directory = path_manager.get_base_directory()
+sys.path.append(str(base_directory))
+
+from src.config.settings import SETTINGS
+
+
+class ModelCache:
+    """
+    A thread-safe, process-wide LRU cache for loaded speech recognition models.
+
+    Models are loaded at most once per key, even when several requests ask for the same model
+    concurrently, and are shared read-only between requests. When the total size of the cached
+    models exceeds the memory budget, the least recently used models are evicted. Requests that
+    still hold an evicted model keep using it until they finish.
+
+    Attributes:
+        max_bytes (int): The memory budget for the cached models (0 means unlimited).
+
+    Methods:
+        get_or_load: Returns the cached model for a key, loading it if needed.
+        contains: Checks whether a model is currently cached.
+        stats: Returns the current cache usage.
+    """
+
+    def __init__(self, max_bytes: int):
+        """
+        Initializes an empty model cache.
+
+        Args:
+            max_bytes (int): The memory budget for the cached models (0 means unlimited).
+        """
+        self.max_bytes = max_bytes
+        self._models: "OrderedDict[str, Tuple[Any, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._loading_locks: Dict[str, threading.Lock] = {}
+
+    def _evict(self, keep: str) -> None:
+        """
+        Evicts least recently used models until the cache fits its budget.
+
+        Args:
+            keep (str): The key of the model that must not be evicted.
+        """
+        if self.max_bytes <= 0:
+            return
+
+        used = sum(size for _, size in self._models.values())
+        for key in list(self._models.keys()):
+            if used <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            _, size = self._models.pop(key)
+            used -= size
+
+        if used > self.max_bytes:
+            warnings.warn(f"The {keep} model alone exceeds the model cache budget.", ResourceWarning)
+
+    def get_or_load(self, key: str, loader: Callable[[], Any], size: Callable[[], int]) -> Any:
+        """
+        Returns the cached model for a key, loading it if needed.
+
+        Args:
+            key (str): The cache key of the model.
+            loader (Callable[[], Any]): A function that loads the model.
+            size (Callable[[], int]): A function that estimates the memory footprint of the model in
+                                      bytes. Like the loader, it is only called on a miss.
+
+        Returns:
+            Any: The loaded model.
+        """
+        with self._lock:
+            if key in self._models:
+                self._models.move_to_end(key)
+                return self._models[key][0]
+            loading_lock = self._loading_locks.setdefault(key, threading.Lock())
+
+        with loading_lock:
+            with self._lock:
+                if key in self._models:
+                    self._models.move_to_end(key)
+                    return self._models[key][0]
+
+            model = loader()
+            model_size = size()
+
+            with self._lock:
+                self._models[key] = (model, model_size)
+                self._evict(keep=key)
+
+        return model
+
+    def contains(self, key: str) -> bool:
+        """
+        Checks whether a model is currently cached.
+
+        Args:
+            key (str): The cache key of the model.
+
+        Returns:
+            bool: True if the model is loaded and cached.
+        """
+        with self._lock:
+            return key in self._models
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns the current cache usage.
+
+        Returns:
+            Dict[str, Any]: The cached keys, the used bytes and the budget.
+        """
+        with self._lock:
+            return {
+                "models": list(self._models.keys()),
+                "used_bytes": sum(size for _, size in self._models.values()),
+                "max_bytes": self.max_bytes,
+            }
 
 
 class SpeechToTextStrategy(ABC):
@@ -15,7 +139,7 @@ class SpeechToTextStrategy(ABC):
     Methods:
         load_model: Loads the speech recognition model (to be implemented by subclasses).
     """
-    
+
     @classmethod
     @abstractmethod
     def load_model(self):
@@ -33,25 +157,56 @@ class VoskStrategy(SpeechToTextStrategy):
     A strategy for loading Vosk speech recognition models.
 
     This class implements the `SpeechToTextStrategy` interface for loading Vosk models.
+    Loaded models are kept in a process-wide `ModelCache`, so each model is read from disk
+    once and then shared between requests.
 
     Attributes:
         _path_to_model (Dict[str, str]): A dictionary mapping languages to their respective
                                          Vosk model paths.
+        _cache (ModelCache): The process-wide cache of loaded Vosk models.
 
     Methods:
         load_model: Loads the Vosk model for the specified language.
+        model_id: Returns the identifier of the Vosk model for the specified language.
+        model_path: Returns the path of the Vosk model for the specified language.
+        is_loaded: Checks whether the model for a language is loaded.
     """
-    
+
     _path_to_model = {
         "English": str(base_directory / "models/vosk-model-en-us-0.22"),
         "Persian": str(base_directory / "models/vosk-model-fa-0.42")
     }
-    
+
+    _cache = ModelCache(SETTINGS.vosk_model_cache_bytes)
+
+    @staticmethod
+    def _model_size(model_path: str) -> int:
+        """
+        Estimates the memory footprint of a model from its size on disk.
+
+        Args:
+            model_path (str): Path to the model directory.
+
+        Returns:
+            int: The total size of the model files in bytes.
+        """
+        total = 0
+        for root, _, files in os.walk(model_path):
+            for name in files:
+                try:
+                    total += os.path.getsize(os.path.join(root, name))
+                except OSError:
+                    continue
+        return total
+
     @classmethod
     def load_model(cls, language: str):
         """
         Loads the Vosk model for the specified language.
 
+        The model is only read from disk the first time it is requested (or after it was evicted);
+        later calls return the cached instance.
+
         Args:
             language (str): The language of the model to load.
 
@@ -65,10 +220,67 @@ class VoskStrategy(SpeechToTextStrategy):
         model_path = cls._path_to_model.get(language)
         if not model_path:
             raise ValueError(f"The {language} Vosk model is not defined!")
-        
+
         try:
-            model = VoskModel(model_path)
+            model = cls._cache.get_or_load(
+                language,
+                lambda: VoskModel(model_path),
+                lambda: cls._model_size(model_path)
+            )
         except Exception as e:
             raise e
+
+        return model
+
+    @classmethod
+    def model_id(cls, language: str) -> str:
+        """
+        Returns the identifier of the Vosk model for the specified language.
+
+        Args:
+            language (str): The language of the model.
+
+        Returns:
+            str: The name of the model directory (e.g., "vosk-model-en-us-0.22").
+
+        Raises:
+            ValueError: If the specified language is not supported.
+        """
+        model_path = cls._path_to_model.get(language)
+        if not model_path:
+            raise ValueError(f"The {language} Vosk model is not defined!")
+        
+        return os.path.basename(model_path)
+
+    @classmethod
+    def model_path(cls, language: str) -> str:
+        """
+        Returns the path of the Vosk model for the specified language.
+
+        Args:
+            language (str): The language of the model.
+
+        Returns:
+            str: The path of the model directory.
+
+        Raises:
+            ValueError: If the specified language is not supported.
+        """
+        model_path = cls._path_to_model.get(language)
+        if not model_path:
+            raise ValueError(f"The {language} Vosk model is not defined!")
         
-        return model
\ No newline at end of file
+        return model_path
+
+    @classmethod
+    def is_loaded(cls, language: str) -> bool:
+        """
+        Checks whether the model for a language is loaded.
+
+        Args:
+            language (str): The language of the model.
+
+        Returns:
+            bool: True if the model is in the cache.
+        """
+        return cls._cache.contains(language)
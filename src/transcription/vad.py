@@ -0,0 +1,229 @@
+import sys
+import bisect
+from collections import deque
+from typing import Any, Deque, Dict, List, Tuple
+
+import numpy as np
+from path_handler import PathManager
+
+path_manager = PathManager()
+sys.path.append(str(path_manager.get_base_directory()))
+
+
+class VoiceActivityDetector:
+    """
+    Drops the non-speech parts of 16-bit mono PCM before it reaches the recognizer.
+
+    The audio is cut into short frames, and a frame counts as speech when it is loud enough and
+    does not look like noise:
+
+    - its energy is above an absolute floor and above the tracked noise floor by a margin;
+    - its spectrum is not flat (broadband noise such as rain or hiss is), or it crosses zero
+      rarely enough to be voiced.
+
+    Speech decisions are smoothed: a few frames before the onset are kept (pre-roll), and speech
+    is held for a while after the last speech frame (hangover), so word edges and short pauses
+    reach the recognizer, which needs them to find word and sentence boundaries.
+
+    The detector keeps its state between calls, so it can filter a recording block by block. It
+    also remembers where each kept run of audio came from, so times reported by the recognizer can
+    be mapped back to the source audio.
+
+    Attributes:
+        sample_rate (int): The sample rate of the audio.
+        frame_size (int): The number of samples per frame.
+        energy_margin_db (float): How far above the noise floor a speech frame must be.
+        min_energy_db (float): The energy below which a frame is never speech (dBFS).
+        max_flatness (float): The spectral flatness above which a frame sounds like noise.
+        max_zero_crossing_rate (float): The zero-crossing rate below which a frame is voiced.
+        hangover_frames (int): The frames kept after the last speech frame.
+        preroll_frames (int): The frames kept before the first speech frame.
+        total_frames (int): The audio frames (samples) seen so far.
+        speech_frames (int): The audio frames (samples) passed on as speech so far.
+
+    Methods:
+        filter: Returns the speech in a block of PCM.
+        flush: Returns the speech still held back at the end of the audio.
+        report: Returns how much audio was seen and skipped.
+        source_seconds: Maps a time of the kept audio to the time in the source audio.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        frame_ms: int = 30,
+        energy_margin_db: float = 9.0,
+        min_energy_db: float = -50.0,
+        max_flatness: float = 0.35,
+        max_zero_crossing_rate: float = 0.2,
+        hangover_ms: int = 300,
+        preroll_ms: int = 90,
+    ):
+        """
+        Initializes the detector.
+
+        Args:
+            sample_rate (int): The sample rate of the audio.
+            frame_ms (int): The duration of a frame, in milliseconds.
+            energy_margin_db (float): How far above the noise floor a speech frame must be.
+            min_energy_db (float): The energy below which a frame is never speech (dBFS).
+            max_flatness (float): The spectral flatness (0 for a pure tone, 1 for white noise)
+                                  above which a frame sounds like noise.
+            max_zero_crossing_rate (float): The fraction of zero crossings below which a frame is voiced.
+            hangover_ms (int): How long speech is held after the last speech frame, in milliseconds.
+            preroll_ms (int): How much audio is kept before the first speech frame, in milliseconds.
+        """
+        self.sample_rate = sample_rate
+        self.frame_size = max(sample_rate * frame_ms // 1000, 1)
+        self.energy_margin_db = energy_margin_db
+        self.min_energy_db = min_energy_db
+        self.max_flatness = max_flatness
+        self.max_zero_crossing_rate = max_zero_crossing_rate
+        self.hangover_frames = hangover_ms // frame_ms
+        self.preroll_frames = preroll_ms // frame_ms
+        self.total_frames = 0
+        self.speech_frames = 0
+
+        self._noise_floor_db = None
+        self._hangover = 0
+        self._remainder = b""
+        self._preroll: Deque[Tuple[int, bytes]] = deque(maxlen=max(self.preroll_frames, 1))
+        # The runs of kept audio, as (start in the kept audio, start in the source audio) in samples.
+        self._runs: List[Tuple[int, int]] = []
+        self._run_starts: List[int] = []
+        self._window = np.hanning(self.frame_size).astype(np.float32)
+
+    def _classify(self, frames: np.ndarray) -> np.ndarray:
+        """
+        Decides which frames are speech, before smoothing.
+
+        Args:
+            frames (np.ndarray): The frames, one per row, as floats in [-1, 1].
+
+        Returns:
+            np.ndarray: One boolean per frame.
+        """
+        energy_db = 10 * np.log10(np.mean(np.square(frames), axis=1) + 1e-10)
+
+        signs = np.signbit(frames)
+        zero_crossing_rate = np.mean(signs[:, 1:] != signs[:, :-1], axis=1)
+
+        power = np.square(np.abs(np.fft.rfft(frames * self._window, axis=1))) + 1e-12
+        flatness = np.exp(np.mean(np.log(power), axis=1)) / np.mean(power, axis=1)
+
+        speech = np.empty(len(frames), dtype=bool)
+        for i, frame_energy in enumerate(energy_db):
+            # The noise floor follows quiet frames at once and loud frames slowly, so it tracks
+            # changing background noise without rising into the speech.
+            if self._noise_floor_db is None or frame_energy < self._noise_floor_db:
+                self._noise_floor_db = frame_energy
+            else:
+                self._noise_floor_db += 0.002 * (frame_energy - self._noise_floor_db)
+
+            loud = frame_energy > max(self.min_energy_db, self._noise_floor_db + self.energy_margin_db)
+            tonal = flatness[i] < self.max_flatness or zero_crossing_rate[i] < self.max_zero_crossing_rate
+            speech[i] = loud and tonal
+
+        return speech
+
+    def filter(self, data: bytes) -> bytes:
+        """
+        Returns the speech in a block of PCM.
+
+        Args:
+            data (bytes): The next block of 16-bit mono PCM.
+
+        Returns:
+            bytes: The speech frames of the block, with their pre-roll and hangover (possibly empty).
+        """
+        data = self._remainder + data
+        frame_bytes = 2 * self.frame_size
+        usable = len(data) - len(data) % frame_bytes
+        self._remainder = data[usable:]
+        if usable == 0:
+            return b""
+
+        samples = np.frombuffer(data[:usable], dtype=np.int16).astype(np.float32) / 32768.0
+        speech = self._classify(samples.reshape(-1, self.frame_size))
+
+        kept = []
+        for i, is_speech in enumerate(speech):
+            frame = data[i * frame_bytes:(i + 1) * frame_bytes]
+            position = self.total_frames
+            self.total_frames += self.frame_size
+
+            if is_speech:
+                self._hangover = self.hangover_frames
+            elif self._hangover > 0:
+                self._hangover -= 1
+            else:
+                if self.preroll_frames:
+                    self._preroll.append((position, frame))
+                continue
+
+            while self._preroll:
+                self._keep(*self._preroll.popleft(), kept)
+            self._keep(position, frame, kept)
+
+        return b"".join(kept)
+
+    def _keep(self, position: int, frame: bytes, kept: List[bytes]) -> None:
+        """
+        Passes a frame on as speech and records where it came from.
+
+        Args:
+            position (int): The position of the frame in the source audio, in samples.
+            frame (bytes): The frame.
+            kept (List[bytes]): The frames passed on from the current block.
+        """
+        if not self._runs or self._runs[-1][1] + self.speech_frames - self._runs[-1][0] != position:
+            self._runs.append((self.speech_frames, position))
+            self._run_starts.append(self.speech_frames)
+        kept.append(frame)
+        self.speech_frames += len(frame) // 2
+
+    def flush(self) -> bytes:
+        """
+        Returns the speech still held back at the end of the audio.
+
+        Returns:
+            bytes: The last partial frame, if speech was still being held (possibly empty).
+        """
+        data, self._remainder = self._remainder, b""
+        self.total_frames += len(data) // 2
+        if self._hangover > 0 and data:
+            kept: List[bytes] = []
+            self._keep(self.total_frames - len(data) // 2, data, kept)
+            return data
+        return b""
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Returns how much audio was seen and skipped.
+
+        Returns:
+            Dict[str, Any]: The seen and skipped audio in seconds, and the skipped fraction.
+        """
+        skipped_frames = self.total_frames - self.speech_frames
+        return {
+            "total_seconds": round(self.total_frames / self.sample_rate, 3),
+            "skipped_seconds": round(skipped_frames / self.sample_rate, 3),
+            "skipped_ratio": round(skipped_frames / self.total_frames, 4) if self.total_frames else 0.0,
+        }
+
+    def source_seconds(self, seconds: float) -> float:
+        """
+        Maps a time of the kept audio (as the recognizer reports it) to the time in the source audio.
+
+        Args:
+            seconds (float): The time in the kept audio.
+
+        Returns:
+            float: The time in the source audio.
+        """
+        if not self._runs:
+            return seconds
+        frame = seconds * self.sample_rate
+        index = max(bisect.bisect_right(self._run_starts, frame) - 1, 0)
+        kept_start, source_start = self._runs[index]
+        return (source_start + frame - kept_start) / self.sample_rate
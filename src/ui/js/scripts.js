@@ -96,8 +96,32 @@ document.addEventListener('DOMContentLoaded', () => {
 		formData.append('client', client);
 		formData.append('model', model);
 
+		const stageLabels = {
+			converting: 'Converting...',
+			transcribing: 'Transcribing...',
+			summarizing: 'Summarizing...',
+		};
+
+		const handleEvent = (type, data) => {
+			if (type === 'stage') {
+				summarizeButton.textContent = stageLabels[data.stage] || 'Processing...';
+			} else if (type === 'progress') {
+				summarizeButton.textContent = `Transcribing... ${data.percent}%`;
+			} else if (type === 'token') {
+				rawMarkdownContent += data.text;
+				resultsContent.innerHTML = marked.parse(rawMarkdownContent);
+				resultsSection.classList.remove('hidden');
+			} else if (type === 'done') {
+				rawMarkdownContent = data.summary;
+				resultsContent.innerHTML = marked.parse(rawMarkdownContent);
+				resultsSection.classList.remove('hidden');
+			} else if (type === 'error') {
+				throw new Error(data.detail);
+			}
+		};
+
 		try {
-			const response = await fetch('http://localhost:8000/summarize', {
+			const response = await fetch('http://localhost:8000/summarize/stream', {
 				method: 'POST',
 				body: formData,
 			});
@@ -106,12 +130,37 @@ document.addEventListener('DOMContentLoaded', () => {
 				throw new Error('Summarization failed');
 			}
 
-			const result = await response.json();
-
-			rawMarkdownContent = result.summary;
-
-			resultsContent.innerHTML = marked.parse(rawMarkdownContent);
-			resultsSection.classList.remove('hidden');
+			rawMarkdownContent = '';
+			resultsContent.innerHTML = '';
+
+			const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+			let buffer = '';
+
+			while (true) {
+				const { value, done } = await reader.read();
+				if (done) {
+					break;
+				}
+
+				buffer += value;
+				const messages = buffer.split('\n\n');
+				buffer = messages.pop();
+
+				messages.forEach(message => {
+					let type = 'message';
+					let data = '';
+					message.split('\n').forEach(line => {
+						if (line.startsWith('event: ')) {
+							type = line.slice(7);
+						} else if (line.startsWith('data: ')) {
+							data += line.slice(6);
+						}
+					});
+					if (data) {
+						handleEvent(type, JSON.parse(data));
+					}
+				});
+			}
 
 			uploadedFile = null;
 			fileUpload.value = '';
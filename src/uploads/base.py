@@ -0,0 +1,275 @@
+import os
+import sys
+import hashlib
+import tempfile
+from dataclasses import dataclass, field
+from typing import IO, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl
+
+from path_handler import PathManager
+from fastapi.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+try:
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ImportError:  # python-multipart < 0.0.13
+    from multipart.multipart import MultipartParser, parse_options_header
+
+path_manager = PathManager()
+sys.path.append(str(path_manager.get_base_directory()))
+
+from src.config.settings import SETTINGS
+
+
+class UploadTooLargeError(ValueError):
+    """Raised when an upload exceeds the configured size limit."""
+
+
+@dataclass(frozen=True)
+class SpooledUpload:
+    """
+    An uploaded file that was written to disk.
+
+    Attributes:
+        path (str): Path to the spool file.
+        size (int): The size of the upload in bytes.
+        sha256 (str): The hex SHA-256 digest of the upload content.
+    """
+    path: str
+    size: int
+    sha256: str
+
+
+@dataclass
+class SpooledForm:
+    """
+    A submitted form whose file (if any) was written to disk.
+
+    Attributes:
+        fields (Dict[str, str]): The text fields of the form.
+        upload (Optional[SpooledUpload]): The uploaded file, if any.
+        filename (Optional[str]): The name of the uploaded file on the client, if any.
+    """
+    fields: Dict[str, str] = field(default_factory=dict)
+    upload: Optional[SpooledUpload] = None
+    filename: Optional[str] = None
+
+
+class UploadSpooler:
+    """
+    Streams uploaded forms to disk as their body arrives.
+
+    The multipart body is parsed straight from the request stream, so the upload is never held in
+    memory or copied to disk by the framework first: each chunk is counted against the size limit,
+    and the file data in it is hashed and written to the spool file before the next chunk is read.
+    Peak memory per upload is one chunk regardless of the file size, and oversize uploads without a
+    `Content-Length` are rejected as soon as they exceed the limit. Text fields are kept in memory,
+    so they have a smaller limit of their own.
+
+    Attributes:
+        max_bytes (int): The largest accepted request body in bytes (0 means unlimited).
+        chunk_size (int): The number of bytes read and written at a time.
+        max_field_bytes (int): The largest accepted text field in bytes (0 means unlimited).
+        file_field (str): The name of the form field that holds the file.
+
+    Methods:
+        _receive: Yields the chunks of a request body, enforcing the size limit.
+        spool_form: Parses a submitted form, writing its file to a temporary file.
+    """
+
+    file_field = "file"
+
+    def __init__(
+        self,
+        max_bytes: int = SETTINGS.max_upload_bytes,
+        chunk_size: int = SETTINGS.upload_chunk_bytes,
+        max_field_bytes: int = SETTINGS.max_form_field_bytes,
+    ):
+        """
+        Initializes the spooler.
+
+        Args:
+            max_bytes (int): The largest accepted upload in bytes (0 means unlimited).
+            chunk_size (int): The number of bytes read and written at a time.
+            max_field_bytes (int): The largest accepted text field in bytes (0 means unlimited).
+        """
+        self.max_bytes = max_bytes
+        self.chunk_size = chunk_size
+        self.max_field_bytes = max_field_bytes
+
+    async def _receive(self, request: Request, max_bytes: Optional[int] = None):
+        """
+        Yields the chunks of a request body, enforcing the size limit.
+
+        Args:
+            request (Request): The request.
+            max_bytes (Optional[int]): The size limit, if not the upload limit (0 means unlimited).
+
+        Yields:
+            bytes: The chunks of the body, as they arrive.
+
+        Raises:
+            UploadTooLargeError: As soon as the body exceeds the size limit.
+        """
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        size = 0
+        async for chunk in request.stream():
+            size += len(chunk)
+            if limit and size > limit:
+                raise UploadTooLargeError(f"The upload exceeds the {limit} bytes limit.")
+            if chunk:
+                yield chunk
+
+    async def spool_form(self, request: Request) -> SpooledForm:
+        """
+        Parses a submitted form, writing its file to a temporary file.
+
+        Multipart forms are parsed as they stream in. URL-encoded forms cannot carry a file, so they
+        are read whole, within the text field size limit.
+
+        Args:
+            request (Request): The request whose body is the form.
+
+        Returns:
+            SpooledForm: The text fields, and the spool file with the size and hash of the upload.
+
+        Raises:
+            UploadTooLargeError: If the body or a text field exceeds its size limit. The partial spool file is deleted.
+            ValueError: If the body is not a well-formed form.
+        """
+        content_type, options = parse_options_header(request.headers.get("content-type", ""))
+        if content_type != b"multipart/form-data":
+            body = b"".join([chunk async for chunk in self._receive(request, self.max_field_bytes)])
+            return SpooledForm(fields=dict(parse_qsl(body.decode("UTF-8"), keep_blank_values=True)))
+
+        boundary = options.get(b"boundary")
+        if not boundary:
+            raise ValueError("The multipart form has no boundary.")
+
+        events: List[Tuple[str, bytes]] = []
+        parser = MultipartParser(boundary, {
+            "on_part_begin": lambda: events.append(("begin", b"")),
+            "on_header_field": lambda data, start, end: events.append(("header_field", data[start:end])),
+            "on_header_value": lambda data, start, end: events.append(("header_value", data[start:end])),
+            "on_header_end": lambda: events.append(("header_end", b"")),
+            "on_headers_finished": lambda: events.append(("headers_finished", b"")),
+            "on_part_data": lambda data, start, end: events.append(("data", data[start:end])),
+            "on_part_end": lambda: events.append(("end", b"")),
+        })
+
+        form = SpooledForm()
+        digest = hashlib.sha256()
+        file_size = 0
+        temp_file: Optional[IO[bytes]] = None
+        header_field, header_value = b"", b""
+        disposition = b""
+        name: Optional[str] = None
+        value = bytearray()
+        in_file = False
+        # File data is written in batches of `chunk_size`, whatever the size of the received chunks.
+        pending: List[bytes] = []
+        pending_size = 0
+
+        try:
+            async for chunk in self._receive(request):
+                parser.write(chunk)
+
+                for event, data in events:
+                    if event == "begin":
+                        disposition, name, in_file = b"", None, False
+                        value = bytearray()
+                    elif event == "header_field":
+                        header_field += data
+                    elif event == "header_value":
+                        header_value += data
+                    elif event == "header_end":
+                        if header_field.lower() == b"content-disposition":
+                            disposition = header_value
+                        header_field, header_value = b"", b""
+                    elif event == "headers_finished":
+                        _, params = parse_options_header(disposition)
+                        name = params.get(b"name", b"").decode("UTF-8")
+                        filename = params.get(b"filename")
+                        # Browsers send an empty file field when no file is chosen.
+                        if name == self.file_field and filename and temp_file is None:
+                            form.filename = filename.decode("UTF-8")
+                            extension = form.filename.split(".")[-1] if "." in form.filename else "tmp"
+                            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=f".{extension}")
+                            in_file = True
+                        elif filename is not None:
+                            name = None
+                    elif event == "data":
+                        if in_file:
+                            digest.update(data)
+                            file_size += len(data)
+                            pending.append(data)
+                            pending_size += len(data)
+                        elif name is not None:
+                            value += data
+                            if self.max_field_bytes and len(value) > self.max_field_bytes:
+                                raise UploadTooLargeError(f"The {name} field exceeds the {self.max_field_bytes} bytes limit.")
+                    elif event == "end":
+                        if not in_file and name is not None:
+                            form.fields[name] = value.decode("UTF-8")
+                        in_file, name = False, None
+                events.clear()
+
+                if pending_size >= self.chunk_size:
+                    await run_in_threadpool(temp_file.write, b"".join(pending))
+                    pending, pending_size = [], 0
+
+            parser.finalize()
+            if temp_file is not None:
+                if pending:
+                    await run_in_threadpool(temp_file.write, b"".join(pending))
+                temp_file.close()
+                form.upload = SpooledUpload(path=temp_file.name, size=file_size, sha256=digest.hexdigest())
+        except BaseException as e:
+            if temp_file is not None:
+                temp_file.close()
+                os.remove(temp_file.name)
+            if isinstance(e, UnicodeDecodeError):
+                raise ValueError("The form fields must be UTF-8 text.") from e
+            raise
+
+        return form
+
+
+class UploadLimitMiddleware:
+    """
+    ASGI middleware that rejects oversize uploads before their body is read.
+
+    Requests whose `Content-Length` exceeds the upload limit get a 413 response right away.
+    Requests without a `Content-Length` are still checked by `UploadSpooler`, chunk by chunk, while they stream.
+
+    Attributes:
+        app (ASGIApp): The wrapped application.
+        max_bytes (int): The largest accepted request body in bytes (0 means unlimited).
+    """
+
+    def __init__(self, app: ASGIApp, max_bytes: int = SETTINGS.max_upload_bytes):
+        """
+        Initializes the middleware.
+
+        Args:
+            app (ASGIApp): The wrapped application.
+            max_bytes (int): The largest accepted request body in bytes (0 means unlimited).
+        """
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and self.max_bytes:
+            headers = dict(scope.get("headers") or [])
+            content_length = headers.get(b"content-length")
+            if content_length is not None and content_length.isdigit() and int(content_length) > self.max_bytes:
+                response = JSONResponse(
+                    status_code=413,
+                    content={"detail": f"The upload exceeds the {self.max_bytes} bytes limit."},
+                )
+                await response(scope, receive, send)
+                return
+
+        await self.app(scope, receive, send)
@@ -0,0 +1,358 @@
+import os
+import sys
+import time
+import uuid
+import shutil
+import threading
+import warnings
+from contextlib import contextmanager
+from typing import Iterable, Iterator, Optional
+
+from path_handler import PathManager
+
+path_manager = PathManager()
+sys.path.append(str(path_manager.get_base_directory()))
+
+from src.config.settings import SETTINGS
+
+
+class QuotaExceededError(RuntimeError):
+    """Raised when a job would exceed its own disk quota or the global workspace quota."""
+
+
+def _disk_usage(path: str) -> int:
+    """
+    Returns the total size of the files under a directory.
+
+    Args:
+        path (str): Path to the directory.
+
+    Returns:
+        int: The total size in bytes (0 if the directory does not exist).
+    """
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                continue
+    return total
+
+
+class Workspace:
+    """
+    The scratch directory of a single job.
+
+    Steps write their intermediate files here instead of in shared directories, so concurrent
+    jobs never see each other's files, and everything a job leaves behind is deleted with it.
+
+    Attributes:
+        job_id (str): The identifier of the job.
+        directory (str): The scratch directory.
+        max_bytes (int): The disk quota of the job (0 means unlimited).
+
+    Methods:
+        path: Returns the path of a file in the workspace.
+        usage: Returns the disk space used by the workspace.
+        remaining_bytes: Returns the disk space the job may still use.
+        check: Raises if the workspace exceeds its quota.
+        close: Deletes the workspace.
+    """
+
+    def __init__(self, job_id: str, directory: str, max_bytes: int):
+        """
+        Initializes the workspace, creating its directory.
+
+        Args:
+            job_id (str): The identifier of the job.
+            directory (str): The scratch directory.
+            max_bytes (int): The disk quota of the job (0 means unlimited).
+        """
+        self.job_id = job_id
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, name: str) -> str:
+        """
+        Returns the path of a file in the workspace.
+
+        Args:
+            name (str): The name of the file.
+
+        Returns:
+            str: The path of the file, whether or not it exists.
+        """
+        return os.path.join(self.directory, name)
+
+    def usage(self) -> int:
+        """
+        Returns the disk space used by the workspace.
+
+        Returns:
+            int: The total size of the files in the workspace, in bytes.
+        """
+        return _disk_usage(self.directory)
+
+    def remaining_bytes(self) -> Optional[int]:
+        """
+        Returns the disk space the job may still use.
+
+        Returns:
+            Optional[int]: The remaining quota in bytes, or None if the quota is unlimited.
+        """
+        if not self.max_bytes:
+            return None
+        return max(self.max_bytes - self.usage(), 0)
+
+    def check(self) -> None:
+        """
+        Raises if the workspace exceeds its quota.
+
+        Raises:
+            QuotaExceededError: If the files of the job exceed its quota.
+        """
+        if self.max_bytes and self.usage() >= self.max_bytes:
+            raise QuotaExceededError(f"The job {self.job_id} exceeded its disk quota of {self.max_bytes} bytes.")
+
+    def close(self) -> None:
+        """Deletes the workspace and everything in it."""
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+class WorkspaceManager:
+    """
+    Creates, limits and cleans up the workspaces of jobs.
+
+    Each job gets its own directory, on tmpfs for small inputs when a tmpfs directory is
+    configured. A job may not use more than its quota, and no job starts while the workspaces
+    together use more than the global quota. Workspaces are deleted when their job ends, fails or
+    is cancelled; a background sweeper deletes those left behind by crashed workers, together with
+    stale temporary files in other directories.
+
+    Attributes:
+        directory (str): The directory of the workspaces.
+        tmpfs_directory (str): The tmpfs directory for the workspaces of small jobs ("" disables it).
+        tmpfs_max_input_bytes (int): The largest input whose job gets a tmpfs workspace.
+        job_max_bytes (int): The disk quota of each job (0 means unlimited).
+        max_bytes (int): The disk quota of all workspaces together (0 means unlimited).
+        ttl_seconds (int): The age after which left-behind files are deleted by the sweeper.
+
+    Methods:
+        from_settings: Creates a workspace manager configured from the process settings.
+        usage: Returns the disk space used by all workspaces.
+        create: Creates the workspace of a job.
+        open: Provides the workspace of a job and deletes it afterwards.
+        remove: Deletes the workspace of a job.
+        sweep: Deletes workspaces and temporary files older than the TTL.
+        start_sweeper: Runs the sweeper periodically in a background thread.
+        stop_sweeper: Stops the background sweeper.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        tmpfs_directory: str = "",
+        tmpfs_max_input_bytes: int = 0,
+        job_max_bytes: int = 0,
+        max_bytes: int = 0,
+        ttl_seconds: int = 6 * 3600,
+    ):
+        """
+        Initializes the workspace manager, creating its directories if needed.
+
+        Args:
+            directory (str): The directory of the workspaces.
+            tmpfs_directory (str): The tmpfs directory for the workspaces of small jobs ("" disables it).
+            tmpfs_max_input_bytes (int): The largest input whose job gets a tmpfs workspace.
+            job_max_bytes (int): The disk quota of each job (0 means unlimited).
+            max_bytes (int): The disk quota of all workspaces together (0 means unlimited).
+            ttl_seconds (int): The age after which left-behind files are deleted by the sweeper.
+        """
+        self.directory = directory
+        self.tmpfs_directory = tmpfs_directory
+        self.tmpfs_max_input_bytes = tmpfs_max_input_bytes
+        self.job_max_bytes = job_max_bytes
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._stop = threading.Event()
+        self._sweeper: Optional[threading.Thread] = None
+        os.makedirs(self.directory, exist_ok=True)
+
+        if self.tmpfs_directory:
+            try:
+                os.makedirs(self.tmpfs_directory, exist_ok=True)
+            except OSError:
+                warnings.warn(f"The tmpfs directory {self.tmpfs_directory} is not available. Using {self.directory} for all jobs.", ResourceWarning)
+                self.tmpfs_directory = ""
+
+    @classmethod
+    def from_settings(cls) -> "WorkspaceManager":
+        """
+        Creates a workspace manager configured from the process settings.
+
+        Returns:
+            WorkspaceManager: The workspace manager.
+        """
+        return cls(
+            directory=SETTINGS.workspace_directory,
+            tmpfs_directory=SETTINGS.workspace_tmpfs_directory,
+            tmpfs_max_input_bytes=SETTINGS.workspace_tmpfs_max_input_bytes,
+            job_max_bytes=SETTINGS.workspace_job_max_bytes,
+            max_bytes=SETTINGS.workspace_max_bytes,
+            ttl_seconds=SETTINGS.workspace_ttl_seconds,
+        )
+
+    def _roots(self) -> Iterable[str]:
+        """
+        Returns the directories that hold workspaces.
+
+        Returns:
+            Iterable[str]: The disk directory, and the tmpfs directory if configured.
+        """
+        return [self.directory] + ([self.tmpfs_directory] if self.tmpfs_directory else [])
+
+    def usage(self) -> int:
+        """
+        Returns the disk space used by all workspaces.
+
+        Returns:
+            int: The total size of the files in the workspaces, in bytes.
+        """
+        return sum(_disk_usage(root) for root in self._roots())
+
+    def create(self, job_id: Optional[str] = None, input_bytes: Optional[int] = None) -> Workspace:
+        """
+        Creates the workspace of a job.
+
+        Args:
+            job_id (Optional[str]): The identifier of the job (a random one is used if missing).
+            input_bytes (Optional[int]): The size of the input of the job, if known. Jobs with small
+                                         inputs get a tmpfs workspace when one is configured.
+
+        Returns:
+            Workspace: The workspace of the job.
+
+        Raises:
+            QuotaExceededError: If the workspaces already use the global quota.
+        """
+        if self.max_bytes and self.usage() >= self.max_bytes:
+            raise QuotaExceededError(f"The workspaces exceed their disk quota of {self.max_bytes} bytes. Try again later.")
+
+        root = self.directory
+        if self.tmpfs_directory and input_bytes is not None and input_bytes <= self.tmpfs_max_input_bytes:
+            root = self.tmpfs_directory
+
+        job_id = job_id or uuid.uuid4().hex
+        return Workspace(job_id, os.path.join(root, job_id), self.job_max_bytes)
+
+    @contextmanager
+    def open(self, job_id: Optional[str] = None, input_bytes: Optional[int] = None) -> Iterator[Workspace]:
+        """
+        Provides the workspace of a job and deletes it afterwards, whether the job succeeded or not.
+
+        Args:
+            job_id (Optional[str]): The identifier of the job (a random one is used if missing).
+            input_bytes (Optional[int]): The size of the input of the job, if known.
+
+        Yields:
+            Workspace: The workspace of the job.
+
+        Raises:
+            QuotaExceededError: If the workspaces already use the global quota.
+        """
+        workspace = self.create(job_id, input_bytes)
+        try:
+            yield workspace
+        finally:
+            workspace.close()
+
+    def remove(self, job_id: str) -> None:
+        """
+        Deletes the workspace of a job (e.g., when the job is cancelled).
+
+        A step of the job that is still running fails once its files are gone, which ends the job.
+
+        Args:
+            job_id (str): The identifier of the job.
+        """
+        for root in self._roots():
+            shutil.rmtree(os.path.join(root, job_id), ignore_errors=True)
+
+    def sweep(self, temp_directories: Iterable[str] = ()) -> int:
+        """
+        Deletes workspaces and temporary files older than the TTL.
+
+        Workspaces are deleted as a whole once nothing in them changed for the TTL. In the other
+        directories, only hidden temporary files (`.*.tmp*`, as written by `ArtifactStore`) are deleted.
+
+        Args:
+            temp_directories (Iterable[str]): Other directories to clean of stale temporary files.
+
+        Returns:
+            int: The number of deleted workspaces and files.
+        """
+        deadline = time.time() - self.ttl_seconds
+        deleted = 0
+
+        for root in self._roots():
+            if not os.path.isdir(root):
+                continue
+            for entry in os.scandir(root):
+                if not entry.is_dir():
+                    continue
+                try:
+                    modified = max([entry.stat().st_mtime] + [
+                        os.path.getmtime(os.path.join(directory, name))
+                        for directory, _, files in os.walk(entry.path)
+                        for name in files
+                    ])
+                except OSError:
+                    continue
+                if modified < deadline:
+                    shutil.rmtree(entry.path, ignore_errors=True)
+                    deleted += 1
+
+        for directory in temp_directories:
+            if not os.path.isdir(directory):
+                continue
+            for entry in os.scandir(directory):
+                if not (entry.name.startswith(".") and ".tmp" in entry.name and entry.is_file()):
+                    continue
+                try:
+                    if entry.stat().st_mtime < deadline:
+                        os.remove(entry.path)
+                        deleted += 1
+                except OSError:
+                    continue
+
+        return deleted
+
+    def start_sweeper(self, interval_seconds: float, temp_directories: Iterable[str] = ()) -> None:
+        """
+        Runs the sweeper periodically in a background thread.
+
+        Args:
+            interval_seconds (float): The time between two sweeps.
+            temp_directories (Iterable[str]): Other directories to clean of stale temporary files.
+        """
+        if self._sweeper is not None:
+            return
+
+        temp_directories = list(temp_directories)
+
+        def run() -> None:
+            while not self._stop.wait(interval_seconds):
+                self.sweep(temp_directories)
+
+        self._stop.clear()
+        self._sweeper = threading.Thread(target=run, name="workspace-sweeper", daemon=True)
+        self._sweeper.start()
+
+    def stop_sweeper(self) -> None:
+        """Stops the background sweeper."""
+        self._stop.set()
+        if self._sweeper is not None:
+            self._sweeper.join()
+            self._sweeper = None